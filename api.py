@@ -1,28 +1,167 @@
 import logging
-from flask import Flask, request
+import os
+from flask import Flask, Response, request, stream_with_context
 from flask_restful import Resource, Api
+from flask_restful.representations.json import output_json
 
-from power_plan.error_catcher_functions import find_powerplants_production, extract_json_from_request, \
-    sanity_check
+from power_plan.error_catcher_functions import find_request_production, extract_json_from_request, \
+    sanity_check, find_batch_production, find_marginal_price, find_time_series_production, register_fleet, \
+    find_wind_scenarios_production, find_price_sweep_production, find_contingency_production, report_error
+from power_plan.admission import AdmissionController, request_deadline
+from power_plan import config
+from power_plan.custom_exceptions import AdmissionRejected, DeadlineExceeded, DispatchBudgetExceeded, \
+    FleetVersionError
+from power_plan.error_log import start_logging
+from power_plan.fleet_registry import FleetRegistry
+from power_plan.metrics import METRICS
+from power_plan.parallel import ParallelSolver
+from power_plan.result_cache import ResultCache
+from power_plan.single_flight import SingleFlight
+from power_plan.streaming import solve_ndjson_stream
 
 
 app = Flask(__name__)
 api = Api(app)
 
+# number of processes solving the batches, 0 to solve them in the request thread
+app.config["SOLVER_WORKERS"] = int(os.environ.get("POWERPLAN_SOLVER_WORKERS", 0))
+batch_solver = ParallelSolver(app.config["SOLVER_WORKERS"]) if app.config["SOLVER_WORKERS"] else None
+fleet_registry = FleetRegistry()
+
+# the cache, admission, engine, metrics and error log settings, shared with asgi.py, see power_plan/config.py
+coalesce_timeout = config.coalesce_timeout()
+result_cache = ResultCache(single_flight=SingleFlight(coalesce_timeout) if coalesce_timeout != 0 else None,
+                           **config.cache_options())
+admission = AdmissionController(**config.admission_options())
+admission_retry_after = config.retry_after()
+config.configure_engines()
+config.configure_metrics()
+log_queue_size = config.configure_error_log()
+
+
+@api.representation('application/json')
+def output_timed_json(data, code, headers=None):
+    with METRICS.time_stage("serialization"):
+        return output_json(data, code, headers)
+
 
 class Power(Resource):
+    def post(self):
+        try:
+            deadline = request_deadline(request.headers)
+        except ValueError as err:
+            return {"error": err.args[0]}, 400
+        try:
+            with admission.admit(deadline):
+                return find_request_production(request.get_data(cache=True), fleet_registry, result_cache)
+        except AdmissionRejected as err:
+            return {"error": err.args[0]}, 503, {"Retry-After": str(admission_retry_after)}
+        except DeadlineExceeded as err:
+            return {"error": err.args[0]}, 504
+        except DispatchBudgetExceeded as err:
+            return report_error(err, "find_powerplants_production"), 400
+
+
+class Batch(Resource):
+    def post(self):
+        data = extract_json_from_request(request)
+        return find_batch_production(data, batch_solver)
+
+
+class Fleets(Resource):
+    def post(self):
+        response = register_fleet(extract_json_from_request(request), fleet_registry)
+        if "error" in response:
+            return response, 400
+        return response, 201, {"ETag": response["etag"]}
+
+
+class Fleet(Resource):
+    def get(self, fleet_id):
+        try:
+            fleet = fleet_registry.get(fleet_id)
+        except KeyError as err:
+            return {"error": err.args[0]}, 404
+        response = dict(fleet.description(), powerplants=fleet.compact.to_dicts())
+        return response, 200, {"ETag": fleet.etag}
+
+    def put(self, fleet_id):
+        try:
+            response = register_fleet(extract_json_from_request(request), fleet_registry, fleet_id,
+                                      request.headers.get("If-Match"))
+        except FleetVersionError as err:
+            return {"error": err.args[0]}, 412
+        if "error" in response:
+            return response, 400
+        return response, 200, {"ETag": response["etag"]}
+
+    def delete(self, fleet_id):
+        try:
+            fleet_registry.delete(fleet_id)
+        except KeyError as err:
+            return {"error": err.args[0]}, 404
+        return "", 204
+
+
+class MarginalPrice(Resource):
     def post(self):
         data = extract_json_from_request(request)
-        sanity_check(data)
-        return find_powerplants_production(data)
+        return sanity_check(data) or find_marginal_price(data)
+
+
+class TimeSeries(Resource):
+    def post(self):
+        data = extract_json_from_request(request)
+        return find_time_series_production(data)
+
+
+class WindScenarios(Resource):
+    def post(self):
+        data = extract_json_from_request(request)
+        return find_wind_scenarios_production(data)
+
+
+class PriceSweep(Resource):
+    def post(self):
+        data = extract_json_from_request(request)
+        return find_price_sweep_production(data)
+
+
+class Contingency(Resource):
+    def post(self):
+        data = extract_json_from_request(request)
+        return find_contingency_production(data)
+
+
+class Stream(Resource):
+    def post(self):
+        results = solve_ndjson_stream(request.stream)
+        return Response(stream_with_context(results), mimetype="application/x-ndjson")
+
+
+@app.route('/metrics')
+def metrics():
+    if not METRICS.enabled:
+        return Response("metrics are disabled\n", status=404, mimetype="text/plain")
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
 
 
 api.add_resource(Power, '/')
+api.add_resource(Batch, '/batch')
+api.add_resource(MarginalPrice, '/marginal-price')
+api.add_resource(TimeSeries, '/timeseries')
+api.add_resource(WindScenarios, '/wind-scenarios')
+api.add_resource(PriceSweep, '/price-sweep')
+api.add_resource(Contingency, '/contingency')
+api.add_resource(Stream, '/stream')
+api.add_resource(Fleets, '/fleets')
+api.add_resource(Fleet, '/fleets/<string:fleet_id>')
 
 
 if __name__ == '__main__':
-    logging.basicConfig(filename="./log_file.log",
-                        level=logging.ERROR,
-                        format="%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s")
+    start_logging("./log_file.log",
+                  level=logging.ERROR,
+                  fmt="%(asctime)s %(levelname)s %(name)s %(processName)s %(threadName)s : %(message)s",
+                  queue_size=log_queue_size)
 
     app.run(host='0.0.0.0', port=8888)
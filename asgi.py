@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from power_plan.async_server import PowerPlanASGI, init_solver, serve
+from power_plan import config
+from power_plan.error_log import start_logging, worker_logging
+
+# POWERPLAN_ASYNC_EXECUTOR=process solves on worker processes, using every core, thread solves on threads of this
+# process, which share its memory but not its cores. Worker processes are spawned rather than forked: a forked worker
+# would inherit the client connections open at that time and keep them open after the server closes them
+workers = int(os.environ.get("POWERPLAN_ASYNC_WORKERS", os.cpu_count() or 1))
+
+# the result cache, error log and engine settings of api.py, configured by the same variables, see
+# power_plan/config.py. Every worker process has its own cache and applies the other settings
+cache_options = config.cache_options()
+coalesce_timeout = config.coalesce_timeout()
+config.configure_engines()
+log_queue_size = config.configure_error_log()
+
+# requests to / go through the admission control of api.py, configured by the same variables but
+# POWERPLAN_ASYNC_MAX_CONCURRENCY, the requests handed to the pool at once, the others wait on the event loop
+admission_options = dict(config.admission_options(),
+                         max_in_flight=int(os.environ.get("POWERPLAN_ASYNC_MAX_CONCURRENCY", 2 * workers)))
+
+
+def create_app():
+    """Return the application and its solver pool. Worker processes log to the file of start_logging, if called before."""
+    if os.environ.get("POWERPLAN_ASYNC_EXECUTOR", "process") == "thread":
+        executor = ThreadPoolExecutor(workers)
+        init_solver(cache_options, coalesce_timeout)
+    else:
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=init_solver,
+                                       initargs=(cache_options, coalesce_timeout, worker_logging(),
+                                                 config.engine_settings()))
+
+    return PowerPlanASGI(executor,
+                         max_concurrency=admission_options["max_in_flight"],
+                         max_queue=admission_options["max_queue"],
+                         queue_timeout=admission_options["queue_timeout"],
+                         retry_after=config.retry_after(),
+                         max_body_size=int(os.environ.get("POWERPLAN_ASYNC_MAX_BODY_SIZE", 64 * 1024 * 1024)))
+
+
+if __name__ == '__main__':
+    start_logging("./log_file.log",
+                  level=logging.ERROR,
+                  fmt="%(asctime)s %(levelname)s %(name)s %(processName)s %(threadName)s : %(message)s",
+                  queue_size=log_queue_size)
+
+    asyncio.run(serve(create_app(), host='0.0.0.0', port=8888))
+else:
+    # served by another ASGI server, e.g. uvicorn asgi:app, which configures the logging of this process
+    app = create_app()
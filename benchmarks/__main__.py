@@ -0,0 +1,60 @@
+"""
+Run the stages and http benchmarks and save their results as JSON, to compare runs with benchmarks.compare.
+
+Run it from the project root with:
+    python -m benchmarks --output results.json [--sizes 10 100 1000] [--http-sizes 10 100] [--url http://...]
+"""
+import argparse
+import datetime
+import json
+import logging
+import platform
+import subprocess
+
+from benchmarks.bench_http import bench_http, DEFAULT_SIZES as DEFAULT_HTTP_SIZES
+from benchmarks.bench_stages import bench_stages, DEFAULT_SIZES
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench_results.json", help="the JSON file to write the results to")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES, help="fleet sizes of the stages")
+    parser.add_argument("--http-sizes", type=int, nargs="*", default=DEFAULT_HTTP_SIZES,
+                        help="fleet sizes of the http benchmark")
+    parser.add_argument("--url", help="url of a running server, the in process app is used otherwise")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    results = {
+        "metadata": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "stages": [],
+        "http": [],
+    }
+    for size in args.sizes:
+        results["stages"].extend(bench_stages(size, args.seed))
+        print(f"stages benchmarked for {size} powerplants")
+    for size in args.http_sizes:
+        results["http"].append(bench_http(size, url=args.url, seed=args.seed))
+        print(f"http benchmarked for {size} powerplants")
+
+    with open(args.output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Load test of a burst of distinct requests on /, each client giving up after a timeout, with and without admission
+control. Without it every request is solved, including those whose client gave up long ago; with it the queue is
+bounded and the requests carry their timeout in the X-Request-Timeout header, so that the server refuses or drops the
+work no one waits for anymore. The result cache is disabled so that every request is solved.
+
+Run it from the project root with:
+    python -m benchmarks.bench_admission
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+import api
+from benchmarks.bench_http import percentile
+from benchmarks.fleet_generator import generate_payload
+from power_plan.admission import TIMEOUT_HEADER, AdmissionController
+from power_plan.result_cache import ResultCache
+
+DEFAULT_BURSTS = (20, 100, 400)
+
+
+def post_burst(bodies, headers):
+    """Post every body from its own thread, all released together, return the status code and latency of each."""
+    barrier = threading.Barrier(len(bodies))
+    results = []
+
+    def post(body):
+        client = api.app.test_client()
+        barrier.wait()
+        start = time.perf_counter()
+        response = client.post('/', data=body, headers=headers)
+        results.append((response.status_code, time.perf_counter() - start))
+
+    threads = [threading.Thread(target=post, args=(body,)) for body in bodies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def bench_admission(count, timeout=1.0, size=2000, admission=True, max_queue=None, seed=0):
+    """
+    Parameters:
+        count (int): the number of requests of the burst
+        timeout (float): the seconds after which the clients give up waiting for their response
+        size (int): the number of powerplants of the posted payloads
+        admission (bool): whether the admission control bounds the queue and honours the timeout of the requests
+        max_queue (int): the number of requests waiting for a slot, 32 per core if None
+        seed (int): the seed of the payload generator
+    Returns:
+        result (dict): the number of requests answered in time, answered too late, refused and dropped, and the p50 and
+                        p99 latencies of the requests answered in time
+    """
+    data = generate_payload(size, seed)
+    bodies = [json.dumps(dict(data, load=data["load"] + i)) for i in range(count)]
+    headers = {"Content-Type": "application/json"}
+    if admission:
+        headers[TIMEOUT_HEADER] = str(timeout)
+        controller = AdmissionController(max_in_flight=os.cpu_count(),
+                                         max_queue=32 * os.cpu_count() if max_queue is None else max_queue)
+    else:
+        controller = AdmissionController(max_in_flight=count, max_queue=0)
+    default_admission, default_cache = api.admission, api.result_cache
+    api.admission, api.result_cache = controller, ResultCache(max_size=0, error_max_size=0)
+    try:
+        results = post_burst(bodies, headers)
+    finally:
+        api.admission, api.result_cache = default_admission, default_cache
+
+    in_time = sorted(latency for status, latency in results if status == 200 and latency <= timeout)
+    return {
+        "requests": count,
+        "admission": admission,
+        "in_time": len(in_time),
+        "late": sum(status == 200 and latency > timeout for status, latency in results),
+        "refused": sum(status == 503 for status, _ in results),
+        "dropped": sum(status == 504 for status, _ in results),
+        "p50_ms": percentile(in_time, 0.5) * 1000 if in_time else float("nan"),
+        "p99_ms": percentile(in_time, 0.99) * 1000 if in_time else float("nan"),
+    }
+
+
+def main(bursts=DEFAULT_BURSTS):
+    logging.disable(logging.ERROR)
+    print(f"{os.cpu_count()} cores, clients give up after 1 s")
+    print(f"{'requests':>8} {'admission':>9} {'in time':>8} {'late':>6} {'refused':>8} {'dropped':>8} "
+          f"{'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for count in bursts:
+        for admission in (False, True):
+            result = bench_admission(count, admission=admission)
+            print(f"{count:>8} {str(admission):>9} {result['in_time']:>8} {result['late']:>6} "
+                  f"{result['refused']:>8} {result['dropped']:>8} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Time the aggregated engine against the greedy one on fleets with more and more duplicated powerplants.
+
+Run it from the project root with:
+    python -m benchmarks.bench_aggregated
+"""
+import logging
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.aggregated import AggregatedPowerPlan
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_DUPLICATE_RATIOS = (0., 0.5, 0.9, 0.99)
+
+
+def run_time(engine, data, repeat=3):
+    """Return the shortest run time of an engine on a payload, and its plan or error message."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            result = engine(data).run()
+        except AlgorithmError as err:
+            result = err.args[0]
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(sizes=DEFAULT_SIZES, duplicate_ratios=DEFAULT_DUPLICATE_RATIOS):
+    logging.disable(logging.ERROR)
+    print(f"{'size':>8} {'duplicates':>11} {'groups':>7} {'greedy (ms)':>12} {'aggregated (ms)':>16} {'speedup':>8} "
+          f"{'same plan':>10}")
+    for size in sizes:
+        for duplicate_ratio in duplicate_ratios:
+            data = generate_payload(size, duplicate_ratio=duplicate_ratio)
+            groups = len(AggregatedPowerPlan(data).groups)
+            greedy, expected = run_time(PowerPlan, data)
+            aggregated, result = run_time(AggregatedPowerPlan, data)
+            print(f"{size:>8} {duplicate_ratio:>11.2f} {groups:>7} {greedy * 1000:>12.2f} {aggregated * 1000:>16.2f} "
+                  f"{greedy / aggregated:>7.1f}x {str(result == expected):>10}")
+
+
+if __name__ == '__main__':
+    main()
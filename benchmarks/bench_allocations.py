@@ -0,0 +1,50 @@
+"""
+Measure the memory allocated per solve of the powerplants dictionaries of a payload, against solving a shared fleet that
+is never copied.
+
+Run it from the project root with:
+    python -m benchmarks.bench_allocations
+"""
+import gc
+import time
+import tracemalloc
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.compact_fleet import CompactFleet
+from power_plan.powerplan import PowerPlan
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+def allocations(solve, solves):
+    """Return the peak memory allocated by a solve, averaged over solves, and the time per solve."""
+    peaks = 0
+    for _ in range(solves):
+        gc.collect()
+        tracemalloc.start()
+        solve()
+        peaks += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(solves):
+        solve()
+    return peaks / solves, (time.perf_counter() - start) / solves
+
+
+def main(size=1000, solves=50):
+    data = generate_payload(size)
+    compact = CompactFleet(data["powerplants"])
+    cases = {
+        "payload dictionaries": lambda: PowerPlan(data).run(),
+        "shared CompactFleet": lambda: PowerPlan(dict(data, powerplants=compact)).run(),
+        "vectorized, payload dictionaries": lambda: VectorizedPowerPlan(data).run(),
+        "vectorized, shared CompactFleet": lambda: VectorizedPowerPlan(dict(data, powerplants=compact)).run(),
+    }
+    print(f"{size} powerplants, {solves} solves")
+    for name, solve in cases.items():
+        peak, duration = allocations(solve, solves)
+        print(f"{name:34} peak {peak / 1024:8.1f} KiB allocated per solve, {duration * 1000:6.2f} ms per solve")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Load test of / on the Flask server of api.py against the asynchronous server of asgi.py: throughput and latency
+percentiles with 1, 50 and 500 concurrent clients, each client posting its requests one after the other on a new
+connection. Every request has its own load, so that no response comes from the result cache.
+
+Both servers are started in turn, as they are in production, on port 8888, which must be free. Run it from the
+project root with:
+    python -m benchmarks.bench_async_server
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_http import percentile
+from benchmarks.fleet_generator import generate_payload
+
+SERVERS = {"flask (api.py)": "api.py", "asyncio (asgi.py)": "asgi.py"}
+DEFAULT_CLIENTS = (1, 50, 500)
+HOST, PORT = "127.0.0.1", 8888
+
+
+def start_server(script, timeout=30):
+    """Start a server script of the project root and wait for it to accept connections."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # the server writes its log file in its working directory
+    process = subprocess.Popen([sys.executable, os.path.join(root, script)], cwd=tempfile.mkdtemp(),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, PORT), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{script} did not start listening on port {PORT}")
+
+
+async def post(body, timeout=60):
+    """Post a body on a new connection, return the response status code."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(HOST, PORT), timeout)
+    try:
+        writer.write(f"POST / HTTP/1.1\r\nHost: {HOST}:{PORT}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def load_test(bodies, clients):
+    """
+    Parameters:
+        bodies (list): the bodies to post, shared between the clients
+        clients (int): the number of clients posting concurrently
+    Returns:
+        result (dict): the number of requests and errors, the throughput and the p50 and p99 latencies
+    """
+    queue = list(reversed(bodies))
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        while queue:
+            body = queue.pop()
+            start = time.perf_counter()
+            try:
+                status = await post(body)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(bodies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000 if latencies else float("nan"),
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else float("nan"),
+    }
+
+
+def main(clients_counts=DEFAULT_CLIENTS, size=100, requests_per_client=4, min_requests=200):
+    data = generate_payload(size)
+    print(f"{size} powerplants per payload, {os.cpu_count()} cores")
+    print(f"{'server':>18} {'clients':>8} {'requests':>9} {'errors':>7} {'requests/s':>11} {'p50 (ms)':>9} "
+          f"{'p99 (ms)':>9}")
+    for name, script in SERVERS.items():
+        process = start_server(script)
+        try:
+            for clients in clients_counts:
+                count = max(min_requests, clients * requests_per_client)
+                bodies = [json.dumps(dict(data, load=data["load"] + i)).encode() for i in range(count)]
+                result = asyncio.run(load_test(bodies, clients))
+                print(f"{name:>18} {clients:>8} {result['requests']:>9} {result['errors']:>7} "
+                      f"{result['requests_per_second']:>11.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the throughput of the /batch resource with the one of N single posts on /.
+
+Run it from the project root with:
+    python -m benchmarks.bench_batch
+"""
+import json
+import logging
+import random
+import time
+
+from api import app
+from benchmarks.fleet_generator import generate_fuels
+
+FLEET = [
+    {"name": "gasfiredbig1", "type": "gasfired", "efficiency": 0.53, "pmin": 100, "pmax": 460},
+    {"name": "gasfiredbig2", "type": "gasfired", "efficiency": 0.53, "pmin": 100, "pmax": 460},
+    {"name": "gasfiredsomewhatsmaller", "type": "gasfired", "efficiency": 0.37, "pmin": 40, "pmax": 210},
+    {"name": "tj1", "type": "turbojet", "efficiency": 0.3, "pmin": 0, "pmax": 16},
+    {"name": "windpark1", "type": "windturbine", "efficiency": 1, "pmin": 0, "pmax": 150},
+    {"name": "windpark2", "type": "windturbine", "efficiency": 1, "pmin": 0, "pmax": 36},
+]
+
+
+def generate_payloads(n, seed=0):
+    """Generate n payloads sharing the same fleet, with random loads and fuel prices."""
+    rng = random.Random(seed)
+    return [{"load": rng.randint(100, 1000), "fuels": generate_fuels(rng), "powerplants": FLEET} for _ in range(n)]
+
+
+def bench_single_posts(client, payloads):
+    start = time.perf_counter()
+    for payload in payloads:
+        client.post('/', headers={"Content-Type": "application/json"}, data=json.dumps(payload))
+    return time.perf_counter() - start
+
+
+def bench_batch_post(client, payloads):
+    start = time.perf_counter()
+    client.post('/batch', headers={"Content-Type": "application/json"}, data=json.dumps(payloads))
+    return time.perf_counter() - start
+
+
+def main():
+    # failing scenarios are logged, which would otherwise flood the output
+    logging.disable(logging.ERROR)
+    client = app.test_client()
+    print(f"{'N':>8} {'single posts (items/s)':>24} {'batch post (items/s)':>22} {'speedup':>8}")
+    for n in (1, 100, 10000):
+        payloads = generate_payloads(n)
+        single = bench_single_posts(client, payloads)
+        batch = bench_batch_post(client, payloads)
+        print(f"{n:>8} {n / single:>24.0f} {n / batch:>22.0f} {single / batch:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Load test of a burst of identical requests arriving together on /, with and without single-flight coalescing. The
+result cache is disabled so that only the coalescing is measured: without it every request of the burst is solved.
+
+Run it from the project root with:
+    python -m benchmarks.bench_burst
+"""
+import json
+import logging
+import threading
+import time
+
+import api
+from benchmarks.fleet_generator import generate_payload
+from power_plan.result_cache import ResultCache
+from power_plan.single_flight import SingleFlight
+
+DEFAULT_BURSTS = (10, 50, 200)
+
+
+def post_burst(body, count):
+    """Post body count times from count threads released together, return the responses status codes."""
+    barrier = threading.Barrier(count)
+    status_codes = []
+
+    def post():
+        client = api.app.test_client()
+        barrier.wait()
+        response = client.post('/', data=body, headers={"Content-Type": "application/json"})
+        status_codes.append(response.status_code)
+
+    threads = [threading.Thread(target=post) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return status_codes
+
+
+def bench_burst(count, size=10000, coalesce=True, seed=0):
+    """
+    Parameters:
+        count (int): the number of identical requests of the burst
+        size (int): the number of powerplants of the posted payload
+        coalesce (bool): whether identical requests in flight are coalesced
+        seed (int): the seed of the payload generator
+    Returns:
+        result (dict): the burst size, the CPU and wall time of the burst and the number of payloads solved
+    """
+    body = json.dumps(generate_payload(size, seed))
+    single_flight = SingleFlight(timeout=60) if coalesce else None
+    default_cache = api.result_cache
+    api.result_cache = ResultCache(max_size=0, error_max_size=0, single_flight=single_flight)
+    try:
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        status_codes = post_burst(body, count)
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    finally:
+        api.result_cache = default_cache
+    assert status_codes == [200] * count
+    return {
+        "requests": count,
+        "coalesce": coalesce,
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+        "solved": count - single_flight.shared if coalesce else count,
+    }
+
+
+def main(bursts=DEFAULT_BURSTS):
+    logging.disable(logging.ERROR)
+    print(f"{'requests':>8} {'coalesce':>8} {'cpu (s)':>8} {'wall (s)':>8} {'solved':>7}")
+    for count in bursts:
+        for coalesce in (False, True):
+            result = bench_burst(count, coalesce=coalesce)
+            print(f"{count:>8} {str(coalesce):>8} {result['cpu_seconds']:>8.2f} {result['wall_seconds']:>8.2f} "
+                  f"{result['solved']:>7}")
+
+
+if __name__ == '__main__':
+    main()
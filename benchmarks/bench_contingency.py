@@ -0,0 +1,41 @@
+"""
+Time the N-1 contingency analysis of a fleet against solving the fleet with each powerplant removed in turn.
+
+Run it from the project root with:
+    python -m benchmarks.bench_contingency
+"""
+import logging
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.contingency import ContingencyAnalysis
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+
+DEFAULT_SIZES = (100, 1000, 10000)
+
+
+def main(sizes=DEFAULT_SIZES, sampled=20):
+    logging.disable(logging.ERROR)
+    print(f"{'size':>8} {'contingency (ms)':>17} {'infeasible':>11} {'PowerPlan per outage (ms)':>26} "
+          f"{'PowerPlan all outages (s)':>26}")
+    for size in sizes:
+        data = generate_payload(size)
+        start = time.perf_counter()
+        response = ContingencyAnalysis.from_payload(data).run()
+        contingency = time.perf_counter() - start
+        infeasible = sum(not outage["feasible"] for outage in response["outages"])
+
+        start = time.perf_counter()
+        for i in range(sampled):
+            try:
+                PowerPlan(dict(data, powerplants=data["powerplants"][:i] + data["powerplants"][i + 1:])).run()
+            except AlgorithmError:
+                pass
+        per_outage = (time.perf_counter() - start) / sampled
+        print(f"{size:>8} {contingency * 1000:>17.1f} {infeasible:>11} {per_outage * 1000:>26.2f} "
+              f"{per_outage * size:>26.2f}")
+
+
+if __name__ == '__main__':
+    main()
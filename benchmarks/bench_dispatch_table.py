@@ -0,0 +1,73 @@
+"""
+Build the dispatch table of a 2000 powerplants fleet of about 30 GW, and compare its lookups with PowerPlan.
+
+Run it from the project root with:
+    python -m benchmarks.bench_dispatch_table
+"""
+import logging
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.dispatch_table import DispatchTable
+from power_plan.powerplan import PowerPlan
+
+
+def generate_scaled_payload(size, capacity, seed=0):
+    """Generate a payload whose pmin and pmax are scaled for the fleet to total capacity MW."""
+    data = generate_payload(size, seed)
+    scale = capacity / sum(pp["pmax"] for pp in data["powerplants"])
+    for pp in data["powerplants"]:
+        pp["pmax"] = max(1, round(pp["pmax"] * scale))
+        pp["pmin"] = min(pp["pmax"], round(pp["pmin"] * scale))
+    return data
+
+
+def solve(solver, load):
+    try:
+        return solver(load)
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+def best_time(function, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(size=2000, capacity=30000, lookups=1000):
+    logging.disable(logging.ERROR)
+    data = generate_scaled_payload(size, capacity)
+    build = best_time(lambda: DispatchTable.from_payload(data))
+    dispatch_table = DispatchTable.from_payload(data)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fleet.table")
+        save = best_time(lambda: dispatch_table.save(path))
+        file_size = os.path.getsize(path)
+        opened = DispatchTable.open(path)
+
+        rng = random.Random(0)
+        loads = [rng.randint(0, opened.capacity) for _ in range(lookups)]
+        locate = best_time(lambda: [opened.table[load].tolist() for load in loads]) / lookups
+        dispatch = best_time(lambda: [solve(opened.dispatch, load) for load in loads[:100]]) / 100
+        power_plan = best_time(
+            lambda: [solve(lambda load: PowerPlan(dict(data, load=load)).run(), load) for load in loads[:10]], 1) / 10
+        unfilled = int((opened.table[:, 0] < 0).sum())
+
+    print(f"{size} powerplants, {opened.capacity} MW available, {len(opened.table)} loads, "
+          f"{unfilled} the algorithm can't fill")
+    print(f"build: {build * 1000:.1f} ms, save: {save * 1000:.1f} ms, file: {file_size / 1024:.0f} KiB")
+    print(f"row lookup: {locate * 1e6:.2f} us, dispatch from the table: {dispatch * 1000:.3f} ms, "
+          f"PowerPlan.run: {power_plan * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Load test of an error storm on /: a client posting the same malformed payload again and again, logged synchronously to
+a file for every error, as with logging.basicConfig, against the queue written by a background thread and the sampling
+of identical errors of power_plan/error_log.py. The result cache is disabled so that every request is checked and
+its error logged.
+
+Run it from the project root with:
+    python -m benchmarks.bench_error_log
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import time
+
+import api
+from benchmarks.fleet_generator import generate_payload
+from power_plan.error_catcher_functions import report_error, sanity_check
+from power_plan.error_log import ERROR_LOG, start_logging
+from power_plan.result_cache import ResultCache
+
+DEFAULT_STORMS = (1000, 10000)
+
+
+def malformed_payload(size, seed=0):
+    """Return a payload of size powerplants whose last powerplant has an efficiency out of [0, 1]."""
+    data = generate_payload(size, seed)
+    data["powerplants"][-1]["efficiency"] = 2
+    return data
+
+
+def bench_error_log(count, size=20, sampled=True):
+    """
+    Parameters:
+        count (int): the number of malformed requests of the storm
+        size (int): the number of powerplants of the posted payload
+        sampled (bool): whether the errors go through the logging queue and are sampled, or are all written at once
+    Returns:
+        result (dict): the number of requests, the requests per second, the time spent reporting one error and the size
+                        of the log file written
+    """
+    data = malformed_payload(size)
+    body = json.dumps(data)
+    filename = os.path.join(tempfile.mkdtemp(), "log_file.log")
+    root = logging.getLogger()
+    default_handlers, default_level = root.handlers, root.level
+    default_burst, default_interval = ERROR_LOG.burst, ERROR_LOG.interval
+    default_cache = api.result_cache
+    api.result_cache = ResultCache(max_size=0, error_max_size=0)
+    listener = None
+    if sampled:
+        listener = start_logging(filename)
+    else:
+        root.handlers, root.level = [logging.FileHandler(filename)], logging.ERROR
+        ERROR_LOG.interval = 0
+    client = api.app.test_client()
+    try:
+        start = time.perf_counter()
+        for _ in range(count):
+            client.post('/', data=body, headers={"Content-Type": "application/json"})
+        elapsed = time.perf_counter() - start
+        err = ValueError(sanity_check(data)["error"])
+        start = time.perf_counter()
+        for _ in range(count):
+            report_error(err, "bench_error_log")
+        report_error_seconds = (time.perf_counter() - start) / count
+        if listener is not None:
+            atexit.unregister(listener.stop)
+            listener.stop()
+    finally:
+        for handler in root.handlers:
+            handler.close()
+        root.handlers, root.level = default_handlers, default_level
+        ERROR_LOG.burst, ERROR_LOG.interval = default_burst, default_interval
+        api.result_cache = default_cache
+    return {
+        "requests": count,
+        "sampled": sampled,
+        "requests_per_second": count / elapsed,
+        "report_error_us": report_error_seconds * 1e6,
+        "log_bytes": os.path.getsize(filename),
+    }
+
+
+def main(storms=DEFAULT_STORMS):
+    print(f"{'requests':>8} {'sampled':>8} {'requests/s':>11} {'report_error (µs)':>18} {'log (bytes)':>12}")
+    for count in storms:
+        for sampled in (False, True):
+            result = bench_error_log(count, sampled=sampled)
+            print(f"{count:>8} {str(sampled):>8} {result['requests_per_second']:>11.1f} "
+                  f"{result['report_error_us']:>18.1f} {result['log_bytes']:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+End-to-end benchmark of the / resource: request throughput and latency percentiles.
+
+By default requests go through the Flask test client, in process. Pass the url of a running server to measure it
+instead:
+    python -m benchmarks.bench_http http://127.0.0.1:8888/
+"""
+import json
+import sys
+import time
+import urllib.request
+
+from benchmarks.fleet_generator import generate_payload
+
+DEFAULT_SIZES = (10, 100, 1000)
+
+
+def percentile(sorted_values, share):
+    return sorted_values[min(len(sorted_values) - 1, int(share * len(sorted_values)))]
+
+
+def make_post(url=None):
+    """Return a function posting a JSON body to the server at url, or to the in process app if url is None."""
+    if url is None:
+        from api import app
+        client = app.test_client()
+        return lambda body: client.post('/', headers={"Content-Type": "application/json"}, data=body).get_data()
+
+    def post(body):
+        http_request = urllib.request.Request(url, data=body.encode(), headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(http_request) as response:
+            return response.read()
+    return post
+
+
+def bench_http(size, requests=200, url=None, seed=0):
+    """
+    Parameters:
+        size (int): the number of powerplants of the posted payload
+        requests (int): the number of requests sent one after the other
+        url (str): the url of a running server, the in process app if None
+        seed (int): the seed of the payload generator
+    Returns:
+        result (dict): the size, the number of requests, the throughput and the p50 and p99 latencies
+    """
+    post = make_post(url)
+    body = json.dumps(generate_payload(size, seed))
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        post(body)
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "size": size,
+        "requests": requests,
+        "requests_per_second": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(sizes=DEFAULT_SIZES, url=None):
+    print(f"{'size':>8} {'requests/s':>11} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for size in sizes:
+        result = bench_http(size, url=url)
+        print(f"{size:>8} {result['requests_per_second']:>11.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main(url=sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,61 @@
+"""
+Time keeping the merit order of a fleet up to date over a year of hourly fuels prices, repairing it with a
+KineticMeritOrder against sorting the fleet again every hour.
+
+Run it from the project root with:
+    python -m benchmarks.bench_kinetic_order
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.kinetic_order import KineticMeritOrder
+from power_plan.powerplan import Fuels
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+def hourly_fuels(hours, seed=0):
+    """
+    Return gas, kerosine and co2 prices drifting hour after hour, gas following a daily cycle. Kerosine is cheap
+    enough for the costs of turbojets to cross the costs of gas-fired powerplants.
+    """
+    rng = random.Random(seed)
+    gas, kerosine, co2 = 20., 12., 30.
+    fuels = []
+    for hour in range(hours):
+        gas = max(1., gas + rng.gauss(0, 0.1))
+        kerosine = max(1., kerosine + rng.gauss(0, 0.05))
+        co2 = max(0., co2 + rng.gauss(0, 0.2))
+        fuels.append(Fuels({"gas(euro/MWh)": gas * (1 + 0.1 * math.sin(2 * math.pi * hour / 24)),
+                            "kerosine(euro/MWh)": kerosine, "co2(euro/ton)": co2, "wind(%)": 50}))
+    return fuels
+
+
+def main(sizes=(1000, 10000, 100000), hours=8760):
+    fuels = hourly_fuels(hours)
+    for size in sizes:
+        power_plan = VectorizedPowerPlan(generate_payload(size))
+        merit_order = KineticMeritOrder()
+        full_sort = kinetic = 0
+        for hour_fuels in fuels:
+            power_plan.fuels = hour_fuels
+            costs = power_plan.estimate_costs()
+
+            start = time.perf_counter()
+            sorted_order = np.argsort(costs, kind="stable")
+            full_sort += time.perf_counter() - start
+
+            start = time.perf_counter()
+            order = merit_order.update(costs)
+            kinetic += time.perf_counter() - start
+            assert np.array_equal(order, sorted_order)
+
+        print(f"{size} powerplants, {hours} hours: full re-sort {full_sort:.2f} s, kinetic {kinetic:.2f} s "
+              f"({merit_order.repair_count} repairs, {merit_order.sort_count} sorts), {full_sort / kinetic:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
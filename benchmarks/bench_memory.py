@@ -0,0 +1,41 @@
+"""
+Measure the memory taken per powerplant by the fleet representations.
+
+Run it from the project root with:
+    python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.compact_fleet import CompactFleet
+from power_plan.powerplan import Powerplant
+from power_plan.vectorized import FleetColumns
+
+
+def allocated_bytes(build, *args):
+    """Return the memory still allocated by the object built by build(*args), and the object."""
+    gc.collect()
+    tracemalloc.start()
+    built = build(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, built
+
+
+def main(n=100000):
+    powerplants = generate_payload(n)["powerplants"]
+    objects_size, _ = allocated_bytes(lambda: [Powerplant(pp_dict) for pp_dict in powerplants])
+    compact_size, fleet = allocated_bytes(CompactFleet, powerplants)
+    views_size, _ = allocated_bytes(fleet.views)
+    columns_size, _ = allocated_bytes(FleetColumns.from_compact, fleet)
+
+    print(f"{n} powerplants, names excluded as they are shared with the payload")
+    print(f"Powerplant objects:  {objects_size / n:6.1f} bytes per powerplant")
+    print(f"CompactFleet:        {compact_size / n:6.1f} bytes per powerplant")
+    print(f"+ PowerplantView:    {views_size / n:6.1f} bytes per powerplant")
+    print(f"+ FleetColumns view: {columns_size / n:6.1f} bytes per powerplant")
+
+
+if __name__ == '__main__':
+    main()
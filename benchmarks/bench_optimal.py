@@ -0,0 +1,99 @@
+"""
+Time the optimal engine against the greedy one by fleet size, and compare it with a brute force search on small fleets.
+
+Run it from the project root with:
+    python -m benchmarks.bench_optimal
+"""
+import itertools
+import logging
+import random
+import time
+
+import numpy as np
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.optimal import OptimalPowerPlan
+from power_plan.powerplan import PowerPlan
+
+DEFAULT_SIZES = (10, 100, 300, 1000, 10000)
+
+
+def run_time(engine, data, repeat=3):
+    """Return the shortest run time of an engine on a payload, and whether it filled the load."""
+    timings = []
+    filled = True
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            engine(data).run()
+        except AlgorithmError:
+            filled = False
+        timings.append(time.perf_counter() - start)
+    return min(timings), filled
+
+
+def brute_force_cost(data):
+    """Return the minimal cost of the payload over every combination of productions, None if there is none."""
+    plan = OptimalPowerPlan(data)
+    pmin, pmax, costs = plan.fleet.pmin.tolist(), plan.estimate_available_power().tolist(), plan.estimate_costs()
+    productions = [[0] + list(range(max(low, 1), high + 1)) if low <= high else [0] for low, high in zip(pmin, pmax)]
+    return min((costs @ np.array(production) for production in itertools.product(*productions)
+                if sum(production) == data["load"]), default=None)
+
+
+def optimal_cost(data):
+    plan = OptimalPowerPlan(data)
+    costs = dict(zip(plan.fleet.names, plan.estimate_costs().tolist()))
+    return sum(costs[pp["name"]] * pp["p"] for pp in plan.run())
+
+
+def compare_with_brute_force(fleets=500, seed=0):
+    """
+    Solve small random fleets with every load, with pmin high enough for the greedy algorithm to fail often.
+
+    Returns:
+        result (dict): the number of payloads, of payloads with a plan, of them the greedy engine failed on, and of
+                        differences between the optimal engine and the brute force search
+    """
+    rng = random.Random(seed)
+    result = {"payloads": 0, "solvable": 0, "greedy_failed": 0, "mismatches": 0}
+    for _ in range(fleets):
+        powerplants = []
+        for i in range(rng.randint(2, 5)):
+            pmax = rng.randint(1, 8)
+            powerplants.append({"name": f"gasfired{i}", "type": "gasfired", "efficiency": rng.uniform(0.3, 0.6),
+                                "pmin": rng.randint(0, pmax), "pmax": pmax})
+        fuels = {"gas(euro/MWh)": 13.4, "kerosine(euro/MWh)": 50.8, "co2(euro/ton)": 20, "wind(%)": 60}
+        for load in range(1, sum(pp["pmax"] for pp in powerplants) + 1):
+            data = {"load": load, "fuels": fuels, "powerplants": powerplants}
+            expected_cost = brute_force_cost(data)
+            result["payloads"] += 1
+            if expected_cost is None:
+                continue
+            result["solvable"] += 1
+            try:
+                PowerPlan(data).run()
+            except AlgorithmError:
+                result["greedy_failed"] += 1
+            if abs(optimal_cost(data) - expected_cost) > 1e-6:
+                result["mismatches"] += 1
+    return result
+
+
+def main(sizes=DEFAULT_SIZES):
+    logging.disable(logging.ERROR)
+    print(f"{'size':>8} {'load':>9} {'greedy (ms)':>12} {'filled':>7} {'optimal (ms)':>13}")
+    for size in sizes:
+        data = generate_payload(size)
+        greedy, filled = run_time(PowerPlan, data)
+        optimal, _ = run_time(OptimalPowerPlan, data)
+        print(f"{size:>8} {data['load']:>9} {greedy * 1000:>12.2f} {str(filled):>7} {optimal * 1000:>13.2f}")
+
+    result = compare_with_brute_force()
+    print(f"brute force: {result['payloads']} payloads, {result['solvable']} with a plan, "
+          f"{result['greedy_failed']} of them failed by the greedy engine, {result['mismatches']} mismatches")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Measure how the ParallelSolver scales with its number of workers on a sweep of scenarios sharing the same fleet.
+
+Run it from the project root with:
+    python -m benchmarks.bench_parallel
+"""
+import logging
+import os
+import random
+import time
+
+from benchmarks.bench_batch import FLEET
+from benchmarks.fleet_generator import generate_fuels
+from power_plan.parallel import ParallelSolver, solve_items
+
+
+def generate_scenarios(n, seed=0):
+    """Generate n scenarios with random loads and fuel prices."""
+    rng = random.Random(seed)
+    return [{"load": rng.randint(100, 1000), "fuels": generate_fuels(rng)} for _ in range(n)]
+
+
+def main(n=100000):
+    logging.disable(logging.ERROR)
+    shared_data = {"powerplants": FLEET}
+    scenarios = generate_scenarios(n)
+
+    start = time.perf_counter()
+    expected = solve_items(shared_data, scenarios)
+    serial = time.perf_counter() - start
+    print(f"{os.cpu_count()} cores, {n} scenarios")
+    print(f"{'workers':>8} {'time (s)':>9} {'scenarios/s':>12} {'speedup':>8}")
+    print(f"{'serial':>8} {serial:>9.2f} {n / serial:>12.0f} {1:>8.2f}")
+
+    for workers in (1, 2, 4, 8):
+        solver = ParallelSolver(max_workers=workers)
+        start = time.perf_counter()
+        results = solver.solve(shared_data, scenarios)
+        elapsed = time.perf_counter() - start
+        assert results == expected
+        print(f"{workers:>8} {elapsed:>9.2f} {n / elapsed:>12.0f} {serial / elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
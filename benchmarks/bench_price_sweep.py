@@ -0,0 +1,46 @@
+"""
+Time the price sweep engine on a grid of gas, kerosine and co2 prices against solving every grid point one after the
+other with the vectorized engine.
+
+Run it from the project root with:
+    python -m benchmarks.bench_price_sweep
+"""
+import itertools
+import logging
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.price_sweep import SWEPT_PRICES, PriceSweepPlan
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+def main(size=1000, num=21, sampled=100):
+    logging.disable(logging.ERROR)
+    data = generate_payload(size)
+    data["sweep"] = {"gas(euro/MWh)": {"start": 5, "stop": 60, "num": num},
+                     "kerosine(euro/MWh)": {"start": 30, "stop": 100, "num": num},
+                     "co2(euro/ton)": {"start": 0, "stop": 100, "num": num}}
+
+    start = time.perf_counter()
+    plan = PriceSweepPlan(data)
+    response = plan.run()
+    price_sweep = time.perf_counter() - start
+    grid_points = len(response["plan_index"])
+
+    start = time.perf_counter()
+    for prices in itertools.islice(itertools.product(*response["axes"].values()), sampled):
+        try:
+            VectorizedPowerPlan(dict(data, fuels=dict(data["fuels"], **dict(zip(SWEPT_PRICES, prices))))).run()
+        except AlgorithmError:
+            pass
+    one_by_one = (time.perf_counter() - start) / sampled * grid_points
+
+    print(f"{size} powerplants, {grid_points} grid points, {plan.dispatch_count} merit orders dispatched, "
+          f"{len(response['plans'])} distinct plans")
+    print(f"price sweep: {price_sweep:.2f} s, vectorized engine one by one (extrapolated from {sampled} points): "
+          f"{one_by_one:.2f} s, {one_by_one / price_sweep:.1f}x slower")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Latency of a DispatchSession update after a 1 MW load change, against full solves, on a 10000 powerplants fleet.
+
+Run it from the project root with:
+    python -m benchmarks.bench_session
+"""
+import logging
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.powerplan import PowerPlan
+from power_plan.session import DispatchSession
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+def mean_time(function, loads):
+    start = time.perf_counter()
+    for load in loads:
+        function(load)
+    return (time.perf_counter() - start) / len(loads)
+
+
+def main(size=10000, steps=200):
+    logging.disable(logging.ERROR)
+    data = generate_payload(size)
+    loads = [data["load"] + (step % 2) for step in range(steps)]
+
+    session = DispatchSession(data)
+    update = mean_time(session.update, loads)
+    greedy = mean_time(lambda load: PowerPlan(dict(data, load=load)).run(), loads[:5])
+    vectorized = mean_time(lambda load: VectorizedPowerPlan(dict(data, load=load)).run(), loads[:20])
+
+    print(f"{size} powerplants, load {data['load']} MW changing by 1 MW")
+    print(f"session update: {update * 1e6:.1f} us, PowerPlan.run: {greedy * 1000:.2f} ms, "
+          f"VectorizedPowerPlan.run: {vectorized * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
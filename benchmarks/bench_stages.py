@@ -0,0 +1,87 @@
+"""
+Time every stage of a solve separately, on generated fleets of increasing size.
+
+Run it from the project root with:
+    python -m benchmarks.bench_stages
+"""
+import json
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.incoming_data_check import perform_sanity_check
+from power_plan.powerplan import PowerPlan
+from power_plan.vectorized import VectorizedPowerPlan
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+
+def best_time(stage, setup, repeat):
+    """
+    Parameters:
+        stage (function): the stage to time, called with the result of setup
+        setup (function): builds the input of the stage, it is not timed
+        repeat (int): the number of runs
+    Returns:
+        seconds (float): the shortest run time
+    """
+    timings = []
+    for _ in range(repeat):
+        stage_input = setup()
+        start = time.perf_counter()
+        try:
+            stage(stage_input)
+        except AlgorithmError:
+            pass
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def sorted_power_plan(data):
+    power_plan = PowerPlan(data)
+    power_plan.sort_by_merit_order()
+    return power_plan
+
+
+def dispatched_power_plan(data):
+    power_plan = sorted_power_plan(data)
+    try:
+        power_plan.update_powerplants_production()
+    except AlgorithmError:
+        pass
+    return power_plan
+
+
+def bench_stages(size, seed=0, repeat=5):
+    """
+    Parameters:
+        size (int): the number of powerplants of the generated payload
+        seed (int): the seed of the payload generator
+        repeat (int): the number of runs of every stage
+    Returns:
+        results (list): a dict with the size, stage and shortest run time of every stage
+    """
+    data = generate_payload(size, seed)
+    response = dispatched_power_plan(data).generate_response()
+    stages = {
+        "sanity_check": (perform_sanity_check, lambda: data),
+        "parse": (PowerPlan, lambda: data),
+        "sort_by_merit_order": (PowerPlan.sort_by_merit_order, lambda: PowerPlan(data)),
+        "update_powerplants_production": (PowerPlan.update_powerplants_production, lambda: sorted_power_plan(data)),
+        "generate_response": (PowerPlan.generate_response, lambda: dispatched_power_plan(data)),
+        "serialization": (json.dumps, lambda: response),
+        "vectorized_run": (lambda payload_data: VectorizedPowerPlan(payload_data).run(), lambda: data),
+    }
+    return [{"size": size, "stage": stage_name, "seconds": best_time(stage, setup, repeat)}
+            for stage_name, (stage, setup) in stages.items()]
+
+
+def main(sizes=DEFAULT_SIZES):
+    print(f"{'size':>8} {'stage':<32} {'ms':>10}")
+    for size in sizes:
+        for result in bench_stages(size):
+            print(f"{result['size']:>8} {result['stage']:<32} {result['seconds'] * 1000:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
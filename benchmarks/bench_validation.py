@@ -0,0 +1,45 @@
+"""
+Compare the validation of a large fleet by the interpreted rules tables and by the compiled checks.
+
+Run it from the project root with:
+    python -m benchmarks.bench_validation
+"""
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.incoming_data_check import check_json_layer, perform_sanity_check, type_checking, \
+    first_layer_keys_and_values_type_and_interval, fuels_layer_keys_values_type_and_interval, \
+    powerplants_layer_keys_and_values_type_and_interval
+
+
+def interpreted_sanity_check(data):
+    """perform_sanity_check as it was before the rules tables were compiled."""
+    type_checking(data, dict)
+    type_checking(data["load"], (int, float))
+    check_json_layer(data, first_layer_keys_and_values_type_and_interval)
+    check_json_layer(data["fuels"], fuels_layer_keys_values_type_and_interval)
+    type_checking(data["powerplants"], list)
+    for pp_dict in data["powerplants"]:
+        check_json_layer(pp_dict, powerplants_layer_keys_and_values_type_and_interval)
+
+
+def best_of(function, data, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(n=50000):
+    data = generate_payload(n)
+    interpreted = best_of(interpreted_sanity_check, data)
+    compiled = best_of(perform_sanity_check, data)
+    print(f"{n} powerplants")
+    print(f"interpreted: {interpreted * 1000:8.1f} ms")
+    print(f"compiled:    {compiled * 1000:8.1f} ms ({interpreted / compiled:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Time the wind scenarios engine against solving every scenario one after the other with PowerPlan and the vectorized
+engine.
+
+Run it from the project root with:
+    python -m benchmarks.bench_wind_scenarios
+"""
+import logging
+import time
+
+from benchmarks.fleet_generator import generate_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+from power_plan.vectorized import VectorizedPowerPlan
+from power_plan.wind_scenarios import WindScenarioPlan, draw_wind_scenarios
+
+
+def solve_one_by_one(engine, data, winds):
+    for wind in winds:
+        try:
+            engine(dict(data, fuels=dict(data["fuels"], **{"wind(%)": wind}))).run()
+        except AlgorithmError:
+            pass
+
+
+def main(size=1000, scenarios=10000, sampled=100):
+    logging.disable(logging.ERROR)
+    data = generate_payload(size)
+    distribution = {"type": "normal", "mean": 50, "std": 25, "count": scenarios}
+    winds = draw_wind_scenarios(distribution, 1)[:sampled, 0].tolist()
+
+    start = time.perf_counter()
+    response = WindScenarioPlan(dict(data, wind_distribution=distribution)).run()
+    wind_scenarios = time.perf_counter() - start
+    timings = {}
+    for name, engine in (("PowerPlan", PowerPlan), ("vectorized", VectorizedPowerPlan)):
+        start = time.perf_counter()
+        solve_one_by_one(engine, data, winds)
+        timings[name] = (time.perf_counter() - start) / sampled * scenarios
+
+    print(f"{size} powerplants, {scenarios} wind scenarios, {response['solved']} solved, "
+          f"expected cost {response['cost']['mean']:.0f}")
+    print(f"wind scenarios engine: {wind_scenarios:.2f} s")
+    for name, timing in timings.items():
+        print(f"{name} one by one (extrapolated from {sampled} scenarios): {timing:.2f} s, "
+              f"{timing / wind_scenarios:.0f}x slower")
+
+
+if __name__ == '__main__':
+    main()
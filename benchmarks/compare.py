@@ -0,0 +1,40 @@
+"""
+Compare two results files written by `python -m benchmarks`.
+
+Run it from the project root with:
+    python -m benchmarks.compare baseline.json results.json
+"""
+import json
+import sys
+
+
+def load_timings(path):
+    """Return the timings of a results file, keyed by benchmark, in seconds."""
+    with open(path) as results_file:
+        results = json.load(results_file)
+    timings = {("stage", result["size"], result["stage"]): result["seconds"] for result in results["stages"]}
+    for result in results["http"]:
+        timings[("http p50", result["size"], "")] = result["p50_ms"] / 1000
+        timings[("http p99", result["size"], "")] = result["p99_ms"] / 1000
+    return timings
+
+
+def compare(baseline_path, results_path):
+    """
+    Returns:
+        rows (list): (kind, size, stage, baseline seconds, new seconds, new / baseline) for the benchmarks of both files
+    """
+    baseline = load_timings(baseline_path)
+    results = load_timings(results_path)
+    return [key + (baseline[key], results[key], results[key] / baseline[key] if baseline[key] else float("inf"))
+            for key in sorted(baseline.keys() & results.keys())]
+
+
+def main(baseline_path, results_path):
+    print(f"{'benchmark':<10} {'size':>8} {'stage':<32} {'baseline ms':>12} {'new ms':>10} {'ratio':>7}")
+    for kind, size, stage, old, new, ratio in compare(baseline_path, results_path):
+        print(f"{kind:<10} {size:>8} {stage:<32} {old * 1000:>12.3f} {new * 1000:>10.3f} {ratio:>7.2f}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:3])
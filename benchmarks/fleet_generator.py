@@ -0,0 +1,77 @@
+"""
+Seeded generator of synthetic fleets and payloads, the same seed always giving the same fleet.
+"""
+import random
+
+# (share of the fleet, efficiency range, pmax range, pmin as a share of pmax range)
+POWERPLANT_TYPES = {
+    "gasfired": (0.45, (0.35, 0.6), (100, 800), (0.2, 0.5)),
+    "turbojet": (0.15, (0.25, 0.35), (10, 60), (0, 0)),
+    "windturbine": (0.40, (1, 1), (5, 300), (0, 0)),
+}
+
+
+def generate_powerplant(rng, name):
+    """Generate a powerplant of a random type, with realistic efficiency, pmin and pmax for its type."""
+    pp_type = rng.choices(list(POWERPLANT_TYPES), weights=[share for share, *_ in POWERPLANT_TYPES.values()])[0]
+    _, efficiency_range, pmax_range, pmin_share_range = POWERPLANT_TYPES[pp_type]
+    pmax = rng.randint(*pmax_range)
+    return {
+        "name": name,
+        "type": pp_type,
+        "efficiency": round(rng.uniform(*efficiency_range), 2),
+        "pmin": int(pmax * rng.uniform(*pmin_share_range)),
+        "pmax": pmax,
+    }
+
+
+def generate_fleet(size, seed=0, duplicate_ratio=0.3):
+    """
+    Generate a fleet of powerplants of mixed types.
+
+    Parameters:
+        size (int): the number of powerplants
+        seed (int): the seed of the random generator
+        duplicate_ratio (float): the share of powerplants that are identical copies of another one but for their name,
+            as fleets often have many units of the same model
+    Returns:
+        powerplants (list): the powerplants dictionaries
+    """
+    rng = random.Random(seed)
+    powerplants = []
+    for i in range(size):
+        if powerplants and rng.random() < duplicate_ratio:
+            powerplants.append(dict(rng.choice(powerplants), name=f"pp{i}"))
+        else:
+            powerplants.append(generate_powerplant(rng, f"pp{i}"))
+    return powerplants
+
+
+def generate_fuels(rng):
+    """Generate fuels prices and wind percentage."""
+    return {
+        "gas(euro/MWh)": round(rng.uniform(5, 30), 1),
+        "kerosine(euro/MWh)": round(rng.uniform(30, 80), 1),
+        "co2(euro/ton)": rng.randint(0, 50),
+        "wind(%)": rng.randint(0, 100),
+    }
+
+
+def generate_payload(size, seed=0, load_ratio=0.5, duplicate_ratio=0.3):
+    """
+    Generate a payload whose load is a share of the available capacity of its fleet.
+
+    Parameters:
+        size (int): the number of powerplants
+        seed (int): the seed of the random generator
+        load_ratio (float): the load as a share of the fleet capacity, wind turbines being derated
+        duplicate_ratio (float): see generate_fleet
+    Returns:
+        payload (dict): a dictionary containing load, fuels and powerplants as keys
+    """
+    rng = random.Random(seed)
+    powerplants = generate_fleet(size, seed, duplicate_ratio)
+    fuels = generate_fuels(rng)
+    capacity = sum(pp["pmax"] * fuels["wind(%)"] // 100 if pp["type"] == "windturbine" else pp["pmax"]
+                   for pp in powerplants)
+    return {"load": int(capacity * load_ratio), "fuels": fuels, "powerplants": powerplants}
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from time import monotonic
+
+from power_plan.custom_exceptions import AdmissionRejected, DeadlineExceeded
+from power_plan.deadline import deadline_scope
+from power_plan.metrics import METRICS, Counter, Gauge
+
+# seconds the client gives the server to answer, from the moment the request arrives
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+QUEUE_DEPTH = METRICS.register(Gauge(
+    "powerplan_admission_queue_depth", "Requests waiting for a slot to be solved."))
+IN_FLIGHT = METRICS.register(Gauge(
+    "powerplan_admission_in_flight", "Requests being solved."))
+REJECTIONS = METRICS.register(Counter(
+    "powerplan_admission_rejections_total", "Requests refused by the admission control, per reason.", ("reason",)))
+EXPIRED = METRICS.register(Counter(
+    "powerplan_deadline_expired_total", "Requests dropped because their deadline expired, per stage not started.",
+    ("stage",)))
+
+
+def request_deadline(headers, now=None):
+    """
+    Parameters:
+        headers (dict): the headers of the request
+        now (float): the time.monotonic() value of the arrival of the request, the current one if None
+    Returns:
+        deadline (float): the time.monotonic() value after which the client no longer waits for the response, None if
+                            the request has no TIMEOUT_HEADER
+    """
+    timeout = headers.get(TIMEOUT_HEADER)
+    if timeout is None:
+        return None
+    try:
+        timeout = float(timeout)
+    except ValueError:
+        raise ValueError(f"the {TIMEOUT_HEADER} header should be a number of seconds, instead we have: {timeout!r}")
+    return (monotonic() if now is None else now) + timeout
+
+
+class AdmissionController:
+    """
+    Admission control in front of the solver: at most max_in_flight requests are solved at once and at most max_queue
+    wait for their turn, in their arrival order. A request arriving when the queue is full is refused at once, so that
+    a burst is answered quickly instead of slowing down every request.
+
+    A request carrying a deadline is dropped as soon as it expires: while it waits in the queue, and between its stages
+    once it is admitted, see check_deadline.
+    """
+
+    def __init__(self, max_in_flight, max_queue, queue_timeout=None):
+        """
+        Parameters:
+            max_in_flight (int): the number of requests solved at once
+            max_queue (int): the number of requests waiting for a slot, beyond which requests are refused
+            queue_timeout (float): the seconds a request without deadline waits in the queue before being refused, as
+                                    long as needed if None
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def admit(self, deadline=None):
+        """
+        Hold a slot and the deadline of the request during the block.
+
+        Parameters:
+            deadline (float): the time.monotonic() value at which the request expires, None for no deadline
+        Raises:
+            AdmissionRejected: if the queue is full, or the request waited queue_timeout seconds
+            DeadlineExceeded: if the deadline expires before the request is admitted, or before one of its stages
+        """
+        self._acquire(deadline)
+        try:
+            with deadline_scope(deadline):
+                yield
+        except DeadlineExceeded as err:
+            self.count(EXPIRED, err.args[1])
+            raise
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+                self.update_gauges()
+
+    def _acquire(self, deadline):
+        if deadline is not None and monotonic() >= deadline:
+            self.count(EXPIRED, "admission")
+            raise DeadlineExceeded("the deadline of the request had expired when it arrived", "admission")
+        with self._condition:
+            if self.in_flight < self.max_in_flight and not self.queued:
+                self.in_flight += 1
+                self.update_gauges()
+                return
+            if self.queued >= self.max_queue:
+                self.count(REJECTIONS, "queue_full")
+                raise AdmissionRejected("the server is saturated, the request was not queued")
+
+            waits = [wait for wait in (self.queue_timeout, None if deadline is None else deadline - monotonic())
+                     if wait is not None]
+            self.queued += 1
+            self.update_gauges()
+            try:
+                admitted = self._condition.wait_for(lambda: self.in_flight < self.max_in_flight,
+                                                    min(waits) if waits else None)
+            finally:
+                self.queued -= 1
+            if admitted:
+                self.in_flight += 1
+                self.update_gauges()
+                return
+            # the slot this request was woken for, if any, goes to the next one
+            self._condition.notify()
+            self.update_gauges()
+
+        if deadline is not None and monotonic() >= deadline:
+            self.count(EXPIRED, "queue")
+            raise DeadlineExceeded("the deadline of the request expired in the queue", "queue")
+        self.count(REJECTIONS, "queue_timeout")
+        raise AdmissionRejected(f"the request waited {self.queue_timeout} seconds in the queue")
+
+    def update_gauges(self):
+        if METRICS.enabled:
+            QUEUE_DEPTH.set(self.queued)
+            IN_FLIGHT.set(self.in_flight)
+
+    @staticmethod
+    def count(counter, label):
+        if METRICS.enabled:
+            counter.inc(label)
+
+
+class AsyncAdmissionController(AdmissionController):
+    """
+    The admission control of AdmissionController for an asyncio server, which shares its limits, its errors and its
+    metrics: the requests waiting for a slot wait on the event loop, where a waiting request costs no thread. Only use
+    it from the event loop.
+
+    The deadline is not set in the block, as the request is solved on another thread or process: pass it along, see
+    async_server.solve_body.
+    """
+
+    def __init__(self, max_in_flight, max_queue, queue_timeout=None):
+        super().__init__(max_in_flight, max_queue, queue_timeout)
+        self._waiters = deque()
+
+    @asynccontextmanager
+    async def admit(self, deadline=None):
+        """
+        Hold a slot during the block.
+
+        Parameters:
+            deadline (float): the time.monotonic() value at which the request expires, None for no deadline
+        Raises:
+            AdmissionRejected: if the queue is full, or the request waited queue_timeout seconds
+            DeadlineExceeded: if the deadline expires before the request is admitted, or before one of its stages
+        """
+        await self._acquire(deadline)
+        try:
+            yield
+        except DeadlineExceeded as err:
+            self.count(EXPIRED, err.args[1])
+            raise
+        finally:
+            self._release()
+
+    async def _acquire(self, deadline):
+        if deadline is not None and monotonic() >= deadline:
+            self.count(EXPIRED, "admission")
+            raise DeadlineExceeded("the deadline of the request had expired when it arrived", "admission")
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            self.update_gauges()
+            return
+        if self.queued >= self.max_queue:
+            self.count(REJECTIONS, "queue_full")
+            raise AdmissionRejected("the server is saturated, the request was not queued")
+
+        waits = [wait for wait in (self.queue_timeout, None if deadline is None else deadline - monotonic())
+                 if wait is not None]
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        self.update_gauges()
+        try:
+            await asyncio.wait_for(waiter, min(waits) if waits else None)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # a cancelled request gives back the slot it was handed, if any
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            self.queued -= 1
+            self.update_gauges()
+        if waiter.done() and not waiter.cancelled():
+            # the slot of a finished request was handed to this one, in_flight is unchanged
+            return
+
+        if deadline is not None and monotonic() >= deadline:
+            self.count(EXPIRED, "queue")
+            raise DeadlineExceeded("the deadline of the request expired in the queue", "queue")
+        self.count(REJECTIONS, "queue_timeout")
+        raise AdmissionRejected(f"the request waited {self.queue_timeout} seconds in the queue")
+
+    def _release(self):
+        """
+        Hand the slot of a finished request to the first waiting one, in their arrival order, skipping the requests
+        which stopped waiting.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+        self.update_gauges()
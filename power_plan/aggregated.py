@@ -0,0 +1,179 @@
+from bisect import bisect_left
+from itertools import accumulate, groupby
+
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.deadline import check_deadline
+from power_plan.metrics import METRICS
+from power_plan.powerplan import Fuels
+
+
+class Block:
+    """Identical powerplants following each other in the merit order, dispatched together."""
+
+    __slots__ = ("members", "pmin", "pmax", "cost")
+
+    def __init__(self, members, pmin, pmax, cost):
+        """
+        Parameters:
+            members (list): the indices of the powerplants in the payload, in the merit order
+            pmin (int): the pmin of every powerplant of the block
+            pmax (int): the available pmax of every powerplant of the block, wind turbines being derated
+            cost (float): the cost of generating power with any powerplant of the block
+        """
+        self.members = members
+        self.pmin = pmin
+        self.pmax = pmax
+        self.cost = cost
+
+
+class AggregatedPowerPlan:
+    """
+    Find the same production plan as PowerPlan, on a fleet where the powerplants of identical type, efficiency, pmin
+    and pmax are aggregated. Costs are computed and sorted once per group of identical powerplants, and the marginal
+    powerplant is found by bisecting the capacities of the blocks instead of walking the powerplants one by one.
+
+    A block is a run of identical powerplants in the merit order. Groups of different powerplants with the same cost,
+    like wind turbines of different sizes, are interleaved in the payload order as PowerPlan does, so that the plan is
+    the same.
+    """
+
+    def __init__(self, data):
+        self.load = data["load"]
+        self.fuels = Fuels(data["fuels"])
+        self.emissions = 0.3  # ton of co2 per Mwh (for both Gaz and Kerosine ?)
+        powerplants = data["powerplants"]
+        if isinstance(powerplants, CompactFleet):
+            # the shared fleet is read in place
+            self.names = powerplants.names
+            rows = powerplants.rows()
+        else:
+            self.names = [pp["name"] for pp in powerplants]
+            rows = ((pp["name"], pp["type"], pp["efficiency"], pp["pmin"], pp["pmax"]) for pp in powerplants)
+        self.groups = self.aggregate(rows)
+
+    @staticmethod
+    def aggregate(rows):
+        """
+        Parameters:
+            rows (iterable): the name, type, efficiency, pmin and pmax of every powerplant
+        Returns:
+            groups (dict): the payload indices of the powerplants of every (type, efficiency, pmin, pmax) key
+        """
+        groups = {}
+        for index, (_, pp_type, efficiency, pmin, pmax) in enumerate(rows):
+            key = (pp_type, efficiency, pmin, pmax)
+            members = groups.get(key)
+            if members is None:
+                groups[key] = [index]
+            else:
+                members.append(index)
+        return groups
+
+    def run(self):
+        """
+        Returns:
+            message (list): a list of dict containing the name and production of every powerplant, in the merit order
+        """
+        check_deadline("sort_by_merit_order")
+        with METRICS.time_stage("sort_by_merit_order"):
+            blocks = self.sort_by_merit_order()
+        check_deadline("update_powerplants_production")
+        with METRICS.time_stage("update_powerplants_production"):
+            marginal_plan = self.locate(blocks)
+        return self.generate_response(blocks, marginal_plan)
+
+    def estimate_cost(self, pp_type, efficiency):
+        if pp_type == "windturbine":
+            return 0
+        if pp_type == "gasfired":
+            return self.fuels.gas / efficiency + self.fuels.co2 * self.emissions
+        if pp_type == "turbojet":
+            return self.fuels.kerosine / efficiency + self.fuels.co2 * self.emissions
+        raise TypeError(f"unknown powerplant type: {pp_type}. Should be: windturbine, turbojet or gasfired")
+
+    def sort_by_merit_order(self):
+        """
+        Returns:
+            blocks (list): the Block objects in the merit order, ties being broken by the payload order
+        """
+        groups = []
+        for (pp_type, efficiency, pmin, pmax), members in self.groups.items():
+            if pp_type == "windturbine":
+                pmax = int(pmax * self.fuels.wind / 100)
+            groups.append((self.estimate_cost(pp_type, efficiency), members[0], members, pmin, pmax))
+        groups.sort(key=lambda group: group[:2])
+
+        blocks = []
+        for cost, tied_groups in groupby(groups, key=lambda group: group[0]):
+            tied_groups = list(tied_groups)
+            if len(tied_groups) == 1:
+                _, _, members, pmin, pmax = tied_groups[0]
+                blocks.append(Block(members, pmin, pmax, cost))
+                continue
+            # interleave the groups of the same cost in the payload order, a new block starting at every change of group
+            group_of = {}
+            for group_index, group in enumerate(tied_groups):
+                group_of.update(dict.fromkeys(group[2], group_index))
+            for group_index, run in groupby(sorted(group_of), key=group_of.__getitem__):
+                _, _, _, pmin, pmax = tied_groups[group_index]
+                blocks.append(Block(list(run), pmin, pmax, cost))
+        return blocks
+
+    def locate(self, blocks):
+        """
+        Find the marginal powerplant the same way PowerPlan.update_powerplants_production does.
+
+        Parameters:
+            blocks (list): the Block objects in the merit order
+        Returns:
+            marginal_plan (tuple): the index of the marginal block, the index of the marginal powerplant in the block,
+                                    its production and the lowered production of the previous powerplant or None.
+                                    None if the load is 0
+        """
+        if self.load == 0:
+            return None
+        capacities = list(accumulate(len(block.members) * block.pmax for block in blocks))
+        marginal_block = bisect_left(capacities, self.load)
+        if marginal_block == len(blocks):
+            raise AlgorithmError("production does not fill the load")
+        if self.load < 0:
+            raise AlgorithmError("this algorithm can't fill the load if the load is "
+                                 "lower than pmin of the first powerplant in the merit-order")
+
+        block = blocks[marginal_block]
+        remainder = self.load - (capacities[marginal_block - 1] if marginal_block > 0 else 0)
+        marginal = max(0, -(-remainder // block.pmax) - 1)
+        remainder -= marginal * block.pmax
+        if remainder >= block.pmin:
+            return marginal_block, marginal, remainder, None
+        if marginal_block == 0 and marginal == 0:
+            raise AlgorithmError("this algorithm can't fill the load if the load is "
+                                 "lower than pmin of the first powerplant in the merit-order")
+
+        previous_block = block if marginal > 0 else blocks[marginal_block - 1]
+        previous_powerplant_production_offset = block.pmin - remainder
+        if previous_block.pmax - previous_block.pmin - previous_powerplant_production_offset > 0:
+            return marginal_block, marginal, block.pmin, previous_block.pmax - previous_powerplant_production_offset
+        raise AlgorithmError("this algorithm is not robust enough, it can't subtract the production of "
+                             "enough powerplant for the current one to be able to fill the load")
+
+    def generate_response(self, blocks, marginal_plan):
+        """Disaggregate the blocks into the name and production of every powerplant, in the merit order."""
+        names = self.names
+        if marginal_plan is None:
+            return [{"name": names[index], "p": 0} for block in blocks for index in block.members]
+
+        marginal_block, marginal, marginal_production, previous_production = marginal_plan
+        response = []
+        for block in blocks[:marginal_block]:
+            response.extend({"name": names[index], "p": block.pmax} for index in block.members)
+        members = blocks[marginal_block].members
+        response.extend({"name": names[index], "p": blocks[marginal_block].pmax} for index in members[:marginal])
+        if previous_production is not None:
+            response[-1]["p"] = previous_production
+        response.append({"name": names[members[marginal]], "p": marginal_production})
+        response.extend({"name": names[index], "p": 0} for index in members[marginal + 1:])
+        for block in blocks[marginal_block + 1:]:
+            response.extend({"name": names[index], "p": 0} for index in block.members)
+        return response
@@ -0,0 +1,389 @@
+import asyncio
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from time import monotonic
+from urllib.parse import unquote
+
+from power_plan import config
+from power_plan.admission import TIMEOUT_HEADER, AsyncAdmissionController, request_deadline
+from power_plan.custom_exceptions import AdmissionRejected, DeadlineExceeded, DispatchBudgetExceeded, \
+    FleetVersionError
+from power_plan.deadline import deadline_scope
+from power_plan.error_catcher_functions import find_request_production, register_fleet, report_error
+from power_plan.error_log import init_worker_logging
+from power_plan.fleet_registry import FleetRegistry
+from power_plan.metrics import METRICS
+from power_plan.result_cache import ResultCache
+from power_plan.single_flight import SingleFlight
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+# the result cache of the process solving the requests, see init_solver
+result_cache = None
+
+# the fleets sent by the serving process, unpickled once per version by every process solving the requests
+MAX_FLEET_COPIES = 16
+_fleet_copies = OrderedDict()
+_fleet_copies_lock = threading.Lock()
+
+
+def init_solver(cache_options=None, coalesce_timeout=None, logging_settings=None, engine_settings=None):
+    """
+    Give the process solving the requests its own result cache. Passed as the initializer of a process pool, every
+    worker caches the responses it computes, logs through the serving process and applies its engine settings; with a
+    thread pool, call it once in the serving process.
+
+    Parameters:
+        cache_options (dict): the keyword arguments of ResultCache, None to solve every request
+        coalesce_timeout (float): the seconds a request waits for an identical one in flight, None not to coalesce them
+        logging_settings (tuple): returned by error_log.worker_logging, None to keep the logging of the process
+        engine_settings (tuple): returned by config.engine_settings, None to keep the engine settings of the process
+    """
+    global result_cache
+    init_worker_logging(logging_settings)
+    if engine_settings is not None:
+        config.apply_engine_settings(engine_settings)
+    if cache_options is None:
+        result_cache = None
+        return
+    single_flight = SingleFlight(coalesce_timeout) if coalesce_timeout else None
+    result_cache = ResultCache(single_flight=single_flight, **cache_options)
+
+
+def solve_body(body, deadline=None, fleet=None):
+    """
+    Answer the raw body of a request to / as api.py does, see find_request_production, and serialize the response. Runs
+    in the solver pool, so that neither the JSON decoding and encoding nor the solve blocks the event loop.
+
+    Parameters:
+        body (bytes): the raw body of the request, a JSON payload
+        deadline (float): the time.monotonic() value at which the request expires, None for no deadline
+        fleet (tuple): the registered fleet the request references, see PowerPlanASGI.fleet_reference, None if it
+                        references no fleet
+    Returns:
+        response (bytes): the JSON production plan, or the JSON error message
+    Raises:
+        DeadlineExceeded: if the deadline expires before one of the stages of the request
+    """
+    fleet_registry = FleetRegistry()
+    if fleet is not None and fleet[1] is not None:
+        fleet_registry.add(fleet_copy(*fleet))
+    with deadline_scope(deadline):
+        response = find_request_production(body, fleet_registry, result_cache)
+        with METRICS.time_stage("serialization"):
+            return json.dumps(response).encode()
+
+
+def fleet_copy(fleet_id, etag, pickled_fleet):
+    """Return the RegisteredFleet sent by the serving process, unpickled only if this version is not already known."""
+    key = fleet_id, etag
+    with _fleet_copies_lock:
+        fleet = _fleet_copies.get(key)
+        if fleet is not None:
+            _fleet_copies.move_to_end(key)
+            return fleet
+    fleet = pickle.loads(pickled_fleet)
+    with _fleet_copies_lock:
+        _fleet_copies[key] = fleet
+        if len(_fleet_copies) > MAX_FLEET_COPIES:
+            _fleet_copies.popitem(last=False)
+    return fleet
+
+
+class PowerPlanASGI:
+    """
+    An ASGI application serving the / and fleet resources of api.py: a payload is posted, its production plan or error
+    message is returned.
+
+    Reading the request and writing the response never block the event loop: solves run on a bounded pool of threads
+    or processes. Requests to / go through the admission control of api.py, with the same limits, deadline header and
+    statuses: at most max_concurrency requests are solved or queued in the pool at once, max_queue others wait on the
+    event loop, where a waiting request costs no thread.
+
+    The fleets are registered in this process. A request referencing one carries it to the pool, pickled once per
+    version, and every worker process unpickles a version once.
+    """
+
+    def __init__(self, executor, max_concurrency, max_body_size=64 * 1024 * 1024, solve=solve_body, max_queue=256,
+                 queue_timeout=None, retry_after=1, fleet_registry=None):
+        """
+        Parameters:
+            executor (concurrent.futures.Executor): the pool solving the requests
+            max_concurrency (int): the number of requests handed to the pool at once
+            max_body_size (int): larger requests are refused with a 413 status, in bytes
+            solve (function): takes the raw body of a request, its deadline and fleet reference, and returns the raw
+                                body of its response, see solve_body
+            max_queue (int): the number of requests waiting for the pool, beyond which requests are refused with a 503
+                                status
+            queue_timeout (float): the seconds a request without deadline waits before being refused with a 503
+                                    status, as long as needed if None
+            retry_after (int): the seconds refused clients are asked to wait before retrying
+            fleet_registry (FleetRegistry): the registered fleets, a new registry if None
+        """
+        self.executor = executor
+        self.max_body_size = max_body_size
+        self.solve = solve
+        self.admission = AsyncAdmissionController(max_concurrency, max_queue, queue_timeout)
+        self.retry_after = retry_after
+        self.fleet_registry = FleetRegistry() if fleet_registry is None else fleet_registry
+        self._pickled_fleets = {}
+
+    @property
+    def in_flight(self):
+        return self.admission.in_flight
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            status, body, headers = await self.handle(scope, receive)
+            await send({"type": "http.response.start", "status": status,
+                        "headers": JSON_HEADERS + headers + [(b"content-length", str(len(body)).encode())]})
+            await send({"type": "http.response.body", "body": body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle(self, scope, receive):
+        """Return the status, the JSON body and the extra headers of the response to an http request."""
+        arrival = monotonic()
+        path, method = scope["path"], scope["method"]
+        if path == "/fleets" or path.startswith("/fleets/"):
+            return await self.handle_fleets(scope, receive)
+        if path != "/":
+            return error_response(HTTPStatus.NOT_FOUND, f"no resource at {path}")
+        if method != "POST":
+            return error_response(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on /")
+
+        headers = dict(scope["headers"])
+        try:
+            timeout = headers.get(TIMEOUT_HEADER.lower().encode())
+            deadline = request_deadline({} if timeout is None else {TIMEOUT_HEADER: timeout.decode("latin-1")},
+                                        arrival)
+        except ValueError as err:
+            return error_response(HTTPStatus.BAD_REQUEST, err.args[0])
+        body = await self.read_limited_body(headers, receive)
+        if body is None:
+            return error_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                  f"the payload exceeds {self.max_body_size} bytes")
+
+        loop = asyncio.get_running_loop()
+        try:
+            fleet = None if b'"fleet_id"' not in body else await loop.run_in_executor(None, self.fleet_reference, body)
+            async with self.admission.admit(deadline):
+                return HTTPStatus.OK, await loop.run_in_executor(self.executor, self.solve, body, deadline, fleet), []
+        except AdmissionRejected as err:
+            return error_response(HTTPStatus.SERVICE_UNAVAILABLE, err.args[0],
+                                  [(b"retry-after", str(self.retry_after).encode())])
+        except DeadlineExceeded as err:
+            return error_response(HTTPStatus.GATEWAY_TIMEOUT, err.args[0])
+        except DispatchBudgetExceeded as err:
+            return HTTPStatus.BAD_REQUEST, json.dumps(report_error(err, "find_powerplants_production")).encode(), []
+
+    def fleet_reference(self, body):
+        """
+        Parameters:
+            body (bytes): the raw body of a request to /
+        Returns:
+            fleet (tuple): the id of the fleet the request references, the etag and pickled RegisteredFleet of its
+                            current version, None and None if it is not registered. None if the request references no
+                            fleet
+        """
+        try:
+            fleet_id = json.loads(body)["fleet_id"]
+        except (ValueError, TypeError, KeyError):
+            # the solver reports the error
+            return None
+        if not isinstance(fleet_id, str):
+            return None
+        try:
+            fleet = self.fleet_registry.get(fleet_id)
+        except KeyError:
+            return fleet_id, None, None
+        pickled = self._pickled_fleets.get(fleet_id)
+        if pickled is None or pickled[0] != fleet.etag:
+            pickled = fleet.etag, pickle.dumps(fleet)
+            self._pickled_fleets[fleet_id] = pickled
+        return fleet_id, fleet.etag, pickled[1]
+
+    async def handle_fleets(self, scope, receive):
+        """Answer the requests to /fleets and /fleets/<fleet_id> as the fleet resources of api.py do."""
+        path, method = scope["path"], scope["method"]
+        fleet_id = None if path == "/fleets" else path[len("/fleets/"):]
+        if fleet_id is not None and (not fleet_id or "/" in fleet_id):
+            return error_response(HTTPStatus.NOT_FOUND, f"no resource at {path}")
+        allowed = ("POST",) if fleet_id is None else ("GET", "PUT", "DELETE")
+        if method not in allowed:
+            return error_response(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on {path}")
+
+        loop = asyncio.get_running_loop()
+        if method == "GET":
+            try:
+                fleet = self.fleet_registry.get(fleet_id)
+            except KeyError as err:
+                return error_response(HTTPStatus.NOT_FOUND, err.args[0])
+            response = dict(fleet.description(), powerplants=await loop.run_in_executor(None, fleet.compact.to_dicts))
+            return HTTPStatus.OK, json.dumps(response).encode(), [(b"etag", fleet.etag.encode())]
+        if method == "DELETE":
+            try:
+                self.fleet_registry.delete(fleet_id)
+            except KeyError as err:
+                return error_response(HTTPStatus.NOT_FOUND, err.args[0])
+            self._pickled_fleets.pop(fleet_id, None)
+            return HTTPStatus.NO_CONTENT, b"", []
+
+        headers = dict(scope["headers"])
+        body = await self.read_limited_body(headers, receive)
+        if body is None:
+            return error_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                  f"the payload exceeds {self.max_body_size} bytes")
+        etag = headers.get(b"if-match")
+        try:
+            response = await loop.run_in_executor(None, self.register_fleet, body, fleet_id,
+                                                  None if etag is None else etag.decode("latin-1"))
+        except FleetVersionError as err:
+            return error_response(HTTPStatus.PRECONDITION_FAILED, err.args[0])
+        if "error" in response:
+            return HTTPStatus.BAD_REQUEST, json.dumps(response).encode(), []
+        status = HTTPStatus.CREATED if fleet_id is None else HTTPStatus.OK
+        return status, json.dumps(response).encode(), [(b"etag", response["etag"].encode())]
+
+    def register_fleet(self, body, fleet_id=None, etag=None):
+        """Check and register the fleet of the raw body of a request, see error_catcher_functions.register_fleet."""
+        try:
+            fleet_data = json.loads(body)
+        except ValueError as err:
+            return report_error(err, "extract_json_from_request")
+        return register_fleet(fleet_data, self.fleet_registry, fleet_id, etag)
+
+    async def read_limited_body(self, headers, receive):
+        """Return the body of the request, None if its announced or actual size exceeds max_body_size."""
+        content_length = headers.get(b"content-length")
+        if content_length and int(content_length) > self.max_body_size:
+            return None
+        return await self.read_body(receive)
+
+    async def read_body(self, receive):
+        """Return the body of the request, None if it is larger than max_body_size."""
+        chunks, size, more_body = [], 0, True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+
+def error_response(status, message, headers=()):
+    return status, json.dumps({"error": message}).encode(), list(headers)
+
+
+async def serve(app, host="0.0.0.0", port=8888, backlog=1024, max_header_size=64 * 1024, started=None):
+    """
+    Serve an ASGI application over HTTP/1.1, with keep-alive connections and Content-Length bodies. A minimal server
+    so that the application runs without any other dependency, any ASGI server can serve it as well.
+
+    Parameters:
+        app (function): the ASGI application
+        host (str): the interface to listen on
+        port (int): the port to listen on, 0 for any free port
+        backlog (int): the number of connections the system queues before they are accepted
+        max_header_size (int): connections sending larger request heads are closed
+        started (function): called with the listening asyncio server once it accepts connections
+    """
+    async def handle_connection(reader, writer):
+        try:
+            while await serve_request(app, reader, writer):
+                pass
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port, backlog=backlog, limit=max_header_size)
+    if started is not None:
+        started(server)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve_request(app, reader, writer):
+    """
+    Read one request from a connection, pass it to the application and write its response.
+
+    Returns:
+        keep_alive (bool): True if the connection stays open for another request, False otherwise.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as err:
+        if err.partial:
+            raise
+        return False
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")[:-2]
+    method, target, version = request_line.split(" ")
+    headers = [tuple(line.split(":", 1)) for line in header_lines]
+    headers = [(name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")) for name, value in headers]
+    header_values = dict(headers)
+    path, _, query_string = target.partition("?")
+    if b"chunked" in header_values.get(b"transfer-encoding", b""):
+        await write_response(writer, version, HTTPStatus.LENGTH_REQUIRED, JSON_HEADERS,
+                             error_response(HTTPStatus.LENGTH_REQUIRED, "chunked requests are not supported")[1])
+        return False
+    content_length = int(header_values.get(b"content-length", 0))
+    connection = header_values.get(b"connection", b"").lower()
+    keep_alive = connection != b"close" if version == "HTTP/1.1" else connection == b"keep-alive"
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": version.partition("/")[2], "method": method,
+        "scheme": "http", "path": unquote(path), "raw_path": path.encode("latin-1"),
+        "query_string": query_string.encode("latin-1"), "root_path": "", "headers": headers,
+        "server": writer.get_extra_info("sockname")[:2], "client": writer.get_extra_info("peername")[:2],
+    }
+    body_read = False
+
+    async def receive():
+        nonlocal body_read
+        if body_read:
+            return {"type": "http.disconnect"}
+        body_read = True
+        return {"type": "http.request", "body": await reader.readexactly(content_length), "more_body": False}
+
+    response = {}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response.update(status=message["status"], headers=message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            await write_response(writer, version, response["status"], response["headers"], message.get("body", b""),
+                                 keep_alive)
+
+    await app(scope, receive, send)
+    # when the application answered without reading the body, the next request can't be found in the connection
+    return keep_alive and (body_read or content_length == 0)
+
+
+async def write_response(writer, version, status, headers, body, keep_alive=False):
+    status = HTTPStatus(status)
+    head = [f"{version} {status.value} {status.phrase}".encode("latin-1")]
+    head.extend(name + b": " + value for name, value in headers)
+    if not any(name.lower() == b"content-length" for name, _ in headers):
+        head.append(b"content-length: " + str(len(body)).encode())
+    head.append(b"connection: " + (b"keep-alive" if keep_alive else b"close"))
+    writer.write(b"\r\n".join(head) + b"\r\n\r\n" + body)
+    await writer.drain()
@@ -0,0 +1,46 @@
+from power_plan.incoming_data_check import short_repr, type_checking
+
+
+def split_batch(batch_data):
+    """
+    Split a batch request into the data shared by all its payloads and the payload specific data.
+
+    A batch is either a list of complete payloads, or a dictionary holding a "scenarios" list. In the second form,
+    every other key of the dictionary (usually "powerplants", and optionally "fuels" or "load") is shared by all the
+    scenarios, and each scenario only carries what changes, for instance its "load" and "fuels".
+
+    Parameters:
+        batch_data (list, dict): a list of payloads or a dictionary containing "scenarios" as key
+    Returns:
+        shared_data (dict): the keys shared by every payload, empty for a list of payloads
+        items (list): the payloads, or the scenarios
+    """
+    if isinstance(batch_data, list):
+        return {}, batch_data
+
+    type_checking(batch_data, (list, dict), "batch")
+    if "scenarios" not in batch_data:
+        raise ValueError(f"wrong json keys received. A batch should be a list of payloads or contain 'scenarios'. "
+                         f"Instead we have: {short_repr(list(batch_data))}")
+    type_checking(batch_data["scenarios"], list, "scenarios")
+
+    shared_data = {key: value for key, value in batch_data.items() if key != "scenarios"}
+    return shared_data, batch_data["scenarios"]
+
+
+def expand_scenario(shared_data, scenario):
+    """
+    Build a complete payload from the data shared by the batch and the scenario specific data.
+
+    Parameters:
+        shared_data (dict): the keys shared by every scenario of the batch
+        scenario (dict): the scenario specific keys, they take precedence over the shared ones
+    Returns:
+        payload (dict): a dictionary containing load, fuels and powerplants as keys
+    """
+    if not shared_data or not isinstance(scenario, dict):
+        # a non dict scenario is left as is so that it is reported as invalid without aborting the batch
+        return scenario
+    payload = dict(shared_data)
+    payload.update(scenario)
+    return payload
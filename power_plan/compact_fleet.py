@@ -0,0 +1,160 @@
+from array import array
+from math import isnan
+
+NO_COST = float("nan")
+
+
+class CompactFleet:
+    """
+    A fleet stored as one compact array per numeric attribute, with the powerplants types interned as small integer
+    codes, which takes several times less memory than Powerplant objects. It is the fleet definition shared by
+    concurrent solves, the registered fleets and the engines.
+
+    Solving only reads it, the available pmax, cost and production being per solve state: PowerPlan reads it through
+    rows, creating its Powerplant objects, the aggregated engine through rows as well, and the vectorized engines
+    through numpy views over its arrays, see FleetColumns.from_compact, with their state in numpy arrays. So one
+    compact fleet is solved again for any load and fuels without being copied.
+
+    The PowerplantView objects of views give the attribute API of a Powerplant over a row of the arrays, for code
+    written against Powerplant objects. They write into the arrays, including the cost and production columns, so they
+    are meant for a copy of a shared fleet.
+    """
+
+    __slots__ = ("names", "type_names", "type_codes", "efficiency", "pmin", "pmax", "cost", "production")
+
+    def __init__(self, powerplants=()):
+        self.names = []
+        self.type_names = []
+        self.type_codes = array("B")
+        self.efficiency = array("d")
+        self.pmin = array("q")
+        self.pmax = array("q")
+        self.cost = array("d")
+        self.production = []
+        for pp_dict in powerplants:
+            self.append(pp_dict)
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, powerplant):
+        """
+        Parameters:
+            powerplant (dict): a dictionary containing name, type, efficiency, pmin and pmax as keys
+        """
+        self.names.append(powerplant["name"])
+        self.type_codes.append(self.type_code(powerplant["type"]))
+        self.efficiency.append(powerplant["efficiency"])
+        self.pmin.append(powerplant["pmin"])
+        self.pmax.append(powerplant["pmax"])
+        self.cost.append(NO_COST)
+        self.production.append(None)
+
+    def type_code(self, pp_type):
+        """Return the code of a powerplant type, registering it if the fleet does not know it yet."""
+        try:
+            return self.type_names.index(pp_type)
+        except ValueError:
+            self.type_names.append(pp_type)
+            return len(self.type_names) - 1
+
+    def to_dicts(self):
+        """Return the powerplants as dictionaries, in the form they have in a payload."""
+        return [{"name": name, "type": self.type_names[code], "efficiency": efficiency, "pmin": pmin, "pmax": pmax}
+                for name, code, efficiency, pmin, pmax
+                in zip(self.names, self.type_codes, self.efficiency, self.pmin, self.pmax)]
+
+    def rows(self):
+        """Return an iterator over the name, type, efficiency, pmin and pmax of every powerplant."""
+        type_names = self.type_names
+        return zip(self.names, (type_names[code] for code in self.type_codes), self.efficiency, self.pmin, self.pmax)
+
+    def views(self):
+        """Return the list of PowerplantView objects over every powerplant of the fleet."""
+        return [PowerplantView(self, index) for index in range(len(self))]
+
+    def copy(self):
+        """Return a fleet that can be modified without modifying this one. Arrays are copied as blocks of memory."""
+        fleet = CompactFleet()
+        fleet.names = list(self.names)
+        fleet.type_names = list(self.type_names)
+        fleet.type_codes = array("B", self.type_codes)
+        fleet.efficiency = array("d", self.efficiency)
+        fleet.pmin = array("q", self.pmin)
+        fleet.pmax = array("q", self.pmax)
+        fleet.cost = array("d", self.cost)
+        fleet.production = list(self.production)
+        return fleet
+
+
+class PowerplantView:
+    """A powerplant of a CompactFleet, with the attributes and methods of a Powerplant."""
+
+    __slots__ = ("_fleet", "_index")
+
+    def __init__(self, fleet, index):
+        self._fleet = fleet
+        self._index = index
+
+    @property
+    def name(self):
+        return self._fleet.names[self._index]
+
+    @name.setter
+    def name(self, name):
+        self._fleet.names[self._index] = name
+
+    @property
+    def type(self):
+        return self._fleet.type_names[self._fleet.type_codes[self._index]]
+
+    @type.setter
+    def type(self, pp_type):
+        self._fleet.type_codes[self._index] = self._fleet.type_code(pp_type)
+
+    @property
+    def efficiency(self):
+        return self._fleet.efficiency[self._index]
+
+    @efficiency.setter
+    def efficiency(self, efficiency):
+        self._fleet.efficiency[self._index] = efficiency
+
+    @property
+    def pmin(self):
+        return self._fleet.pmin[self._index]
+
+    @pmin.setter
+    def pmin(self, pmin):
+        self._fleet.pmin[self._index] = pmin
+
+    @property
+    def pmax(self):
+        return self._fleet.pmax[self._index]
+
+    @pmax.setter
+    def pmax(self, pmax):
+        self._fleet.pmax[self._index] = pmax
+
+    @property
+    def cost(self):
+        cost = self._fleet.cost[self._index]
+        return None if isnan(cost) else cost
+
+    @cost.setter
+    def cost(self, cost):
+        self._fleet.cost[self._index] = NO_COST if cost is None else cost
+
+    @property
+    def production(self):
+        return self._fleet.production[self._index]
+
+    @production.setter
+    def production(self, production):
+        self._fleet.production[self._index] = production
+
+    def set_cost(self, cost):
+        self.cost = cost
+
+    def set_production(self, production):
+        self.production = production
@@ -0,0 +1,99 @@
+import os
+
+from power_plan import engines
+from power_plan.error_log import ERROR_LOG
+from power_plan.metrics import METRICS
+
+
+def optional_float(value):
+    return None if value in (None, "") else float(value)
+
+
+def cache_options():
+    """
+    Results of identical payloads are served from memory. POWERPLAN_CACHE_SIZE=0 disables the cache, an empty ttl keeps
+    the entries until they are evicted.
+
+    Returns:
+        options (dict): the keyword arguments of ResultCache, but single_flight
+    """
+    return dict(
+        max_size=int(os.environ.get("POWERPLAN_CACHE_SIZE", 1024)),
+        ttl=optional_float(os.environ.get("POWERPLAN_CACHE_TTL")),
+        error_max_size=int(os.environ.get("POWERPLAN_ERROR_CACHE_SIZE", 256)),
+        error_ttl=optional_float(os.environ.get("POWERPLAN_ERROR_CACHE_TTL", 60)),
+    )
+
+
+def coalesce_timeout():
+    """
+    Concurrent identical payloads are solved once, a request waiting at most POWERPLAN_COALESCE_TIMEOUT seconds for the
+    identical one in flight. 0 disables the coalescing.
+
+    Returns:
+        timeout (float): the timeout of SingleFlight, 0 or None not to coalesce the requests
+    """
+    return optional_float(os.environ.get("POWERPLAN_COALESCE_TIMEOUT", 10))
+
+
+def admission_options():
+    """
+    At most POWERPLAN_MAX_IN_FLIGHT requests to / are solved at once and POWERPLAN_MAX_QUEUE wait, at most
+    POWERPLAN_QUEUE_TIMEOUT seconds (empty for no limit). Requests arriving when the queue is full are refused with a 503
+    status, asking the client to retry after POWERPLAN_RETRY_AFTER seconds, see retry_after. Requests carrying an
+    X-Request-Timeout header are dropped with a 504 status as soon as it expires.
+
+    Returns:
+        options (dict): the keyword arguments of AdmissionController and AsyncAdmissionController
+    """
+    return dict(
+        max_in_flight=int(os.environ.get("POWERPLAN_MAX_IN_FLIGHT", os.cpu_count() or 1)),
+        max_queue=int(os.environ.get("POWERPLAN_MAX_QUEUE", 256)),
+        queue_timeout=optional_float(os.environ.get("POWERPLAN_QUEUE_TIMEOUT", 30)),
+    )
+
+
+def retry_after():
+    return int(os.environ.get("POWERPLAN_RETRY_AFTER", 1))
+
+
+def configure_engines():
+    """
+    Payloads the requested engine can't fill are solved again by the optimal engine if its dynamic programming fits in
+    POWERPLAN_FALLBACK_MAX_CELLS powerplants x loads (about 2 bytes each), 0 disables the fallback. Payloads requesting
+    the optimal engine are refused with a 400 status beyond POWERPLAN_OPTIMAL_MAX_CELLS.
+    """
+    engines.FALLBACK_MAX_CELLS = int(os.environ.get("POWERPLAN_FALLBACK_MAX_CELLS", engines.FALLBACK_MAX_CELLS))
+    engines.OPTIMAL_MAX_CELLS = int(os.environ.get("POWERPLAN_OPTIMAL_MAX_CELLS", engines.OPTIMAL_MAX_CELLS))
+
+
+def engine_settings():
+    """
+    Returns:
+        settings (tuple): the settings of the engines of this process, the argument of apply_engine_settings
+    """
+    return engines.FALLBACK_MAX_CELLS, engines.OPTIMAL_MAX_CELLS
+
+
+def apply_engine_settings(settings):
+    """Apply engine_settings of the serving process in a worker process, which does not inherit them when spawned."""
+    engines.FALLBACK_MAX_CELLS, engines.OPTIMAL_MAX_CELLS = settings
+
+
+def configure_metrics():
+    """Per stage latency and error metrics, exposed on /metrics. POWERPLAN_METRICS=0 turns them off entirely."""
+    METRICS.enabled = os.environ.get("POWERPLAN_METRICS", "1") != "0"
+
+
+def configure_error_log():
+    """
+    Identical errors are logged at most POWERPLAN_LOG_BURST times every POWERPLAN_LOG_INTERVAL seconds, the others are
+    only counted. The log file is written by a background thread from a queue of at most POWERPLAN_LOG_QUEUE_SIZE
+    records.
+
+    Returns:
+        queue_size (int): the queue_size of start_logging
+    """
+    ERROR_LOG.burst = int(os.environ.get("POWERPLAN_LOG_BURST", 10))
+    ERROR_LOG.interval = float(os.environ.get("POWERPLAN_LOG_INTERVAL", 60))
+    return int(os.environ.get("POWERPLAN_LOG_QUEUE_SIZE", 10000))
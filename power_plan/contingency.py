@@ -0,0 +1,138 @@
+import numpy as np
+
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.dispatch_table import ERROR_MESSAGES, FIRST_PMIN_TOO_HIGH, NOT_FILLED, NOT_ROBUST_ENOUGH
+from power_plan.supply_curve import SupplyCurve
+
+
+class ContingencyAnalysis:
+    """
+    Find the production plan of a fleet with each of its powerplants out of service in turn, N-1 cases.
+
+    Taking a powerplant out keeps the merit order of the others, and only lowers the prefix sums of the pmax after it
+    by its pmax. So every case is located by bisecting the prefix sums of the whole fleet shifted by the pmax of the
+    powerplant out, all the cases in one vectorized pass, and the case only changes the plan between the marginal
+    powerplant of the base case and its own. A powerplant after the base marginal one changes nothing.
+    """
+
+    def __init__(self, supply_curve, load):
+        """
+        Parameters:
+            supply_curve (SupplyCurve): the merit order of the fleet and fuels
+            load (int): the load to fill
+        """
+        self.supply_curve = supply_curve
+        self.load = load
+        self.pmin = np.array(supply_curve.pmin, dtype=np.int64)
+        self.pmax = np.array(supply_curve.pmax, dtype=np.int64)
+        self.costs = np.array(supply_curve.costs, dtype=np.float64)
+        self.cumulative_pmax = np.array(supply_curve.cumulative_pmax, dtype=np.int64)
+        self.cumulative_costs = np.cumsum(self.pmax * self.costs)
+
+    @classmethod
+    def from_payload(cls, data):
+        """
+        Parameters:
+            data (dict): a dictionary containing load, fuels and powerplants as keys
+        Returns:
+            contingency_analysis (ContingencyAnalysis): the N-1 cases of the payload
+        """
+        return cls(SupplyCurve.from_payload(data), data["load"])
+
+    def run(self):
+        """
+        Returns:
+            message (dict): the cost of the base case or its error, then per powerplant out of service, in the merit
+                            order, whether the load is still filled, the cost and its change from the base case, and the
+                            new production of the powerplants whose production changes
+        """
+        try:
+            base_production = np.array(self.supply_curve.production(self.load), dtype=np.int64)
+            base = {"cost": float(self.costs @ base_production)}
+        except AlgorithmError as err:
+            base_production = np.zeros(len(self.pmax), dtype=np.int64)
+            base = {"error": err.args[0]}
+
+        # the powerplants taken out after the base marginal one change nothing, the others are located again
+        base_marginal = int(np.searchsorted(self.cumulative_pmax, self.load, side="left")) if self.load > 0 else -1
+        outaged = np.arange(min(base_marginal + 1, len(self.pmax)))
+        # the powerplants before start are at pmax in the base case and in every case
+        start = max(0, base_marginal - 2) if "cost" in base else 0
+        outages = []
+        for i, marginal, code, marginal_production, previous, previous_production, cost in zip(
+                outaged.tolist(), *(column.tolist() for column in self.locate_outages(outaged))):
+            outage = {"name": self.supply_curve.names[i], "lost_p": int(base_production[i])}
+            if code < 0:
+                outage.update(feasible=False, error=ERROR_MESSAGES[code])
+            else:
+                outage.update(feasible=True, cost=cost, cost_delta=cost - base["cost"] if "cost" in base else None,
+                              changes=self.changes(i, start, marginal, marginal_production, previous,
+                                                   previous_production, base_production))
+            outages.append(outage)
+        outages.extend(self.unchanged_outage(i, base, base_production) for i in range(len(outaged), len(self.pmax)))
+        return {"load": self.load, "base": base, "outages": outages}
+
+    def unchanged_outage(self, outaged, base, base_production):
+        """Return the case of a powerplant out of service whose plan is the base one."""
+        outage = {"name": self.supply_curve.names[outaged], "lost_p": int(base_production[outaged])}
+        if "error" in base:
+            return dict(outage, feasible=False, error=base["error"])
+        return dict(outage, feasible=True, cost=base["cost"], cost_delta=0., changes=[])
+
+    def locate_outages(self, outaged):
+        """
+        Vectorized version of SupplyCurve.locate with one powerplant out of service, for many of them at once.
+
+        Parameters:
+            outaged (numpy.ndarray): the indices, in the merit order, of the powerplants out of service, none of them
+                                        after the marginal powerplant of the base case, for a strictly positive load
+        Returns:
+            marginal (numpy.ndarray): the index of the marginal powerplant of every case
+            codes (numpy.ndarray): 0 for the cases filling the load, FIRST_PMIN_TOO_HIGH, NOT_ROBUST_ENOUGH or
+                                    NOT_FILLED for the others
+            marginal_production (numpy.ndarray): the production of the marginal powerplant
+            previous (numpy.ndarray): the index of the powerplant before the marginal one in the merit order without
+                                        the powerplant out of service, -1 if there is none
+            previous_production (numpy.ndarray): the lowered production of the previous powerplant, -1 if not lowered
+            costs (numpy.ndarray): the cost of the plan of every case
+        """
+        pmin, pmax, size = self.pmin, self.pmax, len(self.pmax)
+        lost = pmax[outaged]
+        # the prefix sums after the powerplant out of service are lowered by its pmax: the marginal powerplant is the
+        # first one whose prefix sum reaches the load plus that pmax, which is always after the powerplant out
+        filled = np.searchsorted(self.cumulative_pmax, self.load + lost, side="left")
+        marginal = np.minimum(filled, size - 1)
+        remainder = self.load - (self.cumulative_pmax[marginal - 1] - lost)
+        previous = np.where(marginal - 1 == outaged, marginal - 2, marginal - 1)
+        offset = pmin[marginal] - remainder
+        fits = offset <= 0
+        robust = ~fits & (previous >= 0) & (pmax[previous] - pmin[previous] - offset > 0)
+
+        codes = np.where(fits | robust, 0, np.where(previous >= 0, NOT_ROBUST_ENOUGH, FIRST_PMIN_TOO_HIGH))
+        codes[filled == size] = NOT_FILLED
+        marginal_production = np.where(fits, remainder, pmin[marginal])
+        previous_production = np.where(robust, pmax[previous] - offset, -1)
+        costs = (self.cumulative_costs[marginal - 1] - lost * self.costs[outaged]
+                 + self.costs[marginal] * marginal_production - np.where(robust, self.costs[previous] * offset, 0.))
+        return marginal, codes, marginal_production, previous, previous_production, costs
+
+    def changes(self, outaged, start, marginal, marginal_production, previous, previous_production, base_production):
+        """
+        Returns:
+            changes (list): the name and new production of the powerplants, other than the one out of service, whose
+                            production differs from the base case. Only the powerplants from start to the marginal one
+                            can change.
+        """
+        changes = []
+        for i in range(start, marginal + 1):
+            if i == outaged:
+                continue
+            if i == marginal:
+                p = marginal_production
+            elif i == previous and previous_production >= 0:
+                p = previous_production
+            else:
+                p = self.supply_curve.pmax[i]
+            if p != base_production[i]:
+                changes.append({"name": self.supply_curve.names[i], "p": p})
+        return changes
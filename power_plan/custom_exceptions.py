@@ -3,6 +3,26 @@ class AlgorithmError(Exception):
     pass
 
 
+class DispatchBudgetExceeded(AlgorithmError):
+    """Raised when the optimal dispatch of a payload would fill more dynamic programming cells than allowed."""
+    pass
+
+
 class SanityCheckInternalError(Exception):
     """Raised when sanity check function's parameters are not properly set"""
     pass
+
+
+class FleetVersionError(Exception):
+    """Raised when a registered fleet is updated with an etag that is not its current one."""
+    pass
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the deadline of a request expires before one of its stages, args are the message and the stage."""
+    pass
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is refused because the server already has as much work as it can queue."""
+    pass
@@ -0,0 +1,37 @@
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+from power_plan.custom_exceptions import DeadlineExceeded
+
+# the deadline of the request handled by each thread
+_local = threading.local()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """
+    Set the deadline of the work done by the current thread in the block.
+
+    Parameters:
+        deadline (float): a time.monotonic() value, None for no deadline
+    """
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = deadline
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def check_deadline(stage):
+    """
+    Raise DeadlineExceeded if the deadline of the current thread has expired, so that a request whose caller has given
+    up is dropped before its next stage instead of being solved for nobody.
+
+    Parameters:
+        stage (str): the name of the stage about to start
+    """
+    deadline = getattr(_local, "deadline", None)
+    if deadline is not None and monotonic() >= deadline:
+        raise DeadlineExceeded(f"the deadline of the request expired before the {stage} stage", stage)
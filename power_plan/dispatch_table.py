@@ -0,0 +1,208 @@
+import json
+import struct
+
+import numpy as np
+
+from power_plan.custom_exceptions import AlgorithmError, DispatchBudgetExceeded
+from power_plan.result_cache import canonical_hash
+from power_plan.supply_curve import SupplyCurve
+
+MAGIC = b"PPDISPATCH1\n"
+# loads a table may hold, 12 bytes each, beyond which DispatchBudgetExceeded is raised instead of allocating it: 600 MB,
+# a fleet of 50 GW. None for no limit
+MAX_ROWS = 50_000_000
+# the rows of the table start at a multiple of ALIGNMENT bytes in the file
+ALIGNMENT = 64
+
+# codes stored instead of the marginal powerplant index for the loads the algorithm can't fill
+FIRST_PMIN_TOO_HIGH = -1
+NOT_ROBUST_ENOUGH = -2
+NOT_ADJUSTED = -1
+# code of the loads above the capacity of the fleet, which are not in the table but in the vectorized dispatches of
+# many cases at once
+NOT_FILLED = -3
+
+ERROR_MESSAGES = {
+    FIRST_PMIN_TOO_HIGH: "this algorithm can't fill the load if the load is lower than pmin of the first powerplant in "
+                         "the merit-order",
+    NOT_ROBUST_ENOUGH: "this algorithm is not robust enough, it can't subtract the production of enough powerplant "
+                       "for the current one to be able to fill the load",
+    NOT_FILLED: "production does not fill the load",
+}
+
+
+def payload_fingerprint(data):
+    """Return a hash identifying the fleet and fuels of a payload, which are all a dispatch table depends on."""
+    return canonical_hash({"fuels": data["fuels"], "powerplants": data["powerplants"]})
+
+
+def sweep_supply_curve(supply_curve, max_rows=MAX_ROWS):
+    """
+    Compute the dispatch of every integer load from 0 to the capacity of a supply curve.
+
+    The loads are swept in increasing order: the loads a powerplant is marginal for are the ones between the capacity of
+    the powerplants before it and that capacity plus its pmax, so the sweep walks the merit order once and fills the
+    rows of a powerplant as one block, from the remainder left to it by the previous ones.
+
+    Parameters:
+        supply_curve (SupplyCurve): the merit order of the fleet and fuels
+        max_rows (int): the number of loads the table may hold, no limit if None
+    Returns:
+        table (numpy.ndarray): one row per load holding the index of the marginal powerplant, or an error code, its
+                                production and the lowered production of the previous powerplant, or NOT_ADJUSTED
+    Raises:
+        DispatchBudgetExceeded: if the capacity of the fleet needs more than max_rows rows
+    """
+    capacity = supply_curve.cumulative_pmax[-1] if len(supply_curve) else 0
+    if max_rows is not None and capacity + 1 > max_rows:
+        raise DispatchBudgetExceeded(f"the dispatch table of a fleet of {capacity} MW exceeds the budget of {max_rows} "
+                                     f"rows")
+    table = np.zeros((capacity + 1, 3), dtype=np.int32)
+    table[0] = (0, 0, NOT_ADJUSTED)
+
+    start = 0
+    for i, (pmin, pmax) in enumerate(zip(supply_curve.pmin, supply_curve.pmax)):
+        if pmax == 0:
+            continue
+        rows = table[start + 1:start + pmax + 1]
+        remainder = np.arange(1, pmax + 1, dtype=np.int32)
+        fits = remainder >= pmin
+        rows[:, 0] = i
+        rows[:, 1] = np.where(fits, remainder, pmin)
+        rows[:, 2] = NOT_ADJUSTED
+        if not fits.all():
+            if i == 0:
+                rows[~fits, 0] = FIRST_PMIN_TOO_HIGH
+            else:
+                offset = pmin - remainder[~fits]
+                previous_production = supply_curve.pmax[i - 1] - offset
+                robust = previous_production - supply_curve.pmin[i - 1] > 0
+                adjusted_rows = np.flatnonzero(~fits)
+                rows[adjusted_rows[robust], 2] = previous_production[robust]
+                rows[adjusted_rows[~robust], 0] = NOT_ROBUST_ENOUGH
+        start += pmax
+    return table
+
+
+class DispatchTable:
+    """
+    The production plan of every integer load of a fleet and fuels, precomputed. Finding the plan of a load is a
+    lookup of its row, writing it down is a copy of the pmax of the powerplants before the marginal one.
+
+    The table is saved in a file and memory-mapped when it is opened, so that it is shared by the processes using it
+    and only the pages of the loads looked up are read.
+    """
+
+    def __init__(self, names, costs, pmax, table, fingerprint=None):
+        """
+        Parameters:
+            names (list): the powerplants names, in the merit order
+            costs (list): the powerplants costs, in the merit order
+            pmax (list): the powerplants pmax, wind turbines being derated, in the merit order
+            table (numpy.ndarray): the rows computed by sweep_supply_curve
+            fingerprint (str): identifies the fleet and fuels the table was computed for, see payload_fingerprint
+        """
+        self.names = names
+        self.costs = costs
+        self.pmax = pmax
+        self.table = table
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_payload(cls, data, max_rows=MAX_ROWS):
+        """
+        Build the table of the fleet and fuels of a payload. Its load is ignored.
+
+        Parameters:
+            data (dict): a dictionary containing load, fuels and powerplants as keys
+            max_rows (int): the number of loads the table may hold, no limit if None
+        Returns:
+            dispatch_table (DispatchTable): the table of the payload
+        Raises:
+            DispatchBudgetExceeded: if the capacity of the fleet needs more than max_rows rows
+        """
+        supply_curve = SupplyCurve.from_payload(data)
+        return cls(supply_curve.names, supply_curve.costs, supply_curve.pmax,
+                   sweep_supply_curve(supply_curve, max_rows), payload_fingerprint(data))
+
+    @property
+    def capacity(self):
+        return len(self.table) - 1
+
+    def save(self, path):
+        """Write the table to a file: a JSON header with the merit order, then the rows as little endian int32."""
+        header = json.dumps({"names": self.names, "costs": self.costs, "pmax": self.pmax, "rows": len(self.table),
+                             "fingerprint": self.fingerprint}).encode()
+        header_end = len(MAGIC) + 8 + len(header)
+        padding = b" " * (-header_end % ALIGNMENT)
+        with open(path, "wb") as table_file:
+            table_file.write(MAGIC)
+            table_file.write(struct.pack("<Q", len(header) + len(padding)))
+            table_file.write(header + padding)
+            table_file.write(self.table.astype("<i4").tobytes())
+
+    @classmethod
+    def open(cls, path):
+        """Open a table saved by save, memory-mapping its rows read-only."""
+        with open(path, "rb") as table_file:
+            if table_file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a dispatch table")
+            header_length, = struct.unpack("<Q", table_file.read(8))
+            header = json.loads(table_file.read(header_length))
+        table = np.memmap(path, dtype="<i4", mode="r", offset=len(MAGIC) + 8 + header_length,
+                          shape=(header["rows"], 3))
+        return cls(header["names"], header["costs"], header["pmax"], table, header["fingerprint"])
+
+    def locate(self, load):
+        """
+        Parameters:
+            load (int): the load to fill
+        Returns:
+            marginal (int): the index of the marginal powerplant in the merit order
+            marginal_production (int): the production of the marginal powerplant
+            previous_production (int): the lowered production of the previous powerplant, None if it is at pmax
+        """
+        if load > self.capacity:
+            raise AlgorithmError("production does not fill the load")
+        if load < 0:
+            raise AlgorithmError(ERROR_MESSAGES[FIRST_PMIN_TOO_HIGH])
+        marginal, marginal_production, previous_production = self.table[load].tolist()
+        if marginal < 0:
+            raise AlgorithmError(ERROR_MESSAGES[marginal])
+        return marginal, marginal_production, None if previous_production == NOT_ADJUSTED else previous_production
+
+    def production(self, load):
+        """
+        Parameters:
+            load (int): the load to fill
+        Returns:
+            production (list): the production of every powerplant, in the merit order
+        """
+        marginal, marginal_production, previous_production = self.locate(load)
+        production = self.pmax[:marginal]
+        production.append(marginal_production)
+        production.extend([0] * (len(self.names) - marginal - 1))
+        if previous_production is not None:
+            production[marginal - 1] = previous_production
+        return production
+
+    def dispatch(self, load):
+        """
+        Parameters:
+            load (int): the load to fill
+        Returns:
+            message (list): the same response as PowerPlan.run for the fleet and fuels of the table and this load
+        """
+        return [{"name": name, "p": p} for name, p in zip(self.names, self.production(load))]
+
+    def marginal_price(self, load):
+        """
+        Parameters:
+            load (int): the load to fill
+        Returns:
+            price (float): the cost of the most expensive running powerplant, None if the load is 0
+        """
+        if load == 0:
+            return None
+        marginal, _, _ = self.locate(load)
+        return self.costs[marginal]
@@ -0,0 +1,82 @@
+from power_plan.aggregated import AggregatedPowerPlan
+from power_plan.custom_exceptions import AlgorithmError, DispatchBudgetExceeded
+from power_plan.metrics import METRICS, Counter
+from power_plan.optimal import OptimalPowerPlan
+from power_plan.powerplan import PowerPlan
+from power_plan.vectorized import VectorizedPowerPlan
+
+DEFAULT_ENGINE = "greedy"
+# engine solving the payloads the requested engine raised an AlgorithmError for
+FALLBACK_ENGINE = "optimal"
+# powerplants x loads the dynamic programming of the fallback may fill, about 2 bytes each. Beyond, or when it is 0, the
+# error of the requested engine is returned. None for no limit
+FALLBACK_MAX_CELLS = 10_000_000
+# powerplants x loads the dynamic programming of a payload requesting the optimal engine may fill, beyond which
+# DispatchBudgetExceeded is raised. None for no limit
+OPTIMAL_MAX_CELLS = 10_000_000
+
+ENGINES = {
+    "greedy": PowerPlan,
+    "vectorized": VectorizedPowerPlan,
+    "optimal": OptimalPowerPlan,
+    "aggregated": AggregatedPowerPlan,
+}
+# engines running directly on FleetColumns
+COLUMN_ENGINES = {"vectorized", "optimal"}
+
+ENGINE_FALLBACKS = METRICS.register(Counter(
+    "powerplan_engine_fallbacks_total", "Payloads solved by the fallback engine, per requested engine.", ("engine",)))
+FALLBACK_BUDGET_EXCEEDED = METRICS.register(Counter(
+    "powerplan_engine_fallback_budget_exceeded_total",
+    "Payloads the fallback engine gave up on because their dispatch exceeded FALLBACK_MAX_CELLS, per requested engine.",
+    ("engine",)))
+
+
+def get_engine(name=None):
+    """
+    Return the class solving a payload with the requested engine.
+
+    Parameters:
+        name (str): the value of the optional "engine" key of the payload, DEFAULT_ENGINE if None
+    Returns:
+        engine (type): a class instantiated with the payload data and exposing a run method
+    """
+    if name is None:
+        name = DEFAULT_ENGINE
+    try:
+        return ENGINES[name]
+    except (KeyError, TypeError):
+        raise ValueError(f"unknown engine: {name}. Should be one of: {', '.join(ENGINES)}")
+
+
+def solve(payload_data):
+    """
+    Solve a payload with the engine it requests. If the engine can't fill the load, the payload is solved again by
+    FALLBACK_ENGINE, which finds a plan whenever one exists, as long as its dynamic programming fits in
+    FALLBACK_MAX_CELLS. Otherwise the error of the requested engine is raised, so that payloads without a plan on large
+    fleets fail fast. A payload requesting the optimal engine is bounded by OPTIMAL_MAX_CELLS: DispatchBudgetExceeded
+    is raised beyond.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels and powerplants as keys, and optionally engine
+    Returns:
+        message (list): a list of dict containing the name and production of every powerplant
+    """
+    engine = get_engine(payload_data.get("engine"))
+    if engine is OptimalPowerPlan:
+        return engine(payload_data, max_cells=OPTIMAL_MAX_CELLS).run()
+
+    try:
+        return engine(payload_data).run()
+    except AlgorithmError as err:
+        if FALLBACK_MAX_CELLS == 0:
+            raise
+        requested = payload_data.get("engine") or DEFAULT_ENGINE
+        if METRICS.enabled:
+            ENGINE_FALLBACKS.inc(requested)
+        try:
+            return ENGINES[FALLBACK_ENGINE](payload_data, max_cells=FALLBACK_MAX_CELLS).run()
+        except DispatchBudgetExceeded:
+            if METRICS.enabled:
+                FALLBACK_BUDGET_EXCEEDED.inc(requested)
+            raise err
@@ -1,43 +1,290 @@
-import logging
+import json
 
-from power_plan.custom_exceptions import AlgorithmError, SanityCheckInternalError
-from power_plan.incoming_data_check import perform_sanity_check
-from power_plan.powerplan import PowerPlan
+from power_plan.batch import expand_scenario, split_batch
+from power_plan.contingency import ContingencyAnalysis
+from power_plan.custom_exceptions import AlgorithmError, DispatchBudgetExceeded, SanityCheckInternalError
+from power_plan.deadline import check_deadline
+from power_plan.engines import solve
+from power_plan.error_log import ERROR_LOG
+from power_plan.incoming_data_check import perform_sanity_check, perform_fleet_request_sanity_check, \
+    check_powerplants, check_registered_powerplant, type_checking, values_checking
+from power_plan.metrics import METRICS
+from power_plan.price_sweep import PriceSweepPlan, perform_price_sweep_sanity_check
+from power_plan.supply_curve import SupplyCurve
+from power_plan.time_series import TimeSeriesPlan, perform_time_series_sanity_check
+from power_plan.wind_scenarios import WindScenarioPlan, perform_wind_scenarios_sanity_check
+
+SOLVER_ERRORS = (TypeError, AttributeError, IndexError, KeyError, NameError, ValueError, AlgorithmError)
+
+
+def report_error(err, function_name):
+    """
+    Log an error caught by one of the functions of this module, sampled by ERROR_LOG, and count it in the metrics.
+
+    Parameters:
+        err (Exception): the error caught
+        function_name (str): the name of the function which caught it
+    Returns:
+        message (dict): the error message of the response
+    """
+    ERROR_LOG.error(function_name, err)
+    METRICS.count_error(function_name, err)
+    return {"error": err.args[0]}
 
 
 def find_powerplants_production(payload_data):
     """
     the method to call to find the production plan.
-    It instantiates a PowerFinder object and catch errors if some appears.
+    It solves the payload with the engine it requests (PowerPlan by default), which falls back to the optimal engine
+    when it can't fill the load, and catch errors if some appears.
 
     Parameters:
-        payload_data (dict): a dictionary containing load, fuels and powerplants as keys
+        payload_data (dict): a dictionary containing load, fuels and powerplants as keys, and optionally engine
 
     Returns:
         message: False if the incoming dict is correct, an error message otherwise
     """
     try:
-        return PowerPlan(payload_data).run()
-    except (TypeError, AttributeError, IndexError, KeyError, NameError, ValueError, AlgorithmError) as err:
-        logging.error(err)
-        return {"error": err.args[0]}
+        return solve(payload_data)
+    except DispatchBudgetExceeded:
+        # the payload is too large to solve, which the servers answer with a 400 status, see find_item_production
+        raise
+    except SOLVER_ERRORS as err:
+        return report_error(err, "find_powerplants_production")
+
+
+def find_registered_fleet_production(payload_data, fleet_registry):
+    """
+    Find the production plan of a registered fleet. Only the load and fuels of the request are checked.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels and fleet_id as keys, and optionally engine
+        fleet_registry (FleetRegistry): the registry holding the fleet
+
+    Returns:
+        message: the production plan if the request is correct, an error message otherwise
+    """
+    try:
+        perform_fleet_request_sanity_check(payload_data)
+        fleet_payload_data = fleet_registry.get(payload_data["fleet_id"]).payload_data(payload_data)
+    except (TypeError, ValueError, KeyError, SanityCheckInternalError) as err:
+        return report_error(err, "find_registered_fleet_production")
+    return find_powerplants_production(fleet_payload_data)
+
+
+def register_fleet(fleet_data, fleet_registry, fleet_id=None, etag=None):
+    """
+    Check every powerplant of a fleet and register it.
+
+    Parameters:
+        fleet_data (dict): a dictionary containing powerplants as key
+        fleet_registry (FleetRegistry): the registry to store the fleet in
+        fleet_id (str): the id of the fleet to update, a new fleet is registered if None
+        etag (str): if set, the fleet is only updated if its current etag matches, FleetVersionError is raised
+            otherwise
+
+    Returns:
+        message (dict): the fleet id, version and etag, an error message with the errors of every incorrect powerplant
+        otherwise
+    """
+    try:
+        type_checking(fleet_data, dict)
+        values_checking(fleet_data, ["powerplants"])
+        errors = check_powerplants(fleet_data["powerplants"], collect_errors=True,
+                                   check_powerplant=check_registered_powerplant)
+        if errors:
+            return {"error": f"{len(errors)} incorrect powerplants", "errors": errors}
+        return fleet_registry.register(fleet_data["powerplants"], fleet_id, etag).description()
+    except (TypeError, ValueError, KeyError, OverflowError, SanityCheckInternalError) as err:
+        return report_error(err, "register_fleet")
+
+
+def find_marginal_price(payload_data):
+    """
+    Find the marginal price of the payload load: the cost of the most expensive powerplant running to fill it.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels and powerplants as keys
+
+    Returns:
+        message (dict): the load and its marginal price, an error message otherwise
+    """
+    try:
+        load = payload_data["load"]
+        return {"load": load, "marginal_price": SupplyCurve.from_payload(payload_data).marginal_price(load)}
+    except SOLVER_ERRORS as err:
+        return report_error(err, "find_marginal_price")
+
+
+def find_time_series_production(payload_data):
+    """
+    Check a time series payload and find the production plan of every timestep.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels and powerplants as keys, load and fuels values being
+            lists with one value per timestep
+
+    Returns:
+        message (dict): the production of every powerplant per timestep, an error message otherwise
+    """
+    try:
+        perform_time_series_sanity_check(payload_data)
+        return TimeSeriesPlan(payload_data).run()
+    except SOLVER_ERRORS + (SanityCheckInternalError,) as err:
+        return report_error(err, "find_time_series_production")
+
+
+def find_wind_scenarios_production(payload_data):
+    """
+    Check a wind scenarios payload and find the cost and production statistics of its fleet over the scenarios.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels, powerplants and wind_scenarios or wind_distribution
+            as keys
+
+    Returns:
+        message (dict): the statistics of the scenarios, an error message otherwise
+    """
+    try:
+        perform_wind_scenarios_sanity_check(payload_data)
+        return WindScenarioPlan(payload_data).run()
+    except SOLVER_ERRORS + (SanityCheckInternalError,) as err:
+        return report_error(err, "find_wind_scenarios_production")
+
+
+def find_price_sweep_production(payload_data):
+    """
+    Check a price sweep payload and find the plan and total cost of its fleet at every point of the prices grid.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels, powerplants and sweep as keys
+
+    Returns:
+        message (dict): the plans and total costs of the grid, an error message otherwise
+    """
+    try:
+        perform_price_sweep_sanity_check(payload_data)
+        return PriceSweepPlan(payload_data).run()
+    except SOLVER_ERRORS + (SanityCheckInternalError,) as err:
+        return report_error(err, "find_price_sweep_production")
+
+
+def find_contingency_production(payload_data):
+    """
+    Check a payload and find the production plan of its fleet with each of its powerplants out of service in turn.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels and powerplants as keys
+
+    Returns:
+        message (dict): the base case and the N-1 cases, an error message otherwise
+    """
+    try:
+        perform_sanity_check(payload_data)
+        return ContingencyAnalysis.from_payload(payload_data).run()
+    except SOLVER_ERRORS + (SanityCheckInternalError,) as err:
+        return report_error(err, "find_contingency_production")
 
 
 def extract_json_from_request(request):
     try:
         return request.get_json()
     except Exception as err:
-        logging.error(err)
-        return {"error": err.args[0]}
-
+        return report_error(err, "extract_json_from_request")
 
 
 def sanity_check(data):
     try:
         perform_sanity_check(data)
-    except (ValueError, TypeError, SanityCheckInternalError) as err:
-        logging.error(err)
-        return {"error": err.args[0]}
+    except (ValueError, TypeError, KeyError, SanityCheckInternalError) as err:
+        return report_error(err, "sanity_check")
+
+
+def check_and_find_powerplants_production(payload_data):
+    """
+    Check a payload and find its production plan. Errors are returned instead of raised, except DispatchBudgetExceeded.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels and powerplants as keys
+
+    Returns:
+        message: the production plan if the payload is correct, an error message otherwise
+    """
+    check_deadline("sanity_check")
+    with METRICS.time_stage("sanity_check"):
+        error = sanity_check(payload_data)
+    if error is not None:
+        return error
+    return find_powerplants_production(payload_data)
+
+
+def find_item_production(payload_data):
+    """
+    Check and solve a payload of a batch or a stream. Every error is returned, DispatchBudgetExceeded included, so that a
+    failing payload does not prevent the other ones from being solved.
+
+    Parameters:
+        payload_data (dict): a dictionary containing load, fuels and powerplants as keys
 
+    Returns:
+        message: the production plan if the payload is correct, an error message otherwise
+    """
+    try:
+        return check_and_find_powerplants_production(payload_data)
+    except DispatchBudgetExceeded as err:
+        return report_error(err, "find_powerplants_production")
 
 
+def find_request_production(body, fleet_registry, result_cache=None):
+    """
+    The / resource, shared by api.py and the asynchronous server: parse the raw body of a request, then find the
+    production plan of the registered fleet it references, or check and solve the payload it holds.
+
+    Parameters:
+        body (bytes): the raw body of the request, a JSON payload
+        fleet_registry (FleetRegistry): the registry holding the fleets referenced by fleet_id
+        result_cache (ResultCache): caches the responses and coalesces identical requests, None to solve every request
+    Returns:
+        message: the production plan if the request is correct, an error message otherwise. DispatchBudgetExceeded is
+        raised for a payload too large to solve
+    """
+    if result_cache is None:
+        return parse_and_find_production(body, fleet_registry, None)
+    return result_cache.get_or_compute_body(body, lambda: parse_and_find_production(body, fleet_registry,
+                                                                                      result_cache))
+
+
+def parse_and_find_production(body, fleet_registry, result_cache):
+    check_deadline("extract_json_from_request")
+    with METRICS.time_stage("extract_json_from_request"):
+        try:
+            data = json.loads(body)
+        except ValueError as err:
+            return report_error(err, "extract_json_from_request")
+    if isinstance(data, dict) and "fleet_id" in data:
+        # the registered fleet may change between two identical requests, they are not cached
+        return find_registered_fleet_production(data, fleet_registry)
+    if result_cache is None:
+        return check_and_find_powerplants_production(data)
+    return result_cache.get_or_compute(data, check_and_find_powerplants_production, body)
+
+
+def find_batch_production(batch_data, solver=None):
+    """
+    Find the production plan of every payload of a batch.
+
+    Parameters:
+        batch_data (list, dict): a list of payloads, or a dictionary containing the shared keys and a "scenarios" list
+        solver (ParallelSolver): solves the payloads on a pool of processes if set, one after the other otherwise
+
+    Returns:
+        message (list): a production plan or an error message per payload, in the order of the batch. An error message
+        if the batch itself is malformed.
+    """
+    try:
+        shared_data, items = split_batch(batch_data)
+    except (TypeError, ValueError) as err:
+        return report_error(err, "find_batch_production")
+    if solver is not None:
+        return solver.solve(shared_data, items)
+    return [find_item_production(expand_scenario(shared_data, item)) for item in items]
@@ -0,0 +1,223 @@
+import atexit
+import logging
+import multiprocessing
+import queue
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from time import monotonic
+
+from power_plan.metrics import METRICS, Counter
+
+# characters of a logged message kept, the rest is cut
+MAX_MESSAGE_LENGTH = 1000
+
+ERROR_LOGS = METRICS.register(Counter(
+    "powerplan_error_logs_total", "Errors caught, per catching function and whether they were logged or suppressed.",
+    ("function", "outcome")))
+DROPPED_LOGS = METRICS.register(Counter(
+    "powerplan_log_records_dropped_total", "Log records dropped because the logging queue was full."))
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hand the log records to a QueueListener writing them from its own thread, so that logging never waits for the
+    disk. The records are formatted by the listener, and only if they are written; when the queue is full they are
+    dropped and counted instead of blocking the request.
+    """
+
+    def prepare(self, record):
+        # the listener lives in this process, the record does not need to be formatted to be handed over
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if METRICS.enabled:
+                DROPPED_LOGS.inc()
+
+
+class ProcessQueueHandler(NonBlockingQueueHandler):
+    """
+    Hand the log records of a worker process to the LogListener of the serving process. The records are formatted
+    here, and cut to the length of the formatter, as their arguments may not be picklable.
+    """
+
+    def prepare(self, record):
+        record = QueueHandler.prepare(self, record)
+        # not to be cut again by the formatter of the serving process
+        record.bounded = True
+        return record
+
+
+class BoundedFormatter(logging.Formatter):
+    """A formatter cutting the messages longer than max_length characters."""
+
+    def __init__(self, fmt=None, max_length=MAX_MESSAGE_LENGTH):
+        super().__init__(fmt)
+        self.max_length = max_length
+
+    def formatMessage(self, record):
+        if len(record.message) > self.max_length and not getattr(record, "bounded", False):
+            record.message = f"{record.message[:self.max_length]}... ({len(record.message)} characters)"
+        return super().formatMessage(record)
+
+
+class LogListener:
+    """
+    The background threads writing the records of this process and of its worker processes to the log file. The
+    records of this process come through an in-process queue, the ones of the workers through a multiprocessing queue,
+    see init_worker_logging.
+    """
+
+    def __init__(self, handler, max_length=MAX_MESSAGE_LENGTH, queue_size=10000):
+        """
+        Parameters:
+            handler (logging.Handler): the handler writing the records
+            max_length (int): the length of the messages of the worker processes, in characters
+            queue_size (int): the number of records waiting in each queue, beyond which new records are dropped
+        """
+        self.max_length = max_length
+        self.queue = queue.Queue(queue_size)
+        self.worker_queue = multiprocessing.get_context("spawn").Queue(queue_size)
+        self._listeners = [QueueListener(self.queue, handler), QueueListener(self.worker_queue, handler)]
+        self._started = False
+
+    def start(self):
+        for listener in self._listeners:
+            listener.start()
+        self._started = True
+
+    def stop(self):
+        """Write the records waiting in the queues and stop the threads."""
+        if self._started:
+            self._started = False
+            for listener in self._listeners:
+                listener.stop()
+
+
+# the listener started by start_logging, None until it is called
+_log_listener = None
+
+
+def start_logging(filename, level=logging.ERROR, fmt=None, max_length=MAX_MESSAGE_LENGTH, queue_size=10000):
+    """
+    Send the records of the root logger to a file through a bounded queue written by a background thread, stopped when
+    the interpreter exits. Worker processes started with init_worker_logging write to the same file.
+
+    Parameters:
+        filename (str): the log file
+        level (int): the level of the root logger
+        fmt (str): the format of the records
+        max_length (int): messages longer than that are cut, in characters
+        queue_size (int): the number of records waiting to be written, beyond which new records are dropped
+    Returns:
+        listener (LogListener): the started listener writing the records
+    """
+    global _log_listener
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(BoundedFormatter(fmt, max_length))
+    listener = LogListener(file_handler, max_length, queue_size)
+
+    root = logging.getLogger()
+    root.handlers = [NonBlockingQueueHandler(listener.queue)]
+    root.setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    _log_listener = listener
+    return listener
+
+
+def worker_logging():
+    """
+    Returns:
+        settings (tuple): the argument of init_worker_logging sending the records of a worker process to the listener
+                            of start_logging, None if it was not called
+    """
+    if _log_listener is None:
+        return None
+    return (_log_listener.worker_queue, logging.getLogger().level, _log_listener.max_length, ERROR_LOG.burst,
+            ERROR_LOG.interval)
+
+
+def init_worker_logging(settings):
+    """
+    Send the records of a worker process to the serving process, sampled as there. Called by the pool initializer, as
+    neither spawned nor forked workers can use the logging threads of the serving process.
+
+    Parameters:
+        settings (tuple): returned by worker_logging in the serving process, None to keep the logging of the worker
+    """
+    if settings is None:
+        return
+    log_queue, level, max_length, ERROR_LOG.burst, ERROR_LOG.interval = settings
+    handler = ProcessQueueHandler(log_queue)
+    handler.setFormatter(BoundedFormatter(max_length=max_length))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+
+class SampledErrorLog:
+    """
+    Log the errors caught while answering requests, at most burst times per interval seconds for every identical error:
+    a client sending the same malformed payload again and again fills neither the log nor the logging queue. The first
+    record of the next interval tells how many identical errors were suppressed before it, and every error is counted in
+    the metrics.
+    """
+
+    def __init__(self, logger, burst=10, interval=60., max_errors=1024):
+        """
+        Parameters:
+            logger (logging.Logger): the logger writing the errors
+            burst (int): the number of identical errors logged per interval, 0 logs none
+            interval (float): the length of the sampling intervals, in seconds, 0 logs every error
+            max_errors (int): the number of distinct errors followed, the least recently seen is forgotten beyond
+        """
+        self.logger = logger
+        self.burst = burst
+        self.interval = interval
+        self.max_errors = max_errors
+        self._intervals = OrderedDict()
+        self._lock = threading.Lock()
+
+    def error(self, function_name, err):
+        """
+        Parameters:
+            function_name (str): the name of the function which caught the error
+            err (Exception): the error caught
+        Returns:
+            logged (bool): True if the error was logged, False if it was suppressed
+        """
+        # errors are identical when they have the same type, message and catching function
+        key = (function_name, type(err), str(err)[:MAX_MESSAGE_LENGTH])
+        now = monotonic()
+        with self._lock:
+            current = self._intervals.get(key)
+            suppressed = 0
+            if current is None or now - current[0] >= self.interval:
+                if current is not None:
+                    suppressed = current[2]
+                # the start of the interval, the errors logged and the errors suppressed
+                current = self._intervals[key] = [now, 0, 0]
+                if len(self._intervals) > self.max_errors:
+                    self._intervals.popitem(last=False)
+            self._intervals.move_to_end(key)
+            logged = current[1] < self.burst
+            current[1 if logged else 2] += 1
+
+        if METRICS.enabled:
+            ERROR_LOGS.inc(function_name, "logged" if logged else "suppressed")
+        if not logged:
+            return False
+        # formatted by the logging handler, only if the record is written
+        if suppressed:
+            self.logger.error("%s: %s (%d identical errors were not logged since the last one)", function_name, err,
+                              suppressed)
+        else:
+            self.logger.error("%s: %s", function_name, err)
+        return True
+
+
+ERROR_LOG = SampledErrorLog(logging.getLogger("power_plan"))
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import threading
+import uuid
+
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import FleetVersionError
+from power_plan.engines import COLUMN_ENGINES
+from power_plan.vectorized import FleetColumns
+
+
+class RegisteredFleet:
+    """A validated fleet, kept parsed as a CompactFleet so that solve requests referencing it skip parsing and checks."""
+
+    def __init__(self, fleet_id, version, powerplants):
+        self.fleet_id = fleet_id
+        self.version = version
+        self.compact = CompactFleet(powerplants)
+        self.etag = compute_etag(powerplants)
+
+    def description(self):
+        return {"fleet_id": self.fleet_id, "version": self.version, "etag": self.etag}
+
+    def payload_data(self, data):
+        """
+        Complete a solve request with the fleet. The vectorized engine, used by default, and the other column engines
+        run on read-only numpy views over the arrays of the compact fleet, the other engines on the compact fleet itself.
+        It is not copied, as solving only reads it.
+
+        Parameters:
+            data (dict): a dictionary containing load, fuels and fleet_id as keys, and optionally engine
+        Returns:
+            payload_data (dict): a payload that can be passed to find_powerplants_production
+        """
+        engine = data.get("engine", "vectorized")
+        powerplants = FleetColumns.from_compact(self.compact) if engine in COLUMN_ENGINES else self.compact
+        return dict(data, engine=engine, powerplants=powerplants)
+
+
+class FleetRegistry:
+    """Thread safe in-memory store of the registered fleets."""
+
+    def __init__(self):
+        self._fleets = {}
+        self._lock = threading.Lock()
+
+    def register(self, powerplants, fleet_id=None, etag=None):
+        """
+        Register a new fleet, or a new version of a registered one.
+
+        Parameters:
+            powerplants (list): the validated powerplants dictionaries
+            fleet_id (str): the id of the fleet to update, a new id is generated if None
+            etag (str): if set, the fleet is only updated if its current etag matches
+        Returns:
+            fleet (RegisteredFleet): the registered fleet
+        """
+        with self._lock:
+            if fleet_id is None:
+                fleet_id = uuid.uuid4().hex
+            current_fleet = self._fleets.get(fleet_id)
+            if etag is not None and (current_fleet is None or current_fleet.etag != etag):
+                raise FleetVersionError(f"fleet {fleet_id} has been modified, its etag does not match {etag}")
+
+            version = current_fleet.version + 1 if current_fleet is not None else 1
+            fleet = RegisteredFleet(fleet_id, version, powerplants)
+            self._fleets[fleet_id] = fleet
+            return fleet
+
+    def add(self, fleet):
+        """Store a fleet registered elsewhere, e.g. sent by the serving process to the process solving its requests."""
+        with self._lock:
+            self._fleets[fleet.fleet_id] = fleet
+
+    def get(self, fleet_id):
+        try:
+            return self._fleets[fleet_id]
+        except KeyError:
+            raise KeyError(f"unknown fleet: {fleet_id}")
+
+    def delete(self, fleet_id):
+        with self._lock:
+            try:
+                del self._fleets[fleet_id]
+            except KeyError:
+                raise KeyError(f"unknown fleet: {fleet_id}")
+
+
+def compute_etag(powerplants):
+    """Return a hash identifying the content of a fleet."""
+    content = json.dumps([dict(pp_dict) for pp_dict in powerplants], sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
@@ -1,5 +1,13 @@
+import reprlib
+
 from power_plan.custom_exceptions import SanityCheckInternalError
 
+# error messages show the first items of an incorrect value only, so that their size does not grow with the payload
+_error_repr = reprlib.Repr()
+_error_repr.maxlevel = 2
+_error_repr.maxdict = _error_repr.maxlist = _error_repr.maxtuple = 8
+_error_repr.maxstring = _error_repr.maxother = 80
+
 first_layer_keys_and_values_type_and_interval = [
     ("load", int, (0,)),
     ("fuels", dict, None),
@@ -13,6 +21,12 @@ fuels_layer_keys_values_type_and_interval = [
     ("wind(%)", (int, float), (0, 100)),
 ]
 
+fleet_request_layer_keys_and_values_type_and_interval = [
+    ("load", int, (0,)),
+    ("fuels", dict, None),
+    ("fleet_id", str, None)
+]
+
 powerplants_layer_keys_and_values_type_and_interval = [
     ("name", str, None),
     ("type", str, None),
@@ -21,6 +35,11 @@ powerplants_layer_keys_and_values_type_and_interval = [
     ("pmax", int, ("pmin",)),
 ]
 
+# the powerplants types the engines solve
+POWERPLANT_TYPES = ("gasfired", "turbojet", "windturbine")
+# registered fleets store the powers as 64 bits integers
+MAX_REGISTERED_POWER = 2 ** 63 - 1
+
 
 def perform_sanity_check(data):
     """
@@ -34,12 +53,76 @@ def perform_sanity_check(data):
     """
     type_checking(data, dict)
     type_checking(data["load"], (int, float))
-    check_json_layer(data, first_layer_keys_and_values_type_and_interval)
+    check_first_layer(data)
+
+    check_fuels_layer(data["fuels"])
+    check_powerplants(data["powerplants"])
+
+
+def perform_fleet_request_sanity_check(data):
+    """
+    Check a request solving a registered fleet: the fleet itself has been checked when it was registered.
+
+    Parameters:
+        data (dict): a dictionary containing load, fuels and fleet_id as keys.
+    """
+    type_checking(data, dict)
+    check_fleet_request_layer(data)
+    check_fuels_layer(data["fuels"])
 
-    check_json_layer(data["fuels"], fuels_layer_keys_values_type_and_interval)
-    type_checking(data["powerplants"], list)
-    for pp_dict in data["powerplants"]:
-        check_json_layer(pp_dict, powerplants_layer_keys_and_values_type_and_interval)
+
+def check_powerplants(powerplants, collect_errors=False, check_powerplant=None):
+    """
+    Check every powerplant of a fleet in one pass.
+
+    Parameters:
+        powerplants (list): the powerplants dictionaries
+        collect_errors (bool): if False, raise the error of the first incorrect powerplant. If True, check them all and
+                                return their errors.
+        check_powerplant (function): checks a powerplant dictionary, check_powerplants_layer if None
+    Returns:
+        errors (list): a dict with the index and the error message of every incorrect powerplant
+    """
+    type_checking(powerplants, list, "powerplants")
+    if check_powerplant is None:
+        check_powerplant = check_powerplants_layer
+    if not collect_errors:
+        for pp_dict in powerplants:
+            check_powerplant(pp_dict)
+        return []
+
+    errors = []
+    for index, pp_dict in enumerate(powerplants):
+        try:
+            check_powerplant(pp_dict)
+        except (TypeError, ValueError, KeyError, SanityCheckInternalError) as err:
+            errors.append({"index": index, "error": err.args[0]})
+    return errors
+
+
+def check_registered_powerplant(pp_dict):
+    """
+    Check a powerplant of a fleet to register. A registered fleet is solved without being checked again, so on top of
+    check_powerplants_layer its type must be known by the engines and its powers must fit the arrays it is stored in.
+
+    Parameters:
+        pp_dict (dict): a dictionary containing name, type, efficiency, pmin and pmax as keys
+    """
+    check_powerplants_layer(pp_dict)
+    if pp_dict["type"] not in POWERPLANT_TYPES:
+        raise ValueError(f"unknown powerplant type: {short_repr(pp_dict['type'])}. "
+                         f"Should be: windturbine, turbojet or gasfired")
+    interval_checking(pp_dict, "pmax", ("pmin", MAX_REGISTERED_POWER))
+
+
+def short_repr(value):
+    """
+    Parameters:
+        value: a value of the payload
+    Returns:
+        text (str): the repr of value, cut after a few items of every container and a few dozens characters
+    """
+    return _error_repr.repr(value)
 
 
 def type_checking(data_to_check, type_to_check, data_name=None):
@@ -54,9 +137,11 @@ def type_checking(data_to_check, type_to_check, data_name=None):
     """
     if not isinstance(data_to_check, type_to_check):
         if data_name:
-            error_message = f"{data_name} value should be {type_to_check} instead of {type(data_to_check)}: {data_to_check}"
+            error_message = f"{data_name} value should be {type_to_check} instead of {type(data_to_check)}: " \
+                            f"{short_repr(data_to_check)}"
         else:
-            error_message = f"{data_to_check} should be {type_to_check} instead of {type(data_to_check)}: {type_to_check}"
+            error_message = f"{short_repr(data_to_check)} should be {type_to_check} " \
+                            f"instead of {type(data_to_check)}: {type_to_check}"
         raise TypeError(error_message)
 
 
@@ -70,7 +155,8 @@ def values_checking(values_list, expected_values):
     """
     if not all(key in values_list for key in expected_values):
         error_message = f"wrong json keys received. It should be:" \
-                        f"{[str(expected_value) for expected_value in expected_values]}. Instead we have: {values_list}"
+                        f"{[str(expected_value) for expected_value in expected_values]}. Instead we have: " \
+                        f"{short_repr(list(values_list))}"
         raise ValueError(error_message)
 
 
@@ -89,7 +175,7 @@ def interval_checking(dict_layer, key, interval):
     if len(interval) == 1:
         minimum_value = convert_interval_value(interval[0], dict_layer)
 
-        if dict_layer[key] - minimum_value > 0:
+        if dict_layer[key] - minimum_value < 0:
             raise ValueError(f"{key} value: {dict_layer[key]} must be higher than {minimum_value}")
     elif len(interval) == 2:
         minimum_value = convert_interval_value(interval[0], dict_layer)
@@ -97,7 +183,7 @@ def interval_checking(dict_layer, key, interval):
 
         if not minimum_value <= dict_layer[key] <= maximum_value:
             raise ValueError(f"{key} value of {dict_layer[key]} is not in the interval "
-                             f"[{minimum_value}, {maximum_value}] for dict {dict_layer} ")
+                             f"[{minimum_value}, {maximum_value}] for dict {short_repr(dict_layer)} ")
     else:
         raise SanityCheckInternalError("Incorrect number of element in interval parameter.")
 
@@ -138,4 +224,67 @@ def check_json_layer(json_layer, key_value_type_and_interval):
 
         type_checking(json_layer[layer_key], value_type, layer_key)
         if interval is not None:
-            interval_checking(json_layer, layer_key, interval)
\ No newline at end of file
+            interval_checking(json_layer, layer_key, interval)
+
+
+def compile_layer_check(key_value_type_and_interval, name="check_layer"):
+    """
+    Compile a rules table into a function checking a json layer against it.
+
+    The generated function reads every key once and tests all the types and intervals in a single expression, instead
+    of interpreting the table for every layer. When the layer is incorrect, it falls back to check_json_layer, so that
+    the raised error is the very same as the interpreted one.
+
+    Parameters:
+        key_value_type_and_interval (list): a list of tuples of triplets: key, value and interval. Interval must be a
+                                                tuple of one or two elements
+        name (str): the name of the generated function
+    Returns:
+        check (function): a function taking the json layer to check as only parameter
+    """
+    namespace = {"check_json_layer": check_json_layer, "rules": key_value_type_and_interval}
+    reads = []
+    conditions = []
+
+    for i, (layer_key, value_type, interval) in enumerate(key_value_type_and_interval):
+        namespace[f"type_{i}"] = value_type
+        reads.append(f"value_{i} = json_layer[{layer_key!r}]")
+        conditions.append(f"isinstance(value_{i}, type_{i})")
+        if interval is None:
+            continue
+
+        bounds = []
+        for j, interval_bound in enumerate(interval):
+            if isinstance(interval_bound, str):
+                bounds.append(f"json_layer[{interval_bound!r}]")
+            else:
+                namespace[f"bound_{i}_{j}"] = interval_bound
+                bounds.append(f"bound_{i}_{j}")
+
+        if len(bounds) == 1:
+            conditions.append(f"value_{i} - {bounds[0]} >= 0")
+        elif len(bounds) == 2:
+            conditions.append(f"{bounds[0]} <= value_{i} <= {bounds[1]}")
+        else:
+            raise SanityCheckInternalError("Incorrect number of element in interval parameter.")
+
+    source = "\n".join([
+        f"def {name}(json_layer):",
+        "    try:",
+        *[f"        {read}" for read in reads],
+        f"        if {' and '.join(conditions) or 'True'}:",
+        "            return",
+        "    except (LookupError, TypeError):",
+        "        pass",
+        "    check_json_layer(json_layer, rules)",
+    ])
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+check_first_layer = compile_layer_check(first_layer_keys_and_values_type_and_interval, "check_first_layer")
+check_fuels_layer = compile_layer_check(fuels_layer_keys_values_type_and_interval, "check_fuels_layer")
+check_fleet_request_layer = compile_layer_check(fleet_request_layer_keys_and_values_type_and_interval,
+                                                "check_fleet_request_layer")
+check_powerplants_layer = compile_layer_check(powerplants_layer_keys_and_values_type_and_interval,
+                                              "check_powerplants_layer")
@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class KineticMeritOrder:
+    """
+    The merit order of a fleet kept up to date as the fuels prices change, repairing it instead of sorting it again.
+
+    The cost of a powerplant is affine in the prices, with the fuel of its type divided by its efficiency, so the
+    powerplants of one type keep their relative order whatever the prices: new prices only swap the few powerplants of
+    different types whose costs crossed, and the previous order stays made of long sorted runs. Finding the adjacent
+    powerplants in the wrong order is a single vectorized pass, with nothing else to do when there are none. Otherwise
+    the previous order is sorted again with a stable sort, numpy's timsort for floats, which finds these runs and only
+    moves the powerplants between them.
+    """
+
+    def __init__(self):
+        self.order = None
+        self.sort_count = 0
+        self.repair_count = 0
+
+    def update(self, costs):
+        """
+        Parameters:
+            costs (numpy.ndarray): the cost of every powerplant, in the payload order
+        Returns:
+            order (numpy.ndarray): the powerplants indices in the merit order, ties in the payload order
+        """
+        if self.order is None:
+            self.sort(costs)
+            return self.order
+
+        keys = costs[self.order]
+        cost_steps = np.diff(keys)
+        if (cost_steps < 0).any():
+            self.repair(costs, keys)
+        elif not are_ties_in_payload_order(cost_steps, self.order):
+            self.sort(costs)
+        return self.order
+
+    def sort(self, costs):
+        """Sort the fleet from scratch, for the first prices or when new ties are not in the payload order."""
+        self.sort_count += 1
+        self.order = np.argsort(costs, kind="stable")
+
+    def repair(self, costs, keys):
+        """Sort the previous merit order again, keeping it wherever it is still sorted."""
+        moves = np.argsort(keys, kind="stable")
+        order = self.order[moves]
+        if are_ties_in_payload_order(np.diff(keys[moves]), order):
+            self.repair_count += 1
+            self.order = order
+        else:
+            # powerplants whose costs became equal kept their previous order instead of the payload order
+            self.sort(costs)
+
+
+def are_ties_in_payload_order(cost_steps, order):
+    """
+    Parameters:
+        cost_steps (numpy.ndarray): the differences between the costs of adjacent powerplants, in order
+        order (numpy.ndarray): powerplants indices, sorted by cost
+    Returns:
+        (bool): True if the powerplants with the same cost are in the payload order, False otherwise.
+    """
+    return not np.any((cost_steps == 0) & (np.diff(order) < 0))
+
+
+def is_merit_order(costs, order):
+    """
+    Check that order sorts costs the way a stable sort would: ties are kept in the payload order.
+
+    Parameters:
+        costs (numpy.ndarray): the cost of every powerplant, in the payload order
+        order (numpy.ndarray): powerplants indices
+    Returns:
+        (bool): True if order is the merit order of costs, False otherwise.
+    """
+    cost_steps = np.diff(costs[order])
+    return bool(np.all((cost_steps > 0) | ((cost_steps == 0) & (np.diff(order) > 0))))
@@ -0,0 +1,162 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+
+# upper bounds of the histograms buckets, in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Counter:
+    """A Prometheus counter: one ever increasing value per combination of labels values."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in sorted(self.values.items()):
+            yield self.name, format_labels(self.label_names, label_values), value
+
+
+class Gauge(Counter):
+    """A Prometheus gauge: one value per combination of labels values, that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self.values[label_values] = value
+
+
+class Histogram:
+    """A Prometheus histogram with fixed buckets: observing a value is a bisection and three additions."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(label_values)
+            if series is None:
+                # one count per bucket and one for +Inf, then the sum and the count of the observed values
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0., 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        for label_values, (counts, total, count) in sorted(self.series.items()):
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative_count += bucket_count
+                labels = format_labels(self.label_names + ("le",), label_values + (str(upper_bound),))
+                yield f"{self.name}_bucket", labels, cumulative_count
+            labels = format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class StageTimer:
+    """Context manager observing the time spent in its block into a histogram, on a monotonic clock."""
+
+    __slots__ = ("histogram", "label_values", "start")
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(perf_counter() - self.start, *self.label_values)
+        return False
+
+
+class NullTimer:
+    """Context manager doing nothing, used when the metrics are off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class MetricsRegistry:
+    """
+    The metrics of the application. When it is disabled, timers and counters are no-ops so that instrumented code
+    costs a single attribute check.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.metrics = []
+        self.stage_duration = self.register(Histogram(
+            "powerplan_stage_duration_seconds", "Time spent in every stage of a request.", ("stage",)))
+        self.errors = self.register(Counter(
+            "powerplan_errors_total", "Errors caught, per catching function and exception type.",
+            ("function", "exception")))
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def time_stage(self, stage):
+        """
+        Parameters:
+            stage (str): the name of the stage timed
+        Returns:
+            timer: a context manager timing its block in the stage_duration histogram
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self.stage_duration, (stage,))
+
+    def count_error(self, function_name, err):
+        if self.enabled:
+            self.errors.inc(function_name, type(err).__name__)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {value}" for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(label_names, label_values):
+    if not label_names:
+        return ""
+    escaped_values = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                      for value in label_values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(label_names, escaped_values)) + "}"
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,239 @@
+import numpy as np
+
+from power_plan.custom_exceptions import AlgorithmError, DispatchBudgetExceeded
+from power_plan.deadline import check_deadline
+from power_plan.metrics import METRICS
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+class OptimalPowerPlan(VectorizedPowerPlan):
+    """
+    Find the production plan of minimal cost, whatever the pmin of the powerplants. Where PowerPlan can only lower the
+    powerplant just before the marginal one to make room for its pmin, this solver chooses which powerplants run.
+
+    It runs a dynamic programming over the integer loads, in O(number of powerplants x load) time and memory,
+    restricted to the powerplants close to the margin of the merit order, see optimal_dispatch.
+    """
+
+    def __init__(self, data, max_cells=None):
+        """
+        Parameters:
+            data (dict): a dictionary containing load, fuels and powerplants as keys
+            max_cells (int): the number of powerplants x loads the dynamic programming may fill, beyond which
+                                DispatchBudgetExceeded is raised. No limit if None
+        """
+        super().__init__(data)
+        self.max_cells = max_cells
+
+    def run(self):
+        """
+        Returns:
+            message (list): a list of dict containing the name and production of every powerplant, in the merit order
+        """
+        check_deadline("sort_by_merit_order")
+        with METRICS.time_stage("sort_by_merit_order"):
+            order = self.sort_by_merit_order()
+        check_deadline("update_powerplants_production")
+        with METRICS.time_stage("update_powerplants_production"):
+            pmax = self.estimate_available_power()[order]
+            production = optimal_dispatch(self.fleet.pmin[order], pmax, self.estimate_costs()[order], self.load,
+                                          self.max_cells)
+        return self.generate_response(order, production)
+
+
+def optimal_dispatch(pmin, pmax, costs, load, max_cells=None):
+    """
+    Find the productions of minimal cost filling the load, every powerplant being either off or between its pmin
+    and pmax.
+
+    The powerplants far from the margin are settled first, as in a branch and bound: a plan found around the marginal
+    powerplant of the merit order gives an upper bound of the cost, the merit order without pmin a lower bound, and
+    every powerplant whose production can't change without costing more than the gap between them is fixed. The exact
+    dynamic programming only runs on the others.
+
+    Parameters:
+        pmin (numpy.ndarray): the powerplants minimum production, in the merit order
+        pmax (numpy.ndarray): the powerplants available production, in the merit order
+        costs (numpy.ndarray): the powerplants cost per MWh, in the merit order
+        load (int): the load to fill
+        max_cells (int): the number of powerplants x loads each dynamic programming may fill, no limit if None
+    Returns:
+        production (numpy.ndarray): the powerplants production, in the merit order
+    Raises:
+        DispatchBudgetExceeded: if the plan can't be found within max_cells
+    """
+    pmin, costs = pmin.astype(np.int64), costs.astype(np.float64)
+    # a powerplant whose available production is below its pmin can only be off
+    pmax = np.where(pmin <= pmax, pmax, 0).astype(np.int64)
+    if load == 0:
+        return np.zeros(len(pmax), dtype=np.int64)
+    if load < 0 or load > pmax.sum():
+        raise AlgorithmError("production does not fill the load")
+
+    cumulative_pmax = np.cumsum(pmax)
+    marginal = int(np.searchsorted(cumulative_pmax, load, side="left"))
+    production, upper_bound = window_dispatch(pmin, pmax, costs, load, marginal, max_cells=max_cells)
+    if upper_bound is None:
+        return production
+
+    # lower bound: the merit order without pmin, whose marginal cost prices the deviations of any plan from it
+    marginal_cost = costs[marginal]
+    below = np.arange(len(pmax)) < marginal
+    lower_bound = costs[below] @ pmax[below] + marginal_cost * (load - cumulative_pmax[marginal] + pmax[marginal])
+    gap = upper_bound - lower_bound + 1e-9 * max(1., abs(upper_bound))
+    fixed_at_pmax = below & (marginal_cost - costs > gap)
+    fixed_off = ~below & ((costs - marginal_cost) * np.maximum(pmin, 1) > gap)
+    free = ~(fixed_at_pmax | fixed_off)
+
+    production = np.where(fixed_at_pmax, pmax, 0)
+    production[free] = exact_dispatch(pmin[free], pmax[free], costs[free], load - int(pmax[fixed_at_pmax].sum()),
+                                      max_cells)
+    return production
+
+
+def window_dispatch(pmin, pmax, costs, load, marginal, width=8, max_cells=None):
+    """
+    Find a plan changing only the powerplants around the marginal one of the merit order, the ones before running
+    at pmax and the ones after being off, widening the window until a plan is found.
+
+    Returns:
+        production (numpy.ndarray): the plan found, in the merit order
+        cost (float): the cost of the plan, None if the window covered every powerplant so that the plan is optimal
+    """
+    while True:
+        start, end = max(0, marginal - width), min(len(pmax), marginal + width + 1)
+        window_load = load - int(pmax[:start].sum())
+        covers_every_powerplant = start == 0 and end == len(pmax)
+        production = np.zeros(len(pmax), dtype=np.int64)
+        production[:start] = pmax[:start]
+        try:
+            production[start:end] = exact_dispatch(pmin[start:end], pmax[start:end], costs[start:end], window_load,
+                                                   max_cells)
+        except DispatchBudgetExceeded:
+            # wider windows cost more
+            raise
+        except AlgorithmError:
+            if covers_every_powerplant:
+                raise
+            width *= 2
+            continue
+        return production, None if covers_every_powerplant else float(costs @ production)
+
+
+def exact_dispatch(pmin, pmax, costs, load, max_cells=None):
+    """
+    Find the productions of minimal cost filling the load, by dynamic programming over the integer loads in
+    O(number of powerplants x load).
+
+    Costs being linear, once it is known which powerplants run, the cheapest plan starts them all at pmin and raises
+    them in the merit order: the running powerplants before the one raised partially are at pmax and the ones after it
+    at pmin. The dynamic programming looks for the best plan of this shape, walking the powerplants in the merit order
+    with two costs per load: before the partial powerplant is chosen and after.
+
+    Parameters:
+        pmin (numpy.ndarray): the powerplants minimum production, in the merit order
+        pmax (numpy.ndarray): the powerplants available production, in the merit order
+        costs (numpy.ndarray): the powerplants cost per MWh, in the merit order
+        load (int): the load to fill
+        max_cells (int): the number of powerplants x loads the dynamic programming may fill, no limit if None
+    Returns:
+        production (numpy.ndarray): the powerplants production, in the merit order
+    """
+    production = np.zeros(len(pmax), dtype=np.int64)
+    if load == 0:
+        return production
+    if load < 0 or load > pmax.sum():
+        raise AlgorithmError("no combination of powerplants productions can fill the load")
+    if max_cells is not None and len(pmax) * (load + 1) > max_cells:
+        raise DispatchBudgetExceeded(f"the optimal dispatch of {len(pmax)} powerplants for a load of {load} exceeds "
+                                     f"the budget of {max_cells} cells")
+
+    loads = np.arange(load + 1)
+    # cheapest cost of every load with the powerplants seen so far, before and after the partial powerplant
+    before = np.full(load + 1, np.inf)
+    before[0] = 0.
+    after = np.full(load + 1, np.inf)
+    # decisions taken for every powerplant and load, to rebuild the plan
+    at_pmax = np.zeros((len(pmax), load + 1), dtype=bool)
+    after_choices = np.zeros((len(pmax), load + 1), dtype=np.uint8)
+
+    for i, (low, high, cost) in enumerate(zip(pmin.tolist(), pmax.tolist(), costs.tolist())):
+        if high == 0 or low > high:
+            continue
+        new_after = after.copy()
+        if 0 < low <= load:
+            update_minimum(new_after[low:], after[:-low] + cost * low, after_choices[i, low:], AT_PMIN)
+        partial = window_minimum(before - cost * loads, low, high) + cost * loads
+        update_minimum(new_after, partial, after_choices[i], PARTIAL)
+        if high <= load:
+            update_minimum(before[high:], before[:-high] + cost * high, at_pmax[i, high:], True)
+        after = new_after
+
+    if np.isinf(before[load]) and np.isinf(after[load]):
+        raise AlgorithmError("no combination of powerplants productions can fill the load")
+
+    remaining_load = load
+    is_after = after[load] < before[load]
+    for i in reversed(range(len(pmax))):
+        if is_after and after_choices[i, remaining_load] == AT_PMIN:
+            production[i] = pmin[i]
+        elif is_after and after_choices[i, remaining_load] == PARTIAL:
+            production[i] = partial_production(pmin, pmax, costs, i, remaining_load)
+            is_after = False
+        elif not is_after and at_pmax[i, remaining_load]:
+            production[i] = pmax[i]
+        remaining_load -= production[i]
+    return production
+
+
+# choices of a powerplant after the partial powerplant, or being it
+AT_PMIN, PARTIAL = 1, 2
+
+
+def update_minimum(best, candidate, choices, choice):
+    """Lower best where candidate is lower, recording choice for these loads."""
+    lower = candidate < best
+    best[lower] = candidate[lower]
+    choices[lower] = choice
+
+
+def window_minimum(values, low, high):
+    """
+    Parameters:
+        values (numpy.ndarray): the values to search, infinity meaning unreachable
+        low (int): the smallest offset of the window
+        high (int): the largest offset of the window
+    Returns:
+        minimum (numpy.ndarray): for every index l, the minimum of values between l - high and l - low, in O(len(values))
+                                    whatever the width of the window, with the van Herk / Gil-Werman algorithm
+    """
+    width = high - low + 1
+    padded = np.concatenate((np.full(high, np.inf), values))
+    blocks = -(-len(padded) // width)
+    padded = np.concatenate((padded, np.full(blocks * width - len(padded), np.inf))).reshape(blocks, width)
+    prefix = np.minimum.accumulate(padded, axis=1).ravel()
+    suffix = np.minimum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(len(values))
+    return np.minimum(suffix[starts], prefix[starts + width - 1])
+
+
+def partial_production(pmin, pmax, costs, partial, load):
+    """
+    Find the production of the partial powerplant, recomputing the costs of the powerplants before it at pmax.
+
+    Parameters:
+        pmin (numpy.ndarray): the powerplants minimum production, in the merit order
+        pmax (numpy.ndarray): the powerplants available production, in the merit order
+        costs (numpy.ndarray): the powerplants cost per MWh, in the merit order
+        partial (int): the index of the partial powerplant
+        load (int): the load filled by the partial powerplant and the ones before it
+    Returns:
+        production (int): the production of the partial powerplant
+    """
+    before = np.full(load + 1, np.inf)
+    before[0] = 0.
+    for low, high, cost in zip(pmin[:partial].tolist(), pmax[:partial].tolist(), costs[:partial].tolist()):
+        if 0 < high <= load and low <= high:
+            np.minimum(before[high:], before[:-high] + cost * high, out=before[high:])
+    productions = np.arange(pmin[partial], min(pmax[partial], load) + 1)
+    return int(productions[np.argmin(before[load - productions] + costs[partial] * productions)])
@@ -0,0 +1,160 @@
+import hashlib
+import multiprocessing
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from power_plan import config
+from power_plan.batch import expand_scenario
+from power_plan.error_catcher_functions import find_item_production
+from power_plan.error_log import init_worker_logging, worker_logging
+
+# the data shared by the items of the last batches solved by this worker process, keyed by the digest of its pickle
+_shared_data = OrderedDict()
+# number of shared data kept by a worker, so that batches alternating between a few fleets don't send them again
+MAX_SHARED_DATA = 4
+
+
+def _init_worker(engine_settings, logging_settings):
+    """Apply the settings of the serving process, which a spawned worker does not inherit."""
+    config.apply_engine_settings(engine_settings)
+    init_worker_logging(logging_settings)
+
+
+def _solve_chunk(digest, shared_pickle, items):
+    """
+    Solve a chunk of batch items in a worker process.
+
+    Parameters:
+        digest (bytes): the digest of the pickled shared data of the batch
+        shared_pickle (bytes): the pickled shared data, None if the worker is expected to hold it already
+        items (list): the payloads or scenarios to solve
+    Returns:
+        worker (int): the process id of the worker
+        message (list): a production plan or an error message per item, None if the worker does not hold the shared
+                        data of digest and shared_pickle is None
+    """
+    if digest not in _shared_data:
+        if shared_pickle is None:
+            return os.getpid(), None
+        _shared_data[digest] = pickle.loads(shared_pickle)
+        while len(_shared_data) > MAX_SHARED_DATA:
+            _shared_data.popitem(last=False)
+    _shared_data.move_to_end(digest)
+    return os.getpid(), solve_items(_shared_data[digest], items)
+
+
+def solve_items(shared_data, items):
+    """Solve batch items one after the other, completing each of them with the shared data."""
+    return [find_item_production(expand_scenario(shared_data, item)) for item in items]
+
+
+class ParallelSolver:
+    """
+    Solve the items of a batch on a pool of worker processes, so that a batch uses every core instead of one.
+
+    The pool is started with the first batch large enough and kept for the next ones. Its workers are spawned rather
+    than forked: a fork of the threaded server could copy a lock held by another thread, and deadlock on it.
+
+    The data shared by the items, usually the fleet, is pickled once per batch and identified by its digest. Until
+    every worker holds it, every chunk of items carries it, so that the first batch of a fleet is solved in a single
+    pass and every worker unpickles it once; the next batches of the fleet send the chunks without it. A worker that
+    does not hold it anyway, e.g. after evicting it, answers None and its chunk is sent again with it. Results keep the
+    order of the items.
+
+    A worker dying, e.g. killed by the system, breaks the pool: it is replaced by a new one, on which the batch is
+    solved again once.
+    """
+
+    def __init__(self, max_workers=None, chunksize=None, min_parallel_items=1000):
+        """
+        Parameters:
+            max_workers (int): the number of worker processes, the number of cores if None
+            chunksize (int): the number of items sent at once to a worker, chosen so that every worker gets about four
+                chunks if None
+            min_parallel_items (int): batches with fewer items are solved in the current process, where they are
+                faster to solve than to send to a pool
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.min_parallel_items = min_parallel_items
+        # chunks sent with the shared data of their batch, and among them the chunks sent a second time
+        self.shared_data_sent = 0
+        self.chunks_resent = 0
+        self._executor = None
+        # the process ids of the workers holding each shared data, the most recently used last
+        self._holders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def solve(self, shared_data, items):
+        """
+        Parameters:
+            shared_data (dict): the keys shared by every item
+            items (list): the payloads or scenarios to solve
+        Returns:
+            message (list): a production plan or an error message per item, in the order of the items
+        """
+        if len(items) < self.min_parallel_items:
+            return solve_items(shared_data, items)
+
+        chunksize = self.chunksize or max(1, -(-len(items) // (4 * self.max_workers)))
+        chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+        shared_pickle = pickle.dumps(shared_data, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(shared_pickle).digest()
+
+        executor = self.executor()
+        try:
+            results = self.solve_chunks(executor, digest, shared_pickle, chunks)
+        except BrokenProcessPool:
+            self.discard(executor)
+            results = self.solve_chunks(self.executor(), digest, shared_pickle, chunks)
+        return [result for chunk_results in results for result in chunk_results]
+
+    def solve_chunks(self, executor, digest, shared_pickle, chunks):
+        """Return the results of every chunk, solved on the pool in a single pass unless a worker missed the data."""
+        with self._lock:
+            send_shared_data = len(self._holders.get(digest, ())) < self.max_workers
+        futures = [executor.submit(_solve_chunk, digest, shared_pickle if send_shared_data else None, chunk)
+                   for chunk in chunks]
+        results = [future.result() for future in futures]
+        missing = [i for i, (_, chunk_results) in enumerate(results) if chunk_results is None]
+        futures = {i: executor.submit(_solve_chunk, digest, shared_pickle, chunks[i]) for i in missing}
+        for i, future in futures.items():
+            results[i] = future.result()
+
+        with self._lock:
+            self.shared_data_sent += (len(chunks) if send_shared_data else 0) + len(missing)
+            self.chunks_resent += len(missing)
+            self._holders.setdefault(digest, set()).update(worker for worker, _ in results)
+            self._holders.move_to_end(digest)
+            while len(self._holders) > MAX_SHARED_DATA:
+                self._holders.popitem(last=False)
+        return [chunk_results for _, chunk_results in results]
+
+    def executor(self):
+        """Return the pool of worker processes, started on the first call."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_worker,
+                                                     initargs=(config.engine_settings(), worker_logging()))
+            return self._executor
+
+    def discard(self, executor):
+        """Stop a broken pool, the next batch starts a new one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._holders.clear()
+        executor.shutdown(wait=False)
+
+    def shutdown(self):
+        """Stop the worker processes, the next batch starts a new pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._holders.clear()
+        if executor is not None:
+            executor.shutdown()
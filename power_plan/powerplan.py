@@ -1,15 +1,26 @@
+from power_plan.compact_fleet import CompactFleet
 from power_plan.custom_exceptions import AlgorithmError
+from power_plan.deadline import check_deadline
+from power_plan.metrics import METRICS
 
 
 class Payload:
     def __init__(self, data):
         self.load = data["load"]
         self.fuels = Fuels(data["fuels"])
-        self.powerplants = [Powerplant(powerplant) for powerplant in data["powerplants"]]
+        if isinstance(data["powerplants"], CompactFleet):
+            # the shared fleet is only read, every solve gets its own Powerplant objects
+            self.powerplants = [Powerplant.from_row(*row) for row in data["powerplants"].rows()]
+        else:
+            self.powerplants = [Powerplant(powerplant) for powerplant in data["powerplants"]]
         self.emissions = 0.3  # ton of co2 per Mwh (for both Gaz and Kerosine ?)
 
 
 class Powerplant:
+    """A powerplant and its state during one solve: its available pmax, cost and production."""
+
+    __slots__ = ("name", "type", "efficiency", "pmin", "pmax", "production", "cost")
+
     def __init__(self, powerplant):
         self.name = powerplant["name"]
         self.type = powerplant["type"]
@@ -19,6 +30,19 @@ class Powerplant:
         self.production = None
         self.cost = None
 
+    @classmethod
+    def from_row(cls, name, pp_type, efficiency, pmin, pmax):
+        """Create the state of a powerplant of a CompactFleet row, without building a dictionary."""
+        powerplant = cls.__new__(cls)
+        powerplant.name = name
+        powerplant.type = pp_type
+        powerplant.efficiency = efficiency
+        powerplant.pmin = pmin
+        powerplant.pmax = pmax
+        powerplant.production = None
+        powerplant.cost = None
+        return powerplant
+
     def set_cost(self, cost):
         self.cost = cost
 
@@ -49,8 +73,12 @@ class PowerPlan(Payload):
             message (list): a list containing of dict containing the name and production for each
             of the different powerplants.
         """
-        self.sort_by_merit_order()
-        self.update_powerplants_production()
+        check_deadline("sort_by_merit_order")
+        with METRICS.time_stage("sort_by_merit_order"):
+            self.sort_by_merit_order()
+        check_deadline("update_powerplants_production")
+        with METRICS.time_stage("update_powerplants_production"):
+            self.update_powerplants_production()
         return self.generate_response()
 
     def sort_by_merit_order(self):
@@ -0,0 +1,154 @@
+import itertools
+
+import numpy as np
+
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.incoming_data_check import check_json_layer, perform_sanity_check, short_repr, type_checking
+from power_plan.vectorized import WINDTURBINE, VectorizedPowerPlan, dispatch
+
+SWEPT_PRICES = ["gas(euro/MWh)", "kerosine(euro/MWh)", "co2(euro/ton)"]
+MAX_GRID_POINTS = 100000
+# the costs of the grid points are computed by chunks of about this number of costs, to bound the memory used
+CHUNK_SIZE = 2 ** 21
+
+price_range_keys_and_values_type_and_interval = [
+    ("start", (int, float), None),
+    ("stop", (int, float), None),
+    ("num", int, (1, MAX_GRID_POINTS)),
+]
+
+
+def perform_price_sweep_sanity_check(data):
+    """
+    Check a price sweep payload: the usual payload, with a "sweep" dictionary holding the values of some of the gas,
+    kerosine and co2 prices, either as a list or as a {"start", "stop", "num"} range.
+
+    Parameters:
+        data (dict): a dictionary containing load, fuels, powerplants and sweep as keys
+    """
+    perform_sanity_check(data)
+    if "sweep" not in data:
+        raise ValueError("price sweep payloads should contain the key: sweep")
+    sweep = data["sweep"]
+    type_checking(sweep, dict, "sweep")
+    if not sweep or not set(sweep) <= set(SWEPT_PRICES):
+        raise ValueError(f"sweep keys should be some of: {SWEPT_PRICES}. Instead we have: {short_repr(list(sweep))}")
+
+    points = 1
+    for price, values in sweep.items():
+        if isinstance(values, dict):
+            check_json_layer(values, price_range_keys_and_values_type_and_interval)
+            values = [values["start"], values["stop"]]
+        type_checking(values, list, price)
+        if not values:
+            raise ValueError(f"{price} sweep should contain at least one value")
+        for value in values:
+            check_json_layer({price: value}, [(price, (int, float), (0,) if price == "co2(euro/ton)" else None)])
+        points *= len(price_axis(sweep[price]))
+    if points > MAX_GRID_POINTS:
+        raise ValueError(f"the sweep grid should contain at most {MAX_GRID_POINTS} points, instead we have: {points}")
+
+
+def price_axis(values):
+    """Return the values of a swept price, given as a list or as a {"start", "stop", "num"} range, stops included."""
+    if isinstance(values, dict):
+        return np.linspace(values["start"], values["stop"], values["num"]).tolist()
+    return list(values)
+
+
+class PriceSweepPlan:
+    """
+    Find the production plan and total cost of one fleet and load over a grid of gas, kerosine and co2 prices.
+
+    The costs of every powerplant at every grid point are computed and sorted in one vectorized pass. The plan only
+    depends on the merit order, so it is only dispatched again at the breakpoints of the grid where the merit order
+    changes, and once per distinct merit order. The other grid points only cost a matrix product. Merit orders
+    leading to the same plan share it in the response.
+    """
+
+    def __init__(self, data):
+        self.power_plan = VectorizedPowerPlan(data)
+        self.load = data["load"]
+        self.axes = {price: price_axis(data["sweep"][price]) if price in data["sweep"] else [data["fuels"][price]]
+                     for price in SWEPT_PRICES}
+        self.dispatch_count = 0
+
+    def run(self):
+        """
+        Returns:
+            message (dict): the axes of the grid, the distinct plans in the payload order and the errors of the merit
+                            orders that could not be solved, then per grid point, flattened in the row-major order of
+                            the axes, the index of its plan and its total cost, null if its plan could not be solved
+        """
+        fleet = self.power_plan.fleet
+        grid = np.array(list(itertools.product(*self.axes.values())), dtype=np.float64).reshape(-1, len(SWEPT_PRICES))
+        pmax = self.power_plan.estimate_available_power()
+        # plan of every merit order dispatched, and index of every distinct plan or error
+        order_plans, plan_indices, plans, errors = {}, {}, [], []
+        plan_index = np.zeros(len(grid), dtype=np.int64)
+        total_cost = np.zeros(len(grid))
+
+        rows = max(1, CHUNK_SIZE // max(1, len(fleet)))
+        for start in range(0, len(grid), rows):
+            costs = self.estimate_costs(grid[start:start + rows])
+            orders = np.argsort(costs, axis=1, kind="stable")
+            # the grid points where the merit order differs from the previous point's
+            breakpoints = np.flatnonzero(np.any(orders[1:] != orders[:-1], axis=1)) + 1
+            for begin, end in zip([0, *breakpoints.tolist()], [*breakpoints.tolist(), len(orders)]):
+                order = orders[begin]
+                k = order_plans.get(order.tobytes())
+                if k is None:
+                    k = order_plans[order.tobytes()] = self.dispatch(order, pmax, plan_indices, plans, errors)
+                plan_index[start + begin:start + end] = k
+                if plans[k] is not None:
+                    total_cost[start + begin:start + end] = costs[begin:end] @ plans[k]
+
+        return self.generate_response(plan_index, total_cost, plans, errors)
+
+    def dispatch(self, order, pmax, plan_indices, plans, errors):
+        """
+        Dispatch the fleet in a merit order, adding its plan, or its error, to the distinct ones if it is new.
+
+        Returns:
+            k (int): the index of the plan of the merit order in plans
+        """
+        self.dispatch_count += 1
+        fleet = self.power_plan.fleet
+        try:
+            production = np.zeros(len(fleet), dtype=np.result_type(pmax, self.load))
+            production[order] = dispatch(fleet.pmin[order], pmax[order], self.load)
+        except AlgorithmError as err:
+            k = plan_indices.setdefault(err.args[0], len(plans))
+            if k == len(plans):
+                plans.append(None)
+                errors.append({"plan": k, "error": err.args[0]})
+            return k
+        k = plan_indices.setdefault(production.tobytes(), len(plans))
+        if k == len(plans):
+            plans.append(production)
+        return k
+
+    def estimate_costs(self, grid):
+        """
+        Parameters:
+            grid (numpy.ndarray): one row of gas, kerosine and co2 prices per grid point
+        Returns:
+            costs (numpy.ndarray): the cost of generating power with every powerplant at every grid point, computed as
+                                    VectorizedPowerPlan.estimate_costs does
+        """
+        fleet = self.power_plan.fleet
+        fuel_prices = np.column_stack((grid[:, 0], grid[:, 1], np.zeros(len(grid))))
+        thermal_costs = fuel_prices[:, fleet.type_codes] / fleet.efficiency + grid[:, 2:] * self.power_plan.emissions
+        return np.where(fleet.type_codes == WINDTURBINE, 0., thermal_costs)
+
+    def generate_response(self, plan_index, total_cost, plans, errors):
+        """create the response, as compact arrays."""
+        solved = np.array([plan is not None for plan in plans], dtype=bool)[plan_index]
+        return {
+            "axes": self.axes,
+            "powerplants": list(self.power_plan.fleet.names),
+            "plans": [plan.tolist() if plan is not None else None for plan in plans],
+            "errors": errors,
+            "plan_index": plan_index.tolist(),
+            "total_cost": [cost if ok else None for cost, ok in zip(total_cost.tolist(), solved.tolist())],
+        }
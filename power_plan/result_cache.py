@@ -0,0 +1,199 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+from power_plan.metrics import METRICS, Counter, Gauge
+
+CACHE_LOOKUPS = METRICS.register(Counter(
+    "powerplan_result_cache_lookups_total", "Result cache lookups, per store and outcome.", ("store", "outcome")))
+CACHE_SIZE = METRICS.register(Gauge(
+    "powerplan_result_cache_entries", "Entries held by the result cache, per store.", ("store",)))
+
+
+def normalize(value):
+    """
+    Return a payload where equal values are written the same way: floats are kept exact, their shortest repr being
+    hashed, so that only equal floats share a key, and -0.0 becomes 0.0. Integers are kept apart from floats, as the
+    sanity check accepts one and not the other for some keys.
+    """
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, float):
+        return value + 0.
+    return value
+
+
+def canonical_hash(payload_data):
+    """
+    Parameters:
+        payload_data (dict): a JSON-like payload
+    Returns:
+        key (str): a hash of the payload that does not depend on the order of its keys nor on the writing of its floats
+                    in the request, e.g. 0.5 or 5e-1
+    """
+    canonical = json.dumps(normalize(payload_data), sort_keys=True, separators=(",", ":"), allow_nan=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class LRUStore:
+    """A bounded mapping evicting its least recently used entry first, whose entries optionally expire."""
+
+    def __init__(self, name, max_size, ttl=None, clock=monotonic):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the value stored for key, or None if there is none or it expired. Not thread safe by itself."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            self.count("miss")
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.count("hit")
+        return entry[0]
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        if METRICS.enabled:
+            CACHE_SIZE.set(len(self._entries), self.name)
+
+    def clear(self):
+        self._entries.clear()
+
+    def count(self, outcome):
+        if METRICS.enabled:
+            CACHE_LOOKUPS.inc(self.name, outcome)
+
+
+class ResultCache:
+    """
+    Thread safe cache of solve results keyed by the canonical hash of their payload. Results and errors are kept in
+    two stores with their own size and time to live, so that errors, which may be transient, can expire sooner or not
+    be cached at all.
+
+    Canonical hashing costs about as much as parsing the payload, so the digest of the raw request body is also kept
+    for every entry: a byte for byte identical request is answered from get_body without being parsed.
+
+    With a SingleFlight, concurrent misses of the same body, then of the same payload, are computed once and the
+    response is stored before the waiting callers are released, so that later callers find it in the cache.
+
+    Cached results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_size=1024, ttl=None, error_max_size=256, error_ttl=60, clock=monotonic,
+                 single_flight=None):
+        """
+        Parameters:
+            max_size (int): the number of results kept, 0 disables the cache
+            ttl (float): the seconds a result is kept, forever if None
+            error_max_size (int): the number of errors kept, 0 disables the caching of errors
+            error_ttl (float): the seconds an error is kept, forever if None
+            clock (function): returns the current time in seconds
+            single_flight (SingleFlight): coalesces the concurrent computations of a payload, if not None
+        """
+        self.results = LRUStore("result", max_size, ttl, clock)
+        self.errors = LRUStore("error", error_max_size, error_ttl, clock)
+        # digest of a raw request body -> canonical hash of its payload
+        self._body_keys = OrderedDict()
+        self.single_flight = single_flight
+        self._lock = threading.Lock()
+
+    def get_body(self, body):
+        """
+        Parameters:
+            body (bytes): the raw body of a request
+        Returns:
+            response (dict): the cached response of a request with the same body, None if there is none
+        """
+        body_digest = hashlib.sha256(body).digest()
+        with self._lock:
+            key = self._body_keys.get(body_digest)
+            if key is None:
+                return None
+            self._body_keys.move_to_end(body_digest)
+            return self._get(key)
+
+    def get_or_compute_body(self, body, compute_body):
+        """
+        Parameters:
+            body (bytes): the raw body of a request
+            compute_body (function): parses and solves the body, passing it to get_or_compute to cache its response
+        Returns:
+            response (dict): the cached response of a request with the same body, or the response of compute_body
+        """
+        response = self.get_body(body)
+        if response is not None:
+            return response
+        if self.single_flight is None:
+            return compute_body()
+        return self.single_flight.do(("body", hashlib.sha256(body).digest()), compute_body)
+
+    def get_or_compute(self, payload_data, compute, body=None):
+        """
+        Parameters:
+            payload_data (dict): a JSON-like payload
+            compute (function): solves payload_data, returning a response or a dict with an error key
+            body (bytes): the raw body payload_data was parsed from, so that get_body finds its response next time
+        Returns:
+            response (dict): the cached response for an identical payload, or the response of compute
+        """
+        key = canonical_hash(payload_data)
+        with self._lock:
+            self._remember_body(body, key)
+            response = self._get(key)
+        if response is not None:
+            return response
+        if self.single_flight is None:
+            return self._compute_and_store(key, payload_data, compute)
+        return self.single_flight.do(key, self._compute_and_store, key, payload_data, compute)
+
+    def _compute_and_store(self, key, payload_data, compute):
+        response = compute(payload_data)
+        with self._lock:
+            if isinstance(response, dict) and "error" in response:
+                self.errors.put(key, response)
+            else:
+                self.results.put(key, response)
+        return response
+
+    def _get(self, key):
+        response = self.results.get(key)
+        if response is None:
+            response = self.errors.get(key)
+        return response
+
+    def _remember_body(self, body, key):
+        if body is None:
+            return
+        self._body_keys[hashlib.sha256(body).digest()] = key
+        while len(self._body_keys) > self.results.max_size + self.errors.max_size:
+            self._body_keys.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.results.clear()
+            self.errors.clear()
+            self._body_keys.clear()
@@ -0,0 +1,97 @@
+import numpy as np
+
+from power_plan.kinetic_order import is_merit_order
+from power_plan.powerplan import Fuels
+from power_plan.supply_curve import SupplyCurve
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+class DispatchSession:
+    """
+    Keep the production plan of a fleet between solves whose load, and sometimes fuels, change a little.
+
+    The merit order and the prefix sums of the pmax are kept with the plan. When only the load changes, the marginal
+    powerplant is located again and the productions are rewritten from the previous marginal powerplant to the new one.
+    When the fuels change, the fleet is only sorted again if the new costs break the merit order, and the plan is only
+    rewritten if the available productions changed.
+
+    The plan is the same as PowerPlan.run for the same payload.
+    """
+
+    def __init__(self, data):
+        """
+        Parameters:
+            data (dict): a dictionary containing load, fuels and powerplants as keys
+        """
+        self.power_plan = VectorizedPowerPlan(data)
+        self.fuels = None
+        self.order = None
+        self.supply_curve = None
+        # the marginal powerplant, its production and the lowered production of the previous one, see locate
+        self.marginal_plan = None
+        self.response = None
+        self.sort_count = 0
+        self.full_dispatch_count = 0
+        self.update(data["load"], data["fuels"])
+
+    def update(self, load, fuels=None):
+        """
+        Solve the fleet for a new load, and new fuels if they are given.
+
+        Parameters:
+            load (int): the load to fill
+            fuels (dict): the fuels prices and wind percentage, the previous ones are kept if None
+        Returns:
+            message (list): a list of dict containing the name and production of every powerplant, in the merit order.
+                            The list is updated in place by the next calls.
+        """
+        if fuels is not None and fuels != self.fuels:
+            self.update_fuels(fuels)
+        marginal_plan = self.locate(load)
+        if self.response is None:
+            self.full_dispatch_count += 1
+            self.response = [{"name": name, "p": 0} for name in self.supply_curve.names]
+            self.rewrite(range(len(self.response)), marginal_plan)
+        else:
+            previous_marginal, marginal = self.marginal_plan[0], marginal_plan[0]
+            start = max(0, min(previous_marginal, marginal) - 1)
+            self.rewrite(range(start, min(len(self.response), max(previous_marginal, marginal) + 1)), marginal_plan)
+        self.marginal_plan = marginal_plan
+        return self.response
+
+    def update_fuels(self, fuels):
+        """Update the merit order and the supply curve for new fuels, dropping the plan if the productions change."""
+        self.fuels = dict(fuels)
+        self.power_plan.fuels = Fuels(fuels)
+        costs = self.power_plan.estimate_costs()
+        pmax = self.power_plan.estimate_available_power()
+        if self.order is None or not is_merit_order(costs, self.order):
+            self.sort_count += 1
+            self.order = np.argsort(costs, kind="stable")
+            self.response = None
+        elif not np.array_equal(pmax[self.order], self.supply_curve.pmax):
+            self.response = None
+
+        order = self.order
+        self.supply_curve = SupplyCurve([self.power_plan.fleet.names[i] for i in order.tolist()],
+                                        costs[order].tolist(), self.power_plan.fleet.pmin[order].tolist(),
+                                        pmax[order].tolist())
+
+    def locate(self, load):
+        """Return the marginal plan of a load, raising an AlgorithmError if it can't be filled."""
+        if load == 0:
+            return 0, 0, None
+        return self.supply_curve.locate(load)
+
+    def rewrite(self, indices, marginal_plan):
+        """Set the production of the powerplants at indices, in the merit order, for the marginal plan."""
+        marginal, marginal_production, previous_production = marginal_plan
+        pmax = self.supply_curve.pmax
+        for i in indices:
+            if i < marginal:
+                p = previous_production if i == marginal - 1 and previous_production is not None else pmax[i]
+            elif i == marginal:
+                p = marginal_production
+            else:
+                p = 0
+            self.response[i]["p"] = p
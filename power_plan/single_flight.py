@@ -0,0 +1,81 @@
+import threading
+
+from power_plan.custom_exceptions import DeadlineExceeded
+from power_plan.metrics import METRICS, Counter
+
+COALESCED_CALLS = METRICS.register(Counter(
+    "powerplan_coalesced_calls_total", "Calls that waited on an identical call in flight, per outcome.", ("outcome",)))
+
+
+class Call:
+    """A computation in flight, whose result or error is shared with every caller waiting on it."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run a single computation at a time per key: callers arriving while a computation of the same key is in flight
+    wait for it and share its result, or its exception, instead of computing it again.
+    """
+
+    def __init__(self, timeout=10):
+        """
+        Parameters:
+            timeout (float): the seconds a caller waits for the call in flight before computing the result itself, it
+                                waits as long as needed if None
+        """
+        self.timeout = timeout
+        self.shared = 0
+        self.timed_out = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args):
+        """
+        Parameters:
+            key (hashable): identifies the computation, calls with the same key must compute the same result
+            function (function): the computation, called with args
+        Returns:
+            result: the result of function, computed by this caller or by the call in flight it waited on
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = Call()
+
+        if not is_leader:
+            # an expired deadline is the one of the caller in flight, not an error of the computation
+            if call.done.wait(self.timeout) and not isinstance(call.error, DeadlineExceeded):
+                self.count("shared")
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            self.count("timeout")
+            return function(*args)
+
+        try:
+            call.result = function(*args)
+            return call.result
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def count(self, outcome):
+        with self._lock:
+            if outcome == "shared":
+                self.shared += 1
+            else:
+                self.timed_out += 1
+        if METRICS.enabled:
+            COALESCED_CALLS.inc(outcome)
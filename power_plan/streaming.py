@@ -0,0 +1,39 @@
+import json
+
+from power_plan.error_catcher_functions import find_item_production, report_error
+
+
+def iter_ndjson(lines):
+    """
+    Parse newline-delimited JSON lazily: a line is only read once the previous payload has been consumed.
+
+    Parameters:
+        lines (iterable): the lines of the stream, as str or bytes
+    Yields:
+        payload (tuple): the decoded JSON of a non-empty line and None, or None and an error message if the line is not
+                            valid JSON
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            payload_data = json.loads(line)
+        except ValueError as err:
+            yield None, report_error(err, "iter_ndjson")
+        else:
+            yield payload_data, None
+
+
+def solve_ndjson_stream(lines):
+    """
+    The streaming pipeline: every payload is checked and solved as soon as its line is read, and its result written
+    out before the next line is read, so memory does not grow with the length of the stream.
+
+    Parameters:
+        lines (iterable): the lines of the stream, one payload per line
+    Yields:
+        line (str): the production plan or error message of every payload, as one JSON line
+    """
+    for payload_data, parse_error in iter_ndjson(lines):
+        result = parse_error if parse_error is not None else find_item_production(payload_data)
+        yield json.dumps(result) + "\n"
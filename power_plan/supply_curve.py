@@ -0,0 +1,116 @@
+from bisect import bisect_left
+from itertools import accumulate
+
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+
+
+class SupplyCurve:
+    """
+    The merit order of a fleet for given fuels, with the prefix sums of the powerplants pmax.
+
+    Neither depends on the load, so the curve is built once and then answers the production plan of any load by
+    bisecting the prefix sums, in O(log n) plus the time to write the plan down.
+    """
+
+    def __init__(self, names, costs, pmin, pmax):
+        """
+        Parameters:
+            names (list): the powerplants names, in the merit order
+            costs (list): the powerplants costs, in the merit order
+            pmin (list): the powerplants pmin, in the merit order
+            pmax (list): the powerplants pmax, wind turbines being derated, in the merit order
+        """
+        self.names = names
+        self.costs = costs
+        self.pmin = pmin
+        self.pmax = pmax
+        self.cumulative_pmax = list(accumulate(self.pmax))
+
+    @classmethod
+    def from_payload(cls, data):
+        """
+        Build the supply curve of the fleet and fuels of a payload. Its load is ignored.
+
+        Parameters:
+            data (dict): a dictionary containing load, fuels and powerplants as keys
+        Returns:
+            supply_curve (SupplyCurve): the supply curve of the payload
+        """
+        power_plan = PowerPlan(data)
+        power_plan.sort_by_merit_order()
+        powerplants = power_plan.powerplants
+        return cls([pp.name for pp in powerplants], [pp.cost for pp in powerplants], [pp.pmin for pp in powerplants],
+                   [pp.pmax for pp in powerplants])
+
+    def __len__(self):
+        return len(self.names)
+
+    def locate(self, load):
+        """
+        Find the marginal powerplant of a load, the same way PowerPlan.update_powerplants_production does: every
+        powerplant before it produces at pmax, the ones after it are off.
+
+        Parameters:
+            load (int): a strictly positive load
+        Returns:
+            marginal (int): the index of the marginal powerplant in the merit order
+            marginal_production (int): the production of the marginal powerplant
+            previous_production (int): the lowered production of the previous powerplant if the marginal powerplant
+                pmin required it, None otherwise
+        """
+        marginal = bisect_left(self.cumulative_pmax, load)
+        if marginal == len(self):
+            raise AlgorithmError("production does not fill the load")
+
+        remainder = load - (self.cumulative_pmax[marginal - 1] if marginal > 0 else 0)
+        if remainder >= self.pmin[marginal]:
+            return marginal, remainder, None
+        if marginal == 0:
+            raise AlgorithmError("this algorithm can't fill the load if the load is "
+                                 "lower than pmin of the first powerplant in the merit-order")
+
+        previous_powerplant_production_offset = self.pmin[marginal] - remainder
+        if self.pmax[marginal - 1] - self.pmin[marginal - 1] - previous_powerplant_production_offset > 0:
+            return marginal, self.pmin[marginal], self.pmax[marginal - 1] - previous_powerplant_production_offset
+        raise AlgorithmError("this algorithm is not robust enough, it can't subtract the production of "
+                             "enough powerplant for the current one to be able to fill the load")
+
+    def production(self, load):
+        """
+        Parameters:
+            load (int): the load to fill
+        Returns:
+            production (list): the production of every powerplant, in the merit order
+        """
+        if load == 0:
+            return [0] * len(self)
+
+        marginal, marginal_production, previous_production = self.locate(load)
+        production = self.pmax[:marginal]
+        production.append(marginal_production)
+        production.extend([0] * (len(self) - marginal - 1))
+        if previous_production is not None:
+            production[marginal - 1] = previous_production
+        return production
+
+    def dispatch(self, load):
+        """
+        Parameters:
+            load (int): the load to fill
+        Returns:
+            message (list): the same response as PowerPlan.run for the fleet and fuels of the curve and this load
+        """
+        return [{"name": name, "p": p} for name, p in zip(self.names, self.production(load))]
+
+    def marginal_price(self, load):
+        """
+        Parameters:
+            load (int): the load to fill
+        Returns:
+            price (float): the cost of the most expensive running powerplant, None if the load is 0
+        """
+        if load == 0:
+            return None
+        marginal, _, _ = self.locate(load)
+        return self.costs[marginal]
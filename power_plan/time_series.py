@@ -0,0 +1,110 @@
+import numpy as np
+
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.incoming_data_check import check_json_layer, perform_sanity_check, type_checking, values_checking, \
+    first_layer_keys_and_values_type_and_interval, fuels_layer_keys_values_type_and_interval
+from power_plan.kinetic_order import KineticMeritOrder
+from power_plan.powerplan import Fuels
+from power_plan.vectorized import VectorizedPowerPlan, dispatch
+
+
+def split_timesteps(data):
+    """
+    Split the load and fuels time series of a payload into one (load, fuels) pair per timestep.
+
+    Each of the load and fuels values is either a list holding one value per timestep, or a single value that holds
+    for every timestep. All the lists must have the same length.
+
+    Parameters:
+        data (dict): a dictionary containing load, fuels and powerplants as keys
+    Returns:
+        timesteps (list): a list of (load, fuels) tuples, fuels being a dictionary of the same form as in a payload
+    """
+    type_checking(data, dict)
+    values_checking(data, ["load", "fuels", "powerplants"])
+    type_checking(data["fuels"], dict, "fuels")
+
+    series = dict(data["fuels"], load=data["load"])
+    lengths = {len(values) for values in series.values() if isinstance(values, list)}
+    if len(lengths) != 1:
+        raise ValueError(f"load and fuels time series should be lists of the same length, instead we have lengths: "
+                         f"{sorted(lengths)}")
+    length = lengths.pop()
+    if length == 0:
+        raise ValueError("time series should contain at least one timestep")
+
+    timesteps = []
+    for t in range(length):
+        fuels = {key: values[t] if isinstance(values, list) else values for key, values in series.items()}
+        timesteps.append((fuels.pop("load"), fuels))
+    return timesteps
+
+
+def perform_time_series_sanity_check(data):
+    """
+    Check the fleet of a time series payload once, then the load and fuels of every timestep.
+
+    Parameters:
+        data (dict): a dictionary containing load, fuels and powerplants as keys
+    """
+    timesteps = split_timesteps(data)
+    load, fuels = timesteps[0]
+    perform_sanity_check(dict(data, load=load, fuels=fuels))
+
+    for t, (load, fuels) in enumerate(timesteps[1:], 1):
+        try:
+            check_json_layer({"load": load}, first_layer_keys_and_values_type_and_interval[:1])
+            check_json_layer(fuels, fuels_layer_keys_values_type_and_interval)
+        except (TypeError, ValueError) as err:
+            raise type(err)(f"timestep {t}: {err.args[0]}")
+
+
+class TimeSeriesPlan:
+    """
+    Find the production plan of one fleet for every timestep of a load and fuels time series.
+
+    The fleet is parsed once. At each timestep the costs are updated and the merit order of the previous timestep is
+    repaired by a KineticMeritOrder: only the powerplants whose cost crossed another one are moved, the fleet is never
+    sorted again from scratch.
+    """
+
+    def __init__(self, data):
+        self.timesteps = split_timesteps(data)
+        load, fuels = self.timesteps[0]
+        self.power_plan = VectorizedPowerPlan(dict(data, load=load, fuels=fuels))
+        self.merit_order = KineticMeritOrder()
+
+    def run(self):
+        """
+        Returns:
+            message (dict): the production of every powerplant at every timestep, one list per powerplant in the
+            payload order, and the timesteps whose load could not be filled.
+        """
+        fleet = self.power_plan.fleet
+        loads = np.array([load for load, _ in self.timesteps])
+        production = np.zeros((len(self.timesteps), len(fleet)), dtype=np.result_type(fleet.pmax, loads))
+        errors = []
+
+        for t, (load, fuels) in enumerate(self.timesteps):
+            self.power_plan.load = load
+            self.power_plan.fuels = Fuels(fuels)
+            order = self.merit_order.update(self.power_plan.estimate_costs())
+            pmax = self.power_plan.estimate_available_power()
+            try:
+                production[t, order] = dispatch(fleet.pmin[order], pmax[order], load)
+            except AlgorithmError as err:
+                errors.append({"timestep": t, "error": err.args[0]})
+
+        return self.generate_response(production, errors)
+
+    def generate_response(self, production, errors):
+        """create the response: one production list per powerplant, None at the timesteps that could not be solved."""
+        columns = production.T.tolist()
+        for error in errors:
+            for column in columns:
+                column[error["timestep"]] = None
+        return {
+            "powerplants": [{"name": name, "p": column} for name, column in zip(self.power_plan.fleet.names, columns)],
+            "errors": errors,
+        }
+
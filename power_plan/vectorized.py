@@ -0,0 +1,159 @@
+import numpy as np
+
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.deadline import check_deadline
+from power_plan.metrics import METRICS
+from power_plan.powerplan import Fuels
+
+GASFIRED, TURBOJET, WINDTURBINE = 0, 1, 2
+TYPE_CODES = {"gasfired": GASFIRED, "turbojet": TURBOJET, "windturbine": WINDTURBINE}
+
+
+class FleetColumns:
+    """The powerplants of a payload stored as one array per attribute instead of one object per powerplant."""
+
+    def __init__(self, powerplants):
+        self.names = [pp["name"] for pp in powerplants]
+        self.efficiency = np.array([pp["efficiency"] for pp in powerplants], dtype=np.float64)
+        self.pmin = np.array([pp["pmin"] for pp in powerplants])
+        self.pmax = np.array([pp["pmax"] for pp in powerplants])
+        self.type_codes = self.__encode_types([pp["type"] for pp in powerplants])
+
+    def __len__(self):
+        return len(self.names)
+
+    def freeze(self):
+        """Make the columns read-only, so that the fleet can be shared by concurrent solves."""
+        self.names = tuple(self.names)
+        for column in (self.efficiency, self.pmin, self.pmax, self.type_codes):
+            column.flags.writeable = False
+        return self
+
+    @classmethod
+    def from_compact(cls, fleet):
+        """
+        Return read-only columns over the arrays of a CompactFleet, which are not copied: only the type codes are
+        translated. The compact fleet can't grow while the columns exist.
+
+        Parameters:
+            fleet (CompactFleet): the fleet
+        Returns:
+            columns (FleetColumns): the columns of the fleet
+        """
+        columns = cls.__new__(cls)
+        columns.names = fleet.names
+        columns.efficiency = np.frombuffer(fleet.efficiency, dtype=np.float64)
+        columns.pmin = np.frombuffer(fleet.pmin, dtype=np.int64)
+        columns.pmax = np.frombuffer(fleet.pmax, dtype=np.int64)
+        columns.type_codes = cls.__encode_types(fleet.type_names)[np.frombuffer(fleet.type_codes, dtype=np.uint8)]
+        for column in (columns.efficiency, columns.pmin, columns.pmax, columns.type_codes):
+            column.flags.writeable = False
+        return columns
+
+    @staticmethod
+    def __encode_types(types):
+        """
+        Convert the powerplants types to integer codes.
+
+        Parameters:
+            types (list): the powerplants types
+        Returns:
+            type_codes (numpy.ndarray): the code of each powerplant type
+        """
+        try:
+            return np.array([TYPE_CODES[pp_type] for pp_type in types], dtype=np.int8)
+        except KeyError as err:
+            raise TypeError(f"unknown powerplant type: {err.args[0]}. Should be: windturbine, turbojet or gasfired")
+
+
+class VectorizedPowerPlan:
+    """
+    Find the same production plan as PowerPlan, with the fleet held as column arrays so that every step is a
+    vectorized operation instead of a loop over Powerplant objects. Meant for fleets of thousands of powerplants.
+    """
+
+    def __init__(self, data):
+        self.load = data["load"]
+        self.fuels = Fuels(data["fuels"])
+        powerplants = data["powerplants"]
+        if isinstance(powerplants, CompactFleet):
+            powerplants = FleetColumns.from_compact(powerplants)
+        self.fleet = powerplants if isinstance(powerplants, FleetColumns) else FleetColumns(powerplants)
+        self.emissions = 0.3  # ton of co2 per Mwh (for both Gaz and Kerosine ?)
+
+    def run(self):
+        """
+        Method to process the data to find the production plan. Also create the response to send
+
+        Returns:
+            message (list): a list containing of dict containing the name and production for each
+            of the different powerplants.
+        """
+        check_deadline("sort_by_merit_order")
+        with METRICS.time_stage("sort_by_merit_order"):
+            order = self.sort_by_merit_order()
+        check_deadline("update_powerplants_production")
+        with METRICS.time_stage("update_powerplants_production"):
+            pmax = self.estimate_available_power()
+            production = dispatch(self.fleet.pmin[order], pmax[order], self.load)
+        return self.generate_response(order, production)
+
+    def estimate_available_power(self):
+        """Return the pmax of every powerplant, wind turbines being derated by the wind percentage."""
+        wind_pmax = np.trunc(self.fleet.pmax * self.fuels.wind / 100).astype(self.fleet.pmax.dtype)
+        return np.where(self.fleet.type_codes == WINDTURBINE, wind_pmax, self.fleet.pmax)
+
+    def estimate_costs(self):
+        """Return the cost of generating power with every powerplant, wind turbines being free."""
+        fuel_prices = np.array([self.fuels.gas, self.fuels.kerosine, 0], dtype=np.float64)
+        thermal_costs = fuel_prices[self.fleet.type_codes] / self.fleet.efficiency + self.fuels.co2 * self.emissions
+        return np.where(self.fleet.type_codes == WINDTURBINE, 0., thermal_costs)
+
+    def sort_by_merit_order(self):
+        """Return the powerplants indices in the merit order. Ties keep the payload order, as in PowerPlan."""
+        return np.argsort(self.estimate_costs(), kind="stable")
+
+    def generate_response(self, order, production):
+        """create the list of dictionary for the request response, with the powerplants in the merit order."""
+        names = self.fleet.names
+        return [{"name": names[i], "p": p} for i, p in zip(order.tolist(), production.tolist())]
+
+
+def dispatch(pmin, pmax, load):
+    """
+    Vectorized version of PowerPlan.update_powerplants_production. Powerplants are filled at pmax in the merit order
+    until the load is reached, the marginal powerplant producing the remainder. If the remainder is lower than the
+    marginal powerplant pmin, the previous powerplant is lowered so that the marginal one can run at pmin.
+
+    Parameters:
+        pmin (numpy.ndarray): the powerplants minimum production, in the merit order
+        pmax (numpy.ndarray): the powerplants available production, in the merit order
+        load (int): the load to fill
+    Returns:
+        production (numpy.ndarray): the powerplants production, in the merit order
+    """
+    production = np.zeros(len(pmax), dtype=np.result_type(pmax, load))
+    if load == 0:
+        return production
+
+    cumulative_pmax = np.cumsum(pmax)
+    marginal = int(np.searchsorted(cumulative_pmax, load, side="left"))
+    if marginal == len(pmax):
+        raise AlgorithmError("production does not fill the load")
+
+    production[:marginal] = pmax[:marginal]
+    remainder = load - (cumulative_pmax[marginal - 1] if marginal > 0 else 0)
+
+    if remainder >= pmin[marginal]:
+        production[marginal] = remainder
+    elif marginal == 0:
+        raise AlgorithmError("this algorithm can't fill the load if the load is "
+                             "lower than pmin of the first powerplant in the merit-order")
+    elif pmax[marginal - 1] - pmin[marginal - 1] - (pmin[marginal] - remainder) > 0:
+        production[marginal - 1] -= pmin[marginal] - remainder
+        production[marginal] = pmin[marginal]
+    else:
+        raise AlgorithmError("this algorithm is not robust enough, it can't subtract the production of "
+                             "enough powerplant for the current one to be able to fill the load")
+    return production
@@ -0,0 +1,238 @@
+import numpy as np
+
+from power_plan.dispatch_table import ERROR_MESSAGES, FIRST_PMIN_TOO_HIGH, NOT_FILLED, NOT_ROBUST_ENOUGH
+from power_plan.incoming_data_check import check_json_layer, perform_sanity_check, type_checking
+from power_plan.vectorized import WINDTURBINE, VectorizedPowerPlan
+
+MAX_SCENARIOS = 100000
+# the scenarios are dispatched by chunks of about this number of productions, to bound the memory used
+CHUNK_SIZE = 2 ** 21
+DEFAULT_PERCENTILES = [5, 50, 95]
+
+wind_distribution_layer_keys_and_values_type_and_interval = [
+    ("type", str, None),
+    ("count", int, (1, MAX_SCENARIOS)),
+]
+
+distribution_parameters_keys_and_values_type_and_interval = {
+    "normal": [
+        ("mean", (int, float), (0, 100)),
+        ("std", (int, float), (0,)),
+    ],
+    "uniform": [
+        ("low", (int, float), (0, 100)),
+        ("high", (int, float), ("low", 100)),
+    ],
+}
+
+
+def perform_wind_scenarios_sanity_check(data):
+    """
+    Check a wind scenarios payload: the usual payload, with either explicit "wind_scenarios" or a "wind_distribution"
+    to draw them from, and the optional "percentiles" and "plans" keys.
+
+    Parameters:
+        data (dict): a dictionary containing load, fuels, powerplants and wind_scenarios or wind_distribution as keys
+    """
+    perform_sanity_check(data)
+    if ("wind_scenarios" in data) == ("wind_distribution" in data):
+        raise ValueError("wind scenarios payloads should contain exactly one of the keys: wind_scenarios, "
+                         "wind_distribution")
+    parks = sum(pp["type"] == "windturbine" for pp in data["powerplants"])
+
+    if "wind_scenarios" in data:
+        scenarios = data["wind_scenarios"]
+        type_checking(scenarios, list, "wind_scenarios")
+        if not 1 <= len(scenarios) <= MAX_SCENARIOS:
+            raise ValueError(f"wind_scenarios should contain between 1 and {MAX_SCENARIOS} scenarios, instead we have: "
+                             f"{len(scenarios)}")
+        per_park = isinstance(scenarios[0], list)
+        for s, scenario in enumerate(scenarios):
+            if isinstance(scenario, list) != per_park:
+                raise TypeError(f"wind scenario {s}: wind_scenarios should be either all lists of one wind(%) per "
+                                f"windturbine or all single wind(%)")
+            wind = scenario if per_park else [scenario]
+            if per_park and len(scenario) != parks:
+                raise ValueError(f"wind scenario {s}: should contain one wind(%) per windturbine, {parks}, instead we "
+                                 f"have: {len(scenario)}")
+            check_wind_values(wind, f"wind scenario {s}")
+    else:
+        distribution = data["wind_distribution"]
+        type_checking(distribution, dict, "wind_distribution")
+        check_json_layer(distribution, wind_distribution_layer_keys_and_values_type_and_interval)
+        if distribution["type"] not in distribution_parameters_keys_and_values_type_and_interval:
+            raise ValueError(f"unknown wind distribution: {distribution['type']}. Should be one of: "
+                             f"{', '.join(distribution_parameters_keys_and_values_type_and_interval)}")
+        check_json_layer(distribution, distribution_parameters_keys_and_values_type_and_interval[distribution["type"]])
+        type_checking(distribution.get("seed", 0), int, "seed")
+        type_checking(distribution.get("per_park", False), bool, "per_park")
+
+    percentiles = data.get("percentiles", DEFAULT_PERCENTILES)
+    type_checking(percentiles, list, "percentiles")
+    for percentile in percentiles:
+        check_json_layer({"percentile": percentile}, [("percentile", (int, float), (0, 100))])
+    type_checking(data.get("plans", False), bool, "plans")
+
+
+def check_wind_values(wind, name):
+    """Check that every value of a wind scenario is a wind(%) between 0 and 100."""
+    for value in wind:
+        try:
+            check_json_layer({"wind(%)": value}, [("wind(%)", (int, float), (0, 100))])
+        except (TypeError, ValueError) as err:
+            raise type(err)(f"{name}: {err.args[0]}")
+
+
+def draw_wind_scenarios(distribution, parks):
+    """
+    Draw wind scenarios from a distribution, clipped to [0, 100].
+
+    Parameters:
+        distribution (dict): the wind_distribution of the payload
+        parks (int): the number of windturbines of the fleet
+    Returns:
+        wind (numpy.ndarray): one row per scenario, holding one wind(%) per windturbine if the distribution is drawn per
+                                park, a single one shared by every windturbine otherwise
+    """
+    rng = np.random.default_rng(distribution.get("seed", 0))
+    shape = (distribution["count"], parks if distribution.get("per_park", False) else 1)
+    if distribution["type"] == "normal":
+        wind = rng.normal(distribution["mean"], distribution["std"], shape)
+    else:
+        wind = rng.uniform(distribution["low"], distribution["high"], shape)
+    return np.clip(wind, 0, 100)
+
+
+class WindScenarioPlan:
+    """
+    Find the production plan and cost of one fleet, load and fuels for thousands of wind scenarios at once.
+
+    The wind turbines being free, the wind only changes their available production, not the merit order: the fleet is
+    sorted once and the scenarios are dispatched together, one row each, by vectorized operations. Only the summary
+    statistics are returned, unless the plans of every scenario are requested.
+    """
+
+    def __init__(self, data):
+        self.power_plan = VectorizedPowerPlan(data)
+        self.load = data["load"]
+        fleet = self.power_plan.fleet
+        self.wind_indices = np.flatnonzero(fleet.type_codes == WINDTURBINE)
+        if "wind_scenarios" in data:
+            scenarios = data["wind_scenarios"]
+            self.wind = np.array([scenario if isinstance(scenario, list) else [scenario] for scenario in scenarios],
+                                 dtype=np.float64).reshape(len(scenarios), -1)
+        else:
+            self.wind = draw_wind_scenarios(data["wind_distribution"], len(self.wind_indices))
+        self.percentiles = data.get("percentiles", DEFAULT_PERCENTILES)
+        self.plans = data.get("plans", False)
+
+    def run(self):
+        """
+        Returns:
+            message (dict): the number of scenarios and of solved ones, the count of every error, the cost statistics
+                            and the expected production of every powerplant, in the payload order, over the solved
+                            scenarios. The production of every powerplant per scenario too if plans were requested.
+        """
+        fleet = self.power_plan.fleet
+        order = self.power_plan.sort_by_merit_order()
+        pmin, costs = fleet.pmin[order], self.power_plan.estimate_costs()[order]
+        scenarios = len(self.wind)
+        scenario_costs = np.zeros(scenarios)
+        codes = np.zeros(scenarios, dtype=np.int64)
+        total_production = np.zeros(len(fleet))
+        plans = []
+
+        rows = max(1, CHUNK_SIZE // max(1, len(fleet)))
+        for start in range(0, scenarios, rows):
+            pmax = self.estimate_available_power(self.wind[start:start + rows])[:, order]
+            production, marginal = dispatch_scenarios(pmin, pmax, self.load)
+            codes[start:start + rows] = np.minimum(marginal, 0)
+            scenario_costs[start:start + rows] = production @ costs
+            total_production[order] += production.sum(axis=0)
+            if self.plans:
+                payload_order_production = np.empty_like(production)
+                payload_order_production[:, order] = production
+                plans.extend(plan if code >= 0 else None
+                             for plan, code in zip(payload_order_production.tolist(), marginal.tolist()))
+
+        return self.generate_response(scenario_costs[codes == 0], codes, total_production, plans)
+
+    def estimate_available_power(self, wind):
+        """
+        Parameters:
+            wind (numpy.ndarray): the wind(%) of some scenarios, one per windturbine or one shared by all of them
+        Returns:
+            pmax (numpy.ndarray): the pmax of every powerplant in every scenario, in the payload order
+        """
+        fleet = self.power_plan.fleet
+        pmax = np.repeat(fleet.pmax[np.newaxis, :], len(wind), axis=0)
+        pmax[:, self.wind_indices] = np.trunc(fleet.pmax[self.wind_indices] * wind / 100)
+        return pmax
+
+    def generate_response(self, solved_costs, codes, total_production, plans):
+        """create the response from the costs of the solved scenarios and the error codes of all of them."""
+        solved = len(solved_costs)
+        expected_production = (total_production / solved).tolist() if solved else [None] * len(total_production)
+        error_codes, error_counts = np.unique(codes[codes < 0], return_counts=True)
+        response = {
+            "scenarios": len(codes),
+            "solved": solved,
+            "errors": {ERROR_MESSAGES[code]: count
+                       for code, count in zip(error_codes.tolist(), error_counts.tolist())},
+            "cost": None if not solved else {
+                "mean": float(solved_costs.mean()),
+                "std": float(solved_costs.std()),
+                "min": float(solved_costs.min()),
+                "max": float(solved_costs.max()),
+                "percentiles": {f"{percentile:g}": value for percentile, value in
+                                zip(self.percentiles, np.percentile(solved_costs, self.percentiles).tolist())},
+            },
+            "powerplants": [{"name": name, "expected_p": p}
+                            for name, p in zip(self.power_plan.fleet.names, expected_production)],
+        }
+        if self.plans:
+            response["plans"] = plans
+        return response
+
+
+def dispatch_scenarios(pmin, pmax, load):
+    """
+    Vectorized version of power_plan.vectorized.dispatch for many scenarios of available production at once.
+
+    Parameters:
+        pmin (numpy.ndarray): the powerplants minimum production, in the merit order
+        pmax (numpy.ndarray): the powerplants available production, one row per scenario, in the merit order
+        load (int): the load to fill
+    Returns:
+        production (numpy.ndarray): the powerplants production, one row per scenario, in the merit order. Zeros for the
+                                    scenarios that could not be solved
+        marginal (numpy.ndarray): the index of the marginal powerplant of every scenario, or the error code,
+                                    FIRST_PMIN_TOO_HIGH, NOT_ROBUST_ENOUGH or NOT_FILLED, of the ones that could not
+                                    be solved
+    """
+    scenarios, size = pmax.shape
+    production = np.zeros(pmax.shape, dtype=np.result_type(pmax, load))
+    if load == 0:
+        return production, np.zeros(scenarios, dtype=np.int64)
+
+    cumulative_pmax = np.cumsum(pmax, axis=1)
+    marginal = (cumulative_pmax < load).sum(axis=1)
+    np.copyto(production, pmax, where=np.arange(size) < marginal[:, np.newaxis])
+
+    rows = np.flatnonzero(marginal < size)
+    m = marginal[rows]
+    previous = np.maximum(m - 1, 0)
+    remainder = load - np.where(m > 0, cumulative_pmax[rows, previous], 0)
+    offset = pmin[m] - remainder
+    fits = offset <= 0
+    robust = ~fits & (m > 0) & (pmax[rows, previous] - pmin[previous] - offset > 0)
+
+    production[rows[fits], m[fits]] = remainder[fits]
+    production[rows[robust], m[robust]] = pmin[m[robust]]
+    production[rows[robust], previous[robust]] -= offset[robust]
+
+    marginal[marginal == size] = NOT_FILLED
+    marginal[rows[~fits & (m == 0)]] = FIRST_PMIN_TOO_HIGH
+    marginal[rows[~fits & (m > 0) & ~robust]] = NOT_ROBUST_ENOUGH
+    production[marginal < 0] = 0
+    return production, marginal
@@ -76,4 +76,21 @@ expected_output = [{
         "name": "tj1",
         "p": 0
     }
-]
\ No newline at end of file
+]
+
+
+def random_payload(rng, size):
+    """Generate a payload of size powerplants of random types, with a random load and random fuels."""
+    powerplants = []
+    for i in range(size):
+        pp_type = rng.choice(["gasfired", "turbojet", "windturbine"])
+        pmax = rng.randint(0, 500)
+        pmin = 0 if pp_type != "gasfired" else rng.randint(0, pmax)
+        efficiency = 1 if pp_type == "windturbine" else rng.choice([0.3, 0.37, 0.53, rng.uniform(0.2, 0.6)])
+        powerplants.append({"name": f"pp{i}", "type": pp_type, "efficiency": efficiency, "pmin": pmin, "pmax": pmax})
+    return {
+        "load": rng.randint(0, 100 * size),
+        "fuels": {"gas(euro/MWh)": rng.uniform(5, 30), "kerosine(euro/MWh)": rng.uniform(30, 80),
+                  "co2(euro/ton)": rng.randint(0, 50), "wind(%)": rng.randint(0, 100)},
+        "powerplants": powerplants,
+    }
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from time import monotonic
+
+from . import payload
+import api
+from power_plan.admission import AdmissionController, AsyncAdmissionController, request_deadline
+from power_plan.custom_exceptions import AdmissionRejected, DeadlineExceeded
+from power_plan.deadline import check_deadline, deadline_scope
+from power_plan.powerplan import PowerPlan
+from power_plan.result_cache import ResultCache
+from power_plan.single_flight import SingleFlight
+
+
+class DeadlineTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_check_deadline_NoDeadline_Nothing(self):
+        check_deadline("sanity_check")
+
+    def test_check_deadline_ExpiredDeadline_DeadlineExceededWithStage(self):
+        with deadline_scope(monotonic() - 1):
+            with self.assertRaises(DeadlineExceeded) as context:
+                check_deadline("sanity_check")
+        self.assertEqual(context.exception.args[1], "sanity_check")
+        check_deadline("sanity_check")
+
+    def test_run_DeadlineExpiredBetweenStages_DroppedBeforeDispatch(self):
+        power_plan = PowerPlan(payload)
+        sort_by_merit_order = power_plan.sort_by_merit_order
+
+        def slow_sort():
+            sort_by_merit_order()
+            time.sleep(0.02)
+
+        power_plan.sort_by_merit_order = slow_sort
+        with deadline_scope(monotonic() + 0.01):
+            with self.assertRaises(DeadlineExceeded) as context:
+                power_plan.run()
+        self.assertEqual(context.exception.args[1], "update_powerplants_production")
+
+    def test_request_deadline_Header_ArrivalPlusTimeout(self):
+        self.assertEqual(request_deadline({"X-Request-Timeout": "2.5"}, now=10), 12.5)
+        self.assertIsNone(request_deadline({}))
+        self.assertRaises(ValueError, request_deadline, {"X-Request-Timeout": "soon"})
+
+
+class AdmissionControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+
+    def hold_slot(self, release):
+        """Hold the only slot of the controller in another thread until release is set."""
+        admitted = threading.Event()
+
+        def hold():
+            with self.controller.admit():
+                admitted.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        admitted.wait(5)
+        return thread
+
+    def test_admit_FreeSlot_InFlight(self):
+        with self.controller.admit():
+            self.assertEqual((self.controller.in_flight, self.controller.queued), (1, 0))
+        self.assertEqual(self.controller.in_flight, 0)
+
+    def test_admit_QueueFull_AdmissionRejected(self):
+        release = threading.Event()
+        holder = self.hold_slot(release)
+        waiter = threading.Thread(target=lambda: self.controller.admit().__enter__())
+        waiter.start()
+        while self.controller.queued == 0:
+            time.sleep(0.001)
+        with self.assertRaises(AdmissionRejected):
+            with self.controller.admit():
+                pass
+        release.set()
+        holder.join()
+        waiter.join()
+
+    def test_admit_SlotReleased_QueuedRequestAdmitted(self):
+        release = threading.Event()
+        holder = self.hold_slot(release)
+        threading.Timer(0.02, release.set).start()
+        with self.controller.admit():
+            self.assertEqual(self.controller.in_flight, 1)
+        holder.join()
+
+    def test_admit_DeadlineExpiresInQueue_DeadlineExceeded(self):
+        release = threading.Event()
+        holder = self.hold_slot(release)
+        with self.assertRaises(DeadlineExceeded) as context:
+            with self.controller.admit(monotonic() + 0.02):
+                pass
+        self.assertEqual((context.exception.args[1], self.controller.queued), ("queue", 0))
+        release.set()
+        holder.join()
+
+    def test_admit_ExpiredDeadline_DeadlineExceededWithoutSlot(self):
+        with self.assertRaises(DeadlineExceeded):
+            with self.controller.admit(monotonic() - 1):
+                pass
+        self.assertEqual(self.controller.in_flight, 0)
+
+
+class AsyncAdmissionControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.controller = AsyncAdmissionController(max_in_flight=1, max_queue=2, queue_timeout=5)
+
+    async def admit_in_order(self, count):
+        order = []
+
+        async def request(index):
+            async with self.controller.admit():
+                order.append(index)
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*(request(index) for index in range(count)))
+        return order
+
+    def test_admit_QueuedRequests_AdmittedInArrivalOrder(self):
+        self.assertEqual(asyncio.run(self.admit_in_order(3)), [0, 1, 2])
+        self.assertEqual((self.controller.in_flight, self.controller.queued), (0, 0))
+
+    def test_admit_QueueFull_AdmissionRejected(self):
+        with self.assertRaises(AdmissionRejected):
+            asyncio.run(self.admit_in_order(4))
+
+    def test_admit_DeadlineExpiresInQueue_DeadlineExceededAndSlotKept(self):
+        async def expire_in_queue():
+            async with self.controller.admit():
+                with self.assertRaises(DeadlineExceeded) as context:
+                    async with self.controller.admit(monotonic() + 0.01):
+                        pass
+            self.assertEqual(context.exception.args[1], "queue")
+            async with self.controller.admit():
+                return self.controller.in_flight
+
+        self.assertEqual(asyncio.run(expire_in_queue()), 1)
+        self.assertEqual((self.controller.in_flight, self.controller.queued), (0, 0))
+
+
+class SingleFlightDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight(timeout=5)
+
+    def test_do_LeaderDeadlineExpired_FollowerComputesItself(self):
+        started, release = threading.Event(), threading.Event()
+
+        def expired():
+            started.set()
+            release.wait(5)
+            raise DeadlineExceeded("expired", "sanity_check")
+
+        leader = threading.Thread(target=lambda: self.assertRaises(DeadlineExceeded, self.single_flight.do, "key",
+                                                                   expired))
+        leader.start()
+        started.wait(5)
+        threading.Timer(0.02, release.set).start()
+        self.assertEqual(self.single_flight.do("key", lambda: "plan"), "plan")
+        leader.join()
+
+
+class PowerAdmissionTest(unittest.TestCase):
+    def setUp(self):
+        self.app = api.app.test_client()
+        self.headers = {"Content-Type": "application/json"}
+        self.default_admission, self.default_cache = api.admission, api.result_cache
+        api.admission = AdmissionController(max_in_flight=1, max_queue=0)
+        api.result_cache = ResultCache(max_size=0, error_max_size=0)
+
+    def tearDown(self):
+        api.admission, api.result_cache = self.default_admission, self.default_cache
+
+    def post(self, **headers):
+        return self.app.post('/', headers=dict(self.headers, **headers), data=json.dumps(payload))
+
+    def test_post_TimeoutHeader_SameAsPowerPlan(self):
+        response = self.post(**{"X-Request-Timeout": "10"})
+        self.assertEqual((response.status_code, response.json), (200, PowerPlan(payload).run()))
+
+    def test_post_ExpiredTimeout_GatewayTimeout(self):
+        self.assertEqual(self.post(**{"X-Request-Timeout": "0"}).status_code, 504)
+
+    def test_post_IncorrectTimeout_BadRequest(self):
+        self.assertEqual(self.post(**{"X-Request-Timeout": "soon"}).status_code, 400)
+
+    def test_post_Saturated_ServiceUnavailable(self):
+        with api.admission.admit():
+            response = self.post()
+        self.assertEqual((response.status_code, response.headers["Retry-After"]), (503, "1"))
+        self.assertEqual(self.post().status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from . import payload, random_payload
+from .test_supply_curve import solve_with_power_plan
+from power_plan.aggregated import AggregatedPowerPlan
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+
+
+def solve_with_aggregated_power_plan(data, load):
+    try:
+        return AggregatedPowerPlan(dict(data, load=load)).run()
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+def duplicated_payload(rng, size):
+    """Generate a payload of size powerplants copied from a few random models."""
+    models = random_payload(rng, rng.randint(1, 4))
+    powerplants = [dict(rng.choice(models["powerplants"]), name=f"pp{i}") for i in range(size)]
+    return dict(models, powerplants=powerplants)
+
+
+class AggregatedPowerPlanTest(unittest.TestCase):
+    def test_run_SamplePayload_SameAsPowerPlan(self):
+        self.assertEqual(AggregatedPowerPlan(payload).run(), PowerPlan(payload).run())
+
+    def test_aggregate_SamplePayload_IdenticalPowerplantsGrouped(self):
+        groups = AggregatedPowerPlan(payload).groups
+        self.assertEqual(len(groups), 5)
+        self.assertEqual(groups[("gasfired", 0.53, 100, 460)], [0, 1])
+
+    def test_sort_by_merit_order_TiedWindParks_InterleavedInPayloadOrder(self):
+        windpark = {"type": "windturbine", "efficiency": 1, "pmin": 0}
+        data = dict(payload, powerplants=[dict(windpark, name="w0", pmax=10), dict(windpark, name="w1", pmax=20),
+                                          dict(windpark, name="w2", pmax=10), dict(windpark, name="w3", pmax=10)])
+        blocks = AggregatedPowerPlan(data).sort_by_merit_order()
+        self.assertEqual([block.members for block in blocks], [[0], [1], [2, 3]])
+
+    def test_run_CompactFleet_SameAsPowerPlan(self):
+        data = dict(payload, powerplants=CompactFleet(payload["powerplants"]))
+        self.assertEqual(AggregatedPowerPlan(data).run(), PowerPlan(payload).run())
+
+    def test_run_UnknownType_TypeError(self):
+        data = dict(payload, powerplants=[dict(payload["powerplants"][0], type="nuclear")])
+        self.assertRaises(TypeError, AggregatedPowerPlan(data).run)
+
+    def test_run_DuplicatedFleetsEveryLoad_SameAsPowerPlan(self):
+        rng = random.Random(5)
+        for _ in range(40):
+            data = duplicated_payload(rng, rng.randint(1, 12))
+            capacity = sum(pp["pmax"] for pp in data["powerplants"])
+            for load in range(-1, capacity + 2, max(1, capacity // 200)):
+                self.assertEqual(solve_with_aggregated_power_plan(data, load), solve_with_power_plan(data, load))
+
+    def test_run_RandomPayloads_SameAsPowerPlan(self):
+        rng = random.Random(6)
+        for _ in range(200):
+            data = random_payload(rng, rng.randint(0, 15))
+            self.assertEqual(solve_with_aggregated_power_plan(data, data["load"]),
+                             solve_with_power_plan(data, data["load"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
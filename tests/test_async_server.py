@@ -0,0 +1,285 @@
+import asyncio
+import http.client
+import json
+import multiprocessing
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import payload
+import api
+from power_plan import async_server, engines
+from power_plan.async_server import PowerPlanASGI, init_solver, serve, solve_body
+from power_plan.powerplan import PowerPlan
+
+
+def call(app, method, path, body=b"", headers=()):
+    """Call an ASGI application with one http request, return the response status and JSON body."""
+    return call_with_headers(app, method, path, body, headers)[:2]
+
+
+def call_with_headers(app, method, path, body=b"", headers=()):
+    """Call an ASGI application with one http request, return the response status, JSON body, None if empty, and headers."""
+    return asyncio.run(async_call(app, method, path, body, headers))
+
+
+async def async_call(app, method, path, body=b"", headers=()):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers)}
+    await app(scope, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"]) if sent[1]["body"] else None, dict(sent[0]["headers"])
+
+
+class SolveBodyTest(unittest.TestCase):
+    def setUp(self):
+        self.client = api.app.test_client()
+
+    def tearDown(self):
+        init_solver()
+
+    def test_solve_body_SamplePayload_SameAsPowerPlan(self):
+        self.assertEqual(json.loads(solve_body(json.dumps(payload).encode())), PowerPlan(payload).run())
+
+    def test_solve_body_InvalidJson_Error(self):
+        self.assertIn("error", json.loads(solve_body(b"{not json")))
+
+    def test_solve_body_Payloads_SameAsFlaskResource(self):
+        bodies = [json.dumps(data).encode() for data in (
+            payload,
+            dict(payload, load=480.0),
+            dict(payload, powerplants=[dict(payload["powerplants"][0], efficiency=1.5)]),
+            {"load": 480, "fuels": payload["fuels"], "fleet_id": "unknown"},
+        )] + [b"{not json"]
+        for body in bodies:
+            flask_response = self.client.post('/', data=body, headers={"Content-Type": "application/json"})
+            self.assertEqual(json.loads(solve_body(body)), flask_response.get_json())
+
+    def test_solve_body_SameBodyTwice_SecondServedFromCache(self):
+        init_solver({"max_size": 8}, coalesce_timeout=10)
+        body = json.dumps(payload).encode()
+        self.assertEqual(solve_body(body), solve_body(body))
+        self.assertEqual(async_server.result_cache.results.hits, 1)
+
+
+class PowerPlanASGITest(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(4)
+        self.app = PowerPlanASGI(self.executor, max_concurrency=2, max_body_size=100000)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_call_PostPayload_SameAsPowerPlan(self):
+        self.assertEqual(call(self.app, "POST", "/", json.dumps(payload).encode()), (200, PowerPlan(payload).run()))
+
+    def test_call_OptimalEngineAboveBudget_BadRequest(self):
+        data = {"load": 50, "fuels": payload["fuels"], "engine": "optimal",
+                "powerplants": [dict(payload["powerplants"][0], pmin=100, pmax=100)] * 2}
+        default_max_cells, engines.OPTIMAL_MAX_CELLS = engines.OPTIMAL_MAX_CELLS, 10
+        try:
+            self.assertEqual(call(self.app, "POST", "/", json.dumps(data).encode())[0], 400)
+        finally:
+            engines.OPTIMAL_MAX_CELLS = default_max_cells
+
+    def test_call_UnknownPath_NotFound(self):
+        self.assertEqual(call(self.app, "POST", "/unknown")[0], 404)
+
+    def test_call_Get_MethodNotAllowed(self):
+        self.assertEqual(call(self.app, "GET", "/")[0], 405)
+
+    def test_call_LargeBody_PayloadTooLarge(self):
+        self.assertEqual(call(self.app, "POST", "/", b" " * 100001)[0], 413)
+        self.assertEqual(call(self.app, "POST", "/", headers=[(b"content-length", b"100001")])[0], 413)
+
+    def test_call_ManyRequests_AtMostMaxConcurrencyInFlight(self):
+        peak = []
+
+        def slow_solve(body, deadline=None, fleet=None):
+            peak.append(app.in_flight)
+            time.sleep(0.01)
+            return body
+
+        app = PowerPlanASGI(self.executor, max_concurrency=2, solve=slow_solve)
+
+        async def post_all():
+            async def receive():
+                return {"type": "http.request", "body": b"{}"}
+
+            async def send(message):
+                pass
+
+            scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+            await asyncio.gather(*(app(scope, receive, send) for _ in range(20)))
+
+        asyncio.run(post_all())
+        self.assertEqual((len(peak), max(peak), app.in_flight), (20, 2, 0))
+
+    def test_call_QueueFull_ServiceUnavailableWithRetryAfter(self):
+        release = threading.Event()
+
+        def blocked_solve(body, deadline=None, fleet=None):
+            release.wait(5)
+            return body
+
+        app = PowerPlanASGI(self.executor, max_concurrency=1, solve=blocked_solve, max_queue=1, retry_after=3)
+
+        async def post_three():
+            posts = [asyncio.ensure_future(async_call(app, "POST", "/", b"{}")) for _ in range(3)]
+            rejected = await posts[2]
+            release.set()
+            return [await post for post in posts[:2]] + [rejected]
+
+        responses = asyncio.run(post_three())
+        self.assertEqual([status for status, _, _ in responses], [200, 200, 503])
+        self.assertEqual(responses[2][2][b"retry-after"], b"3")
+
+    def test_call_ExpiredTimeoutHeader_GatewayTimeout(self):
+        headers = [(b"x-request-timeout", b"0")]
+        self.assertEqual(call(self.app, "POST", "/", json.dumps(payload).encode(), headers)[0], 504)
+
+    def test_call_DeadlineExpiringInTheSolver_GatewayTimeout(self):
+        def slow_solve(body, deadline=None, fleet=None):
+            time.sleep(0.05)
+            return solve_body(body, deadline, fleet)
+
+        app = PowerPlanASGI(self.executor, max_concurrency=1, solve=slow_solve)
+        headers = [(b"x-request-timeout", b"0.01")]
+        self.assertEqual(call(app, "POST", "/", json.dumps(payload).encode(), headers)[0], 504)
+
+    def test_call_InvalidTimeoutHeader_BadRequest(self):
+        headers = [(b"x-request-timeout", b"soon")]
+        self.assertEqual(call(self.app, "POST", "/", json.dumps(payload).encode(), headers)[0], 400)
+
+
+class FleetResourcesTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(2)
+        self.app = PowerPlanASGI(self.executor, max_concurrency=2)
+        self.request = {"load": 480, "fuels": payload["fuels"]}
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def register(self):
+        body = json.dumps({"powerplants": payload["powerplants"]}).encode()
+        return call_with_headers(self.app, "POST", "/fleets", body)
+
+    def test_fleets_RegisterThenSolve_SameAsPowerPlan(self):
+        status, fleet, headers = self.register()
+        self.assertEqual((status, headers[b"etag"]), (201, fleet["etag"].encode()))
+        body = json.dumps(dict(self.request, fleet_id=fleet["fleet_id"])).encode()
+        self.assertEqual(call(self.app, "POST", "/", body), (200, PowerPlan(dict(self.request, **payload)).run()))
+
+    def test_fleets_SameAsFlaskResources(self):
+        client = api.app.test_client()
+        fleet = self.register()[1]
+        flask_fleet = client.post('/fleets', json={"powerplants": payload["powerplants"]}).get_json()
+        for data in (fleet, flask_fleet):
+            data.pop("fleet_id")
+        self.assertEqual(fleet, flask_fleet)
+        body = json.dumps({"powerplants": [dict(payload["powerplants"][0], type="nuclear")]}).encode()
+        flask_response = client.post('/fleets', data=body, headers={"Content-Type": "application/json"})
+        self.assertEqual(call(self.app, "POST", "/fleets", body), (400, flask_response.get_json()))
+
+    def test_fleet_GetPutDelete_SameStatusesAsFlaskResources(self):
+        fleet = self.register()[1]
+        path = "/fleets/" + fleet["fleet_id"]
+        status, description, headers = call_with_headers(self.app, "GET", path)
+        self.assertEqual((status, description["powerplants"], headers[b"etag"]),
+                         (200, payload["powerplants"], fleet["etag"].encode()))
+
+        body = json.dumps({"powerplants": payload["powerplants"][:2]}).encode()
+        self.assertEqual(call(self.app, "PUT", path, body, [(b"if-match", b"outdated")])[0], 412)
+        status, updated = call(self.app, "PUT", path, body, [(b"if-match", fleet["etag"].encode())])
+        self.assertEqual((status, updated["version"]), (200, 2))
+
+        self.assertEqual(call(self.app, "DELETE", path), (204, None))
+        self.assertEqual(call(self.app, "DELETE", path)[0], 404)
+        self.assertEqual(call(self.app, "GET", path)[0], 404)
+
+    def test_fleets_SolveUpdatedThenDeletedFleet_LatestVersionThenUnknownFleet(self):
+        fleet = self.register()[1]
+        body = json.dumps(dict(self.request, fleet_id=fleet["fleet_id"])).encode()
+        call(self.app, "POST", "/", body)
+        updated = [dict(payload["powerplants"][0], pmax=1000)]
+        call(self.app, "PUT", "/fleets/" + fleet["fleet_id"], json.dumps({"powerplants": updated}).encode())
+        self.assertEqual(call(self.app, "POST", "/", body)[1],
+                         PowerPlan(dict(self.request, powerplants=updated)).run())
+
+        call(self.app, "DELETE", "/fleets/" + fleet["fleet_id"])
+        status, response = call(self.app, "POST", "/", body)
+        self.assertEqual(status, 200)
+        self.assertIn("unknown fleet", response["error"])
+
+    def test_fleets_ProcessPool_SameAsPowerPlan(self):
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_solver) as executor:
+            self.app = PowerPlanASGI(executor, max_concurrency=1)
+            fleet = self.register()[1]
+            body = json.dumps(dict(self.request, fleet_id=fleet["fleet_id"])).encode()
+            for _ in range(2):
+                self.assertEqual(call(self.app, "POST", "/", body),
+                                 (200, PowerPlan(dict(self.request, **payload)).run()))
+
+
+class ServeTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(4)
+        app = PowerPlanASGI(self.executor, max_concurrency=4)
+        self.stop = threading.Event()
+        started = threading.Event()
+
+        def on_started(server):
+            self.port = server.sockets[0].getsockname()[1]
+            started.set()
+
+        async def serve_until_stopped():
+            serving = asyncio.ensure_future(serve(app, "127.0.0.1", 0, started=on_started))
+            await asyncio.get_running_loop().run_in_executor(None, self.stop.wait)
+            serving.cancel()
+            await asyncio.gather(serving, return_exceptions=True)
+
+        self.thread = threading.Thread(target=asyncio.run, args=(serve_until_stopped(),))
+        self.thread.start()
+        started.wait(5)
+
+    def tearDown(self):
+        self.stop.set()
+        self.thread.join(5)
+        self.executor.shutdown()
+
+    def test_serve_KeepAliveConnection_SameAsPowerPlan(self):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        for load in (100, 480, 100000):
+            data = dict(payload, load=load)
+            connection.request("POST", "/", json.dumps(data), {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            self.assertEqual(json.loads(response.read()), json.loads(solve_body(json.dumps(data).encode())))
+        connection.close()
+
+    def test_serve_ConcurrentClients_EveryResponse(self):
+        def post(load):
+            connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+            connection.request("POST", "/", json.dumps(dict(payload, load=load)))
+            response = json.loads(connection.getresponse().read())
+            connection.close()
+            return response
+
+        with ThreadPoolExecutor(16) as clients:
+            responses = list(clients.map(post, range(100, 500, 10)))
+        self.assertEqual(responses, [json.loads(solve_body(json.dumps(dict(payload, load=load)).encode()))
+                                     for load in range(100, 500, 10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
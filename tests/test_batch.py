@@ -0,0 +1,67 @@
+import unittest
+
+from . import payload
+from power_plan.batch import expand_scenario, split_batch
+from power_plan.error_catcher_functions import find_batch_production
+from power_plan.powerplan import PowerPlan
+
+
+class SplitBatchTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_split_batch_ListOfPayloads_NoSharedData(self):
+        batch = [payload, payload]
+        shared_data, items = split_batch(batch)
+        self.assertEqual(shared_data, {})
+        self.assertIs(items, batch)
+
+    def test_split_batch_Scenarios_SharedKeysInEveryPayload(self):
+        batch = {"powerplants": payload["powerplants"],
+                 "scenarios": [{"load": 100, "fuels": payload["fuels"]}, {"load": 200, "fuels": payload["fuels"]}]}
+        shared_data, items = split_batch(batch)
+        payloads = [expand_scenario(shared_data, item) for item in items]
+        self.assertEqual([p["load"] for p in payloads], [100, 200])
+        self.assertTrue(all(p["powerplants"] is payload["powerplants"] for p in payloads))
+
+    def test_split_batch_NoScenarios_ValueError(self):
+        self.assertRaises(ValueError, split_batch, {"powerplants": []})
+
+    def test_split_batch_ScenariosNotAList_TypeError(self):
+        self.assertRaises(TypeError, split_batch, {"scenarios": {}})
+
+    def test_split_batch_NotAListNorADict_TypeError(self):
+        self.assertRaises(TypeError, split_batch, 42)
+
+    def test_expand_scenario_ScenarioKeysOverrideSharedKeys_Equal(self):
+        self.assertEqual(expand_scenario({"load": 1, "fuels": {}}, {"load": 2}), {"load": 2, "fuels": {}})
+
+
+class FindBatchProductionTest(unittest.TestCase):
+    def setUp(self):
+        self.expected_output = PowerPlan(payload).run()
+
+    def test_find_batch_production_ListOfPayloads_ExpectedOutput(self):
+        results = find_batch_production([payload, payload])
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertCountEqual(result, self.expected_output)
+
+    def test_find_batch_production_InvalidItem_ErrorReportedWithoutAbortingBatch(self):
+        invalid_payload = dict(payload, load=-1)
+        results = find_batch_production([invalid_payload, payload])
+        self.assertIn("error", results[0])
+        self.assertCountEqual(results[1], self.expected_output)
+
+    def test_find_batch_production_UnfillableLoad_ErrorReportedWithoutAbortingBatch(self):
+        results = find_batch_production({"powerplants": payload["powerplants"], "fuels": payload["fuels"],
+                                         "scenarios": [{"load": 100000}, {"load": payload["load"]}]})
+        self.assertIn("error", results[0])
+        self.assertCountEqual(results[1], self.expected_output)
+
+    def test_find_batch_production_MalformedBatch_Error(self):
+        self.assertIn("error", find_batch_production({"powerplants": []}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+
+from . import payload, random_payload
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+
+
+def solve(data):
+    try:
+        return PowerPlan(data).run()
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+class CompactFleetTest(unittest.TestCase):
+    def setUp(self):
+        self.fleet = CompactFleet(payload["powerplants"])
+
+    def test_run_RandomPayloads_SameAsPowerplantObjects(self):
+        rng = random.Random(9)
+        for _ in range(200):
+            data = random_payload(rng, rng.randint(1, 20))
+            self.assertEqual(solve(dict(data, powerplants=CompactFleet(data["powerplants"]))), solve(data))
+
+    def test_type_codes_SamplePayload_InternedTypes(self):
+        self.assertEqual(self.fleet.type_names, ["gasfired", "turbojet", "windturbine"])
+        self.assertEqual(list(self.fleet.type_codes), [0, 0, 0, 1, 2, 2])
+
+    def test_views_SetAttributes_WrittenInTheArrays(self):
+        view = self.fleet.views()[3]
+        view.pmax = 20
+        view.set_cost(1.5)
+        view.type = "anUnknownType"
+        self.assertEqual(self.fleet.pmax[3], 20)
+        self.assertEqual(self.fleet.cost[3], 1.5)
+        self.assertEqual(view.type, "anUnknownType")
+
+    def test_views_UnsetCost_None(self):
+        self.assertIsNone(self.fleet.views()[0].cost)
+
+    def test_sort_by_merit_order_UnknownPowerplantsType_TypeError(self):
+        power_plan = PowerPlan(dict(payload, powerplants=self.fleet))
+        power_plan.powerplants[0].type = "anUnknownType"
+        self.assertRaises(TypeError, power_plan.sort_by_merit_order)
+
+    def test_run_SharedFleet_Unchanged(self):
+        PowerPlan(dict(payload, powerplants=self.fleet)).run()
+        self.assertEqual(self.fleet.to_dicts(), payload["powerplants"])
+
+    def test_copy_ModifiedCopy_OriginalUnchanged(self):
+        copy = self.fleet.copy()
+        copy.views()[0].pmax = 0
+        self.assertEqual(list(self.fleet.pmax), [pp["pmax"] for pp in payload["powerplants"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
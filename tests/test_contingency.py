@@ -0,0 +1,66 @@
+import random
+import unittest
+
+from . import payload, random_payload
+from .test_supply_curve import solve_with_power_plan
+from power_plan.contingency import ContingencyAnalysis
+from power_plan.error_catcher_functions import find_contingency_production
+from power_plan.supply_curve import SupplyCurve
+
+
+def solve_outages_with_power_plan(data):
+    """Solve the payload with every powerplant removed in turn, in the merit order of the payload."""
+    names = SupplyCurve.from_payload(data).names
+    powerplants = {pp["name"]: pp for pp in data["powerplants"]}
+    return [solve_with_power_plan(dict(data, powerplants=[pp for other, pp in powerplants.items() if other != name]),
+                                  data["load"]) for name in names]
+
+
+class ContingencyAnalysisTest(unittest.TestCase):
+    def assertSameAsPowerPlan(self, data, response):
+        base = solve_with_power_plan(data, data["load"])
+        supply_curve = SupplyCurve.from_payload(data)
+        costs = dict(zip(supply_curve.names, supply_curve.costs))
+        base_production = {} if isinstance(base, str) else {pp["name"]: pp["p"] for pp in base}
+        for outage, expected in zip(response["outages"], solve_outages_with_power_plan(data)):
+            if isinstance(expected, str):
+                self.assertEqual((outage["feasible"], outage["error"]), (False, expected))
+                continue
+            self.assertTrue(outage["feasible"])
+            self.assertAlmostEqual(outage["cost"], sum(costs[pp["name"]] * pp["p"] for pp in expected))
+            changes = [{"name": pp["name"], "p": pp["p"]} for pp in expected
+                       if pp["p"] != base_production.get(pp["name"], 0)]
+            self.assertEqual(sorted(outage["changes"], key=lambda pp: pp["name"]),
+                             sorted(changes, key=lambda pp: pp["name"]))
+            self.assertEqual(outage["lost_p"], base_production.get(outage["name"], 0))
+
+    def test_run_SamplePayload_SameAsPowerPlan(self):
+        response = ContingencyAnalysis.from_payload(payload).run()
+        self.assertEqual(len(response["outages"]), len(payload["powerplants"]))
+        self.assertSameAsPowerPlan(payload, response)
+
+    def test_run_SamplePayload_CostDeltas(self):
+        response = ContingencyAnalysis.from_payload(payload).run()
+        outages = {outage["name"]: outage for outage in response["outages"]}
+        self.assertEqual(outages["tj1"]["cost_delta"], 0)
+        self.assertAlmostEqual(outages["windpark1"]["cost_delta"],
+                               outages["windpark1"]["cost"] - response["base"]["cost"])
+        self.assertGreater(outages["windpark1"]["cost_delta"], 0)
+
+    def test_run_RandomPayloads_SameAsPowerPlan(self):
+        rng = random.Random(9)
+        for _ in range(300):
+            data = random_payload(rng, rng.randint(0, 8))
+            data["load"] = rng.randint(0, sum(pp["pmax"] for pp in data["powerplants"]))
+            self.assertSameAsPowerPlan(data, ContingencyAnalysis.from_payload(data).run())
+
+    def test_run_LoadZero_EveryCaseUnchanged(self):
+        response = ContingencyAnalysis.from_payload(dict(payload, load=0)).run()
+        self.assertTrue(all(outage["changes"] == [] and outage["cost"] == 0 for outage in response["outages"]))
+
+    def test_find_contingency_production_IncorrectPayload_ErrorMessage(self):
+        self.assertIn("error", find_contingency_production(dict(payload, load=-1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from . import payload, random_payload
+from .test_supply_curve import solve_with_power_plan
+from power_plan.custom_exceptions import AlgorithmError, DispatchBudgetExceeded
+from power_plan.dispatch_table import DispatchTable, payload_fingerprint
+from power_plan.powerplan import PowerPlan
+from power_plan.supply_curve import SupplyCurve
+
+
+def solve_with_dispatch_table(dispatch_table, load):
+    try:
+        return dispatch_table.dispatch(load)
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+class DispatchTableTest(unittest.TestCase):
+    def setUp(self):
+        self.dispatch_table = DispatchTable.from_payload(payload)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fleet.table")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_dispatch_SamplePayload_SameAsPowerPlan(self):
+        self.assertEqual(self.dispatch_table.dispatch(payload["load"]), PowerPlan(payload).run())
+
+    def test_dispatch_EveryLoadOfRandomFleets_SameAsPowerPlan(self):
+        rng = random.Random(5)
+        for _ in range(20):
+            data = random_payload(rng, rng.randint(1, 15))
+            dispatch_table = DispatchTable.from_payload(data)
+            for load in range(-1, dispatch_table.capacity + 2):
+                self.assertEqual(solve_with_dispatch_table(dispatch_table, load), solve_with_power_plan(data, load))
+
+    def test_capacity_SamplePayload_SumOfAvailablePmax(self):
+        self.assertEqual(self.dispatch_table.capacity, sum(SupplyCurve.from_payload(payload).pmax))
+
+    def test_open_SavedTable_MemoryMappedSameDispatch(self):
+        self.dispatch_table.save(self.path)
+        opened = DispatchTable.open(self.path)
+        self.assertIsInstance(opened.table, np.memmap)
+        self.assertEqual(opened.fingerprint, payload_fingerprint(payload))
+        for load in range(opened.capacity + 1):
+            self.assertEqual(solve_with_dispatch_table(opened, load),
+                             solve_with_dispatch_table(self.dispatch_table, load))
+        self.assertEqual(opened.marginal_price(480), self.dispatch_table.marginal_price(480))
+
+    def test_from_payload_CapacityAboveMaxRows_DispatchBudgetExceeded(self):
+        self.assertRaises(DispatchBudgetExceeded, DispatchTable.from_payload, payload, max_rows=100)
+        huge = dict(payload, powerplants=[dict(payload["powerplants"][0], pmin=0, pmax=10 ** 15)])
+        self.assertRaises(DispatchBudgetExceeded, DispatchTable.from_payload, huge)
+
+    def test_open_OtherFile_ValueError(self):
+        with open(self.path, "wb") as other_file:
+            other_file.write(b"not a table")
+        self.assertRaises(ValueError, DispatchTable.open, self.path)
+
+    def test_payload_fingerprint_OtherLoad_SameFingerprint(self):
+        self.assertEqual(payload_fingerprint(payload), payload_fingerprint(dict(payload, load=1)))
@@ -0,0 +1,120 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from power_plan import error_log
+from power_plan.error_catcher_functions import report_error
+from power_plan.error_log import DROPPED_LOGS, ERROR_LOG, ERROR_LOGS, BoundedFormatter, NonBlockingQueueHandler, \
+    SampledErrorLog, init_worker_logging, start_logging, worker_logging
+
+
+class SampledErrorLogTest(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("tests.error_log")
+        self.error_log = SampledErrorLog(self.logger, burst=2, interval=60)
+
+    def test_error_IdenticalErrors_BurstLogged(self):
+        with self.assertLogs(self.logger) as logs:
+            logged = [self.error_log.error("sanity_check", ValueError("load value: -1")) for _ in range(5)]
+        self.assertEqual(logged, [True, True, False, False, False])
+        self.assertEqual(logs.output, ["ERROR:tests.error_log:sanity_check: load value: -1"] * 2)
+
+    def test_error_DistinctErrors_EachLogged(self):
+        errors = [ValueError("a"), TypeError("a"), ValueError("b")]
+        with self.assertLogs(self.logger):
+            self.assertEqual([self.error_log.error("sanity_check", err) for err in errors], [True] * 3)
+        self.assertTrue(self.error_log.error("find_powerplants_production", ValueError("a")))
+
+    def test_error_NextInterval_SuppressedCountLogged(self):
+        self.error_log.interval = 0.01
+        with self.assertLogs(self.logger) as logs:
+            for _ in range(5):
+                self.error_log.error("sanity_check", ValueError("a"))
+            time.sleep(0.02)
+            self.assertTrue(self.error_log.error("sanity_check", ValueError("a")))
+        self.assertEqual(logs.output[-1], "ERROR:tests.error_log:sanity_check: a "
+                                          "(3 identical errors were not logged since the last one)")
+
+    def test_error_MaxErrorsReached_LeastRecentlySeenForgotten(self):
+        self.error_log.max_errors = 2
+        with self.assertLogs(self.logger):
+            for message in ("a", "b", "a", "c"):
+                self.error_log.error("sanity_check", ValueError(message))
+        self.assertEqual([key[2] for key in self.error_log._intervals], ["a", "c"])
+
+    def test_report_error_RepeatedError_CountedEvenIfSuppressed(self):
+        default_burst, ERROR_LOG.burst = ERROR_LOG.burst, 0
+        suppressed = ERROR_LOGS.values.get(("test", "suppressed"), 0)
+        try:
+            self.assertEqual(report_error(ValueError("report_error test"), "test"), {"error": "report_error test"})
+        finally:
+            ERROR_LOG.burst = default_burst
+        self.assertEqual(ERROR_LOGS.values[("test", "suppressed")], suppressed + 1)
+
+
+class NonBlockingQueueHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self.queue = queue.Queue(1)
+        self.logger = logging.Logger("tests.queue_handler")
+        self.logger.addHandler(NonBlockingQueueHandler(self.queue))
+
+    def test_emit_Record_QueuedUnformatted(self):
+        err = ValueError("a")
+        self.logger.error("%s: %s", "sanity_check", err)
+        record = self.queue.get_nowait()
+        self.assertEqual((record.msg, record.args), ("%s: %s", ("sanity_check", err)))
+
+    def test_emit_QueueFull_DroppedAndCounted(self):
+        dropped = DROPPED_LOGS.values.get((), 0)
+        for _ in range(3):
+            self.logger.error("a")
+        self.assertEqual((self.queue.qsize(), DROPPED_LOGS.values.get((), 0)), (1, dropped + 2))
+
+
+class StartLoggingTest(unittest.TestCase):
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.handlers, self.level = self.root.handlers, self.root.level
+        self.filename = os.path.join(tempfile.mkdtemp(), "log_file.log")
+
+    def tearDown(self):
+        self.root.handlers, self.root.level = self.handlers, self.level
+        error_log._log_listener = None
+
+    def stop(self, listener):
+        atexit.unregister(listener.stop)
+        listener.stop()
+        with open(self.filename) as log_file:
+            return log_file.read()
+
+    def test_start_logging_LongMessage_WrittenCut(self):
+        listener = start_logging(self.filename, fmt="%(levelname)s %(message)s", max_length=10)
+        logging.getLogger("power_plan").error("%s", "x" * 100)
+        logging.getLogger("power_plan").info("not written")
+        self.assertEqual(self.stop(listener), "ERROR xxxxxxxxxx... (100 characters)\n")
+
+    def test_worker_logging_NotStarted_None(self):
+        self.assertIsNone(worker_logging())
+
+    def test_init_worker_logging_SpawnedWorker_WrittenByServingProcess(self):
+        listener = start_logging(self.filename, fmt="%(processName)s %(message)s", max_length=20)
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"), initializer=init_worker_logging,
+                                 initargs=(worker_logging(),)) as executor:
+            executor.submit(report_error, ValueError("x" * 100), "worker").result()
+        process_name, message = self.stop(listener).split(" ", 1)
+        self.assertNotEqual(process_name, multiprocessing.current_process().name)
+        self.assertEqual(message, "worker: xxxxxxxxxxxx... (108 characters)\n")
+
+    def test_format_ShortMessage_Unchanged(self):
+        record = logging.LogRecord("power_plan", logging.ERROR, __file__, 1, "%s", ("short",), None)
+        self.assertEqual(BoundedFormatter("%(message)s", max_length=10).format(record), "short")
+
+
+if __name__ == '__main__':
+    unittest.main()
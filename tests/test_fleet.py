@@ -0,0 +1,61 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from . import payload, random_payload
+from power_plan.aggregated import AggregatedPowerPlan
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+def solve(data, engine=PowerPlan):
+    try:
+        return engine(data).run()
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+class SharedFleetTest(unittest.TestCase):
+    def setUp(self):
+        self.fleet = CompactFleet(payload["powerplants"])
+
+    def test_to_dicts_SamplePayload_SamePowerplants(self):
+        self.assertEqual(self.fleet.to_dicts(), payload["powerplants"])
+        self.assertEqual(len(self.fleet), len(payload["powerplants"]))
+
+    def test_run_RandomPayloads_SameAsDictionaries(self):
+        rng = random.Random(21)
+        for _ in range(200):
+            data = random_payload(rng, rng.randint(1, 20))
+            fleet = CompactFleet(data["powerplants"])
+            for engine in (PowerPlan, VectorizedPowerPlan, AggregatedPowerPlan):
+                self.assertEqual(solve(dict(data, powerplants=fleet), engine), solve(data, engine))
+            self.assertEqual(fleet.to_dicts(), data["powerplants"])
+
+    def test_run_SolvedTwice_FleetUnchanged(self):
+        data = dict(payload, powerplants=self.fleet)
+        self.assertEqual(PowerPlan(data).run(), PowerPlan(data).run())
+        self.assertEqual(self.fleet.to_dicts(), payload["powerplants"])
+
+
+class SharedFleetConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.data = random_payload(rng, 60)
+        self.requests = [{"load": rng.randint(0, 6000), "fuels": random_payload(rng, 0)["fuels"]} for _ in range(400)]
+        self.expected = [solve(dict(self.data, **request)) for request in self.requests]
+
+    def solve_concurrently(self, fleet):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return list(executor.map(lambda request: solve(dict(request, powerplants=fleet)), self.requests))
+
+    def test_run_ManyThreadsOnOneCompactFleet_SameAsSequentialSolves(self):
+        fleet = CompactFleet(self.data["powerplants"])
+        self.assertEqual(self.solve_concurrently(fleet), self.expected)
+        self.assertEqual(fleet.to_dicts(), self.data["powerplants"])
+
+
+if __name__ == '__main__':
+    unittest.main()
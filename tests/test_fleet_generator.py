@@ -0,0 +1,29 @@
+import unittest
+
+from benchmarks.fleet_generator import generate_fleet, generate_payload
+from power_plan.incoming_data_check import perform_sanity_check
+
+
+class FleetGeneratorTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_generate_fleet_SameSeed_SameFleet(self):
+        self.assertEqual(generate_fleet(100, seed=1), generate_fleet(100, seed=1))
+
+    def test_generate_fleet_DuplicateRatio_IdenticalUnits(self):
+        fleet = generate_fleet(1000, duplicate_ratio=0.5)
+        models = {(pp["type"], pp["efficiency"], pp["pmin"], pp["pmax"]) for pp in fleet}
+        self.assertLess(len(models), 700)
+        self.assertEqual({pp["type"] for pp in fleet}, {"gasfired", "turbojet", "windturbine"})
+
+    def test_generate_payload_AnySize_CorrectPayload(self):
+        for size in (1, 10, 1000):
+            try:
+                perform_sanity_check(generate_payload(size))
+            except Exception:
+                self.fail("perform_sanity_check raised Exception unexpectedly!")
+
+
+if __name__ == '__main__':
+    unittest.main()
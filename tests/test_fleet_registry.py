@@ -0,0 +1,116 @@
+import json
+import unittest
+
+import numpy as np
+
+from . import payload
+from api import app
+from power_plan.custom_exceptions import FleetVersionError
+from power_plan.error_catcher_functions import find_registered_fleet_production, register_fleet
+from power_plan.fleet_registry import FleetRegistry
+from power_plan.powerplan import PowerPlan
+
+
+class FleetRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = FleetRegistry()
+        self.fleet = self.registry.register(payload["powerplants"])
+
+    def test_register_NewFleet_FirstVersion(self):
+        self.assertEqual(self.fleet.version, 1)
+        self.assertIs(self.registry.get(self.fleet.fleet_id), self.fleet)
+
+    def test_register_SameId_NewVersion(self):
+        fleet = self.registry.register(payload["powerplants"][:2], self.fleet.fleet_id)
+        self.assertEqual(fleet.version, 2)
+        self.assertNotEqual(fleet.etag, self.fleet.etag)
+
+    def test_register_WrongEtag_FleetVersionError(self):
+        self.assertRaises(FleetVersionError, self.registry.register, payload["powerplants"], self.fleet.fleet_id,
+                          "anOutdatedEtag")
+
+    def test_payload_data_VectorizedEngine_ReadOnlyViewsOfTheStoredFleet(self):
+        columns = self.fleet.payload_data(dict(payload, engine="vectorized"))["powerplants"]
+        self.assertTrue(np.shares_memory(columns.pmax, np.frombuffer(self.fleet.compact.pmax, dtype=np.int64)))
+        with self.assertRaises(ValueError):
+            columns.pmax[0] = 0
+
+    def test_payload_data_GreedyEngine_StoredFleetSharedAndUnchangedBySolving(self):
+        data = self.fleet.payload_data(dict(payload, engine="greedy"))
+        self.assertIs(data["powerplants"], self.fleet.compact)
+        PowerPlan(data).run()
+        self.assertEqual(self.fleet.compact.to_dicts(), payload["powerplants"])
+
+    def test_get_UnknownFleet_KeyError(self):
+        self.assertRaises(KeyError, self.registry.get, "anUnknownFleet")
+
+    def test_delete_RegisteredFleet_Unknown(self):
+        self.registry.delete(self.fleet.fleet_id)
+        self.assertRaises(KeyError, self.registry.get, self.fleet.fleet_id)
+
+
+class FindRegisteredFleetProductionTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = FleetRegistry()
+        self.fleet_id = register_fleet(payload, self.registry)["fleet_id"]
+        self.request = {"load": payload["load"], "fuels": payload["fuels"], "fleet_id": self.fleet_id}
+
+    def test_find_registered_fleet_production_EveryEngine_SameAsPowerPlan(self):
+        for engine in (None, "greedy", "vectorized"):
+            request = dict(self.request, engine=engine) if engine else self.request
+            self.assertEqual(find_registered_fleet_production(request, self.registry), PowerPlan(payload).run())
+
+    def test_find_registered_fleet_production_RepeatedSolves_FleetNotModified(self):
+        for _ in range(2):
+            self.assertEqual(find_registered_fleet_production(self.request, self.registry), PowerPlan(payload).run())
+
+    def test_find_registered_fleet_production_UnknownFleet_Error(self):
+        self.assertIn("error", find_registered_fleet_production(dict(self.request, fleet_id="x"), self.registry))
+
+    def test_register_fleet_UnknownTypeOrHugePmax_Errors(self):
+        powerplants = [dict(payload["powerplants"][0], type="nuclear"), dict(payload["powerplants"][0], pmax=10 ** 30)]
+        response = register_fleet({"powerplants": powerplants}, self.registry)
+        self.assertEqual([error["index"] for error in response["errors"]], [0, 1])
+
+    def test_find_registered_fleet_production_FleetOfUnknownType_Error(self):
+        powerplants = [dict(payload["powerplants"][0], type="nuclear")]
+        request = dict(self.request, fleet_id=self.registry.register(powerplants).fleet_id)
+        self.assertIn("error", find_registered_fleet_production(request, self.registry))
+
+    def test_register_fleet_IncorrectPowerplants_EveryError(self):
+        powerplants = [dict(pp, pmin=-1) for pp in payload["powerplants"]]
+        response = register_fleet({"powerplants": powerplants}, self.registry)
+        self.assertEqual(len(response["errors"]), len(powerplants))
+
+
+class FleetResourcesTest(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.headers = {"Content-Type": "application/json"}
+
+    def test_fleets_RegisterThenSolve_SameAsPowerPlan(self):
+        response = self.app.post('/fleets', headers=self.headers,
+                                 data=json.dumps({"powerplants": payload["powerplants"]}))
+        self.assertEqual(201, response.status_code)
+        request = {"load": payload["load"], "fuels": payload["fuels"], "fleet_id": response.json["fleet_id"]}
+        response = self.app.post('/', headers=self.headers, data=json.dumps(request))
+        self.assertEqual(response.json, PowerPlan(payload).run())
+
+    def test_fleet_PutWithOutdatedEtag_PreconditionFailed(self):
+        fleet_id = self.app.post('/fleets', headers=self.headers,
+                                 data=json.dumps({"powerplants": payload["powerplants"]})).json["fleet_id"]
+        response = self.app.put(f'/fleets/{fleet_id}', headers=dict(self.headers, **{"If-Match": "outdated"}),
+                                data=json.dumps({"powerplants": payload["powerplants"]}))
+        self.assertEqual(412, response.status_code)
+
+    def test_fleets_HugePmax_BadRequest(self):
+        powerplants = [dict(payload["powerplants"][0], pmax=10 ** 30)]
+        response = self.app.post('/fleets', headers=self.headers, data=json.dumps({"powerplants": powerplants}))
+        self.assertEqual(400, response.status_code)
+
+    def test_fleet_GetUnknownFleet_NotFound(self):
+        self.assertEqual(404, self.app.get('/fleets/anUnknownFleet').status_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
+import random
 import unittest
 
 from . import payload
 from power_plan.custom_exceptions import SanityCheckInternalError
 from power_plan.incoming_data_check import type_checking, values_checking, interval_checking, \
-    convert_interval_value, check_json_layer, perform_sanity_check
+    convert_interval_value, check_json_layer, perform_sanity_check, compile_layer_check, check_powerplants, \
+    powerplants_layer_keys_and_values_type_and_interval
 
 
 class TypeCheckingTest(unittest.TestCase):
@@ -157,6 +159,12 @@ class IntervalCheckingTest(unittest.TestCase):
                                                             "layer_key": layer_key,
                                                             "interval": interval})
 
+    def test_interval_checking_LargeDict_BoundedMessage(self):
+        dict_layer = {"a": 2, "b": list(range(100000)), "c": "x" * 100000}
+        with self.assertRaises(ValueError) as context:
+            interval_checking(dict_layer, "a", (0, 1))
+        self.assertLess(len(context.exception.args[0]), 500)
+
     def test_interval_checking_TooManyIntervalElements1_SanityCheckInternalError(self):
         json_layer = {"a": 1.1}
         layer_key = "a"
@@ -317,5 +325,60 @@ class PerformSanityCheckTest(unittest.TestCase):
         self.assertRaises(KeyError, perform_sanity_check, **{"data": data})
 
 
+class CompileLayerCheckTest(unittest.TestCase):
+    def setUp(self):
+        self.rules = powerplants_layer_keys_and_values_type_and_interval
+        self.check_layer = compile_layer_check(self.rules)
+
+    @staticmethod
+    def outcome(check, *args):
+        try:
+            check(*args)
+        except Exception as err:
+            return type(err), err.args
+        return None
+
+    def test_compile_layer_check_CorrectLayer_NoException(self):
+        try:
+            self.check_layer(payload["powerplants"][0])
+        except Exception:
+            self.fail("compiled check raised Exception unexpectedly!")
+
+    def test_compile_layer_check_RandomLayers_SameOutcomeAsCheckJsonLayer(self):
+        rng = random.Random(5)
+        values = [None, "a", -1, 0, 0.5, 1, 2, 100, 1.5, [], {}]
+        for _ in range(2000):
+            layer = dict(payload["powerplants"][0])
+            for key in rng.sample(list(layer), rng.randint(0, 2)):
+                if rng.random() < 0.2:
+                    del layer[key]
+                else:
+                    layer[key] = rng.choice(values)
+            self.assertEqual(self.outcome(self.check_layer, layer), self.outcome(check_json_layer, layer, self.rules))
+
+    def test_compile_layer_check_NotADict_SameOutcomeAsCheckJsonLayer(self):
+        self.assertEqual(self.outcome(self.check_layer, [1]), self.outcome(check_json_layer, [1], self.rules))
+
+    def test_compile_layer_check_TooManyIntervalElements_SanityCheckInternalError(self):
+        self.assertRaises(SanityCheckInternalError, compile_layer_check, [("a", int, (0, 1, 12))])
+
+
+class CheckPowerplantsTest(unittest.TestCase):
+    def setUp(self):
+        self.powerplants = [dict(pp) for pp in payload["powerplants"]]
+        self.powerplants[1]["pmin"] = -1
+        self.powerplants[3]["type"] = 3
+
+    def test_check_powerplants_CorrectFleet_NoError(self):
+        self.assertEqual(check_powerplants(payload["powerplants"], collect_errors=True), [])
+
+    def test_check_powerplants_IncorrectFleet_FirstError(self):
+        self.assertRaises(ValueError, check_powerplants, self.powerplants)
+
+    def test_check_powerplants_CollectErrors_EveryError(self):
+        errors = check_powerplants(self.powerplants, collect_errors=True)
+        self.assertEqual([error["index"] for error in errors], [1, 3])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
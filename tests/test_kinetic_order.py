@@ -0,0 +1,67 @@
+import random
+import unittest
+
+import numpy as np
+
+from . import random_payload
+from power_plan.kinetic_order import KineticMeritOrder, is_merit_order
+from power_plan.powerplan import Fuels
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+def drifting_fuels(rng, length):
+    """Generate fuels prices changing a little at every step, so that only a few powerplants swap."""
+    gas, kerosine, co2 = 15., 15., 10.
+    fuels = []
+    for _ in range(length):
+        gas, kerosine, co2 = max(0., gas + rng.gauss(0, 1)), max(0., kerosine + rng.gauss(0, 1)), rng.choice([co2, 0])
+        fuels.append({"gas(euro/MWh)": gas, "kerosine(euro/MWh)": kerosine, "co2(euro/ton)": co2, "wind(%)": 50})
+    return fuels
+
+
+class KineticMeritOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(22)
+
+    def assert_same_as_full_sort(self, data, fuels_series, merit_order):
+        power_plan = VectorizedPowerPlan(data)
+        for fuels in fuels_series:
+            power_plan.fuels = Fuels(fuels)
+            costs = power_plan.estimate_costs()
+            self.assertEqual(merit_order.update(costs).tolist(), np.argsort(costs, kind="stable").tolist())
+
+    def test_update_RandomPrices_SameAsFullSort(self):
+        for _ in range(50):
+            data = random_payload(self.rng, self.rng.randint(1, 40))
+            self.assert_same_as_full_sort(data, [random_payload(self.rng, 0)["fuels"] for _ in range(20)],
+                                          KineticMeritOrder())
+
+    def test_update_DriftingPrices_RepairedAsFullSort(self):
+        merit_order = KineticMeritOrder()
+        for _ in range(20):
+            self.assert_same_as_full_sort(random_payload(self.rng, 200), drifting_fuels(self.rng, 50), merit_order)
+            merit_order.order = None
+        self.assertGreater(merit_order.repair_count, merit_order.sort_count)
+
+    def test_update_TiedCosts_PayloadOrder(self):
+        data = random_payload(self.rng, 30)
+        for pp in data["powerplants"]:
+            pp["efficiency"] = 1 if pp["type"] == "windturbine" else self.rng.choice([0.3, 0.5])
+        fuels_series = [{"gas(euro/MWh)": gas, "kerosine(euro/MWh)": kerosine, "co2(euro/ton)": co2, "wind(%)": 50}
+                        for gas, kerosine, co2 in [(10, 20, 5), (0, 20, 5), (0, 0, 0), (10, 6, 0), (10, 20, 5)]]
+        self.assert_same_as_full_sort(data, fuels_series, KineticMeritOrder())
+
+    def test_update_SamePrices_NothingRepaired(self):
+        costs = VectorizedPowerPlan(random_payload(self.rng, 20)).estimate_costs()
+        merit_order = KineticMeritOrder()
+        for _ in range(3):
+            merit_order.update(costs)
+        self.assertEqual((merit_order.sort_count, merit_order.repair_count), (1, 0))
+
+    def test_is_merit_order_TieInPayloadOrder_True(self):
+        self.assertTrue(is_merit_order(np.array([2., 1., 1.]), np.array([1, 2, 0])))
+        self.assertFalse(is_merit_order(np.array([2., 1., 1.]), np.array([2, 1, 0])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import unittest
+from time import monotonic
+
+from . import payload
+from api import app
+from power_plan.custom_exceptions import DeadlineExceeded
+from power_plan.deadline import deadline_scope
+from power_plan.error_catcher_functions import check_and_find_powerplants_production, find_powerplants_production
+from power_plan.metrics import METRICS, Counter, Histogram, MetricsRegistry, NULL_TIMER
+
+
+class HistogramTest(unittest.TestCase):
+    def setUp(self):
+        self.histogram = Histogram("duration_seconds", "A duration.", ("stage",), buckets=(0.1, 1))
+
+    def test_observe_ThreeValues_CumulativeBuckets(self):
+        for value in (0.05, 0.5, 5):
+            self.histogram.observe(value, "parse")
+        samples = list(self.histogram.samples())
+        self.assertEqual(samples, [
+            ("duration_seconds_bucket", '{stage="parse",le="0.1"}', 1),
+            ("duration_seconds_bucket", '{stage="parse",le="1"}', 2),
+            ("duration_seconds_bucket", '{stage="parse",le="+Inf"}', 3),
+            ("duration_seconds_sum", '{stage="parse"}', 5.55),
+            ("duration_seconds_count", '{stage="parse"}', 3),
+        ])
+
+    def test_observe_ValueOnBucketBound_CountedInThatBucket(self):
+        self.histogram.observe(0.1, "parse")
+        self.assertEqual(next(self.histogram.samples())[2], 1)
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_render_CounterWithQuoteInLabel_EscapedPrometheusText(self):
+        counter = self.registry.register(Counter("requests_total", "Requests.", ("path",)))
+        counter.inc('/a"b')
+        self.assertIn('# TYPE requests_total counter\nrequests_total{path="/a\\"b"} 1\n', self.registry.render())
+
+    def test_time_stage_Block_ObservedOnce(self):
+        with self.registry.time_stage("sanity_check"):
+            pass
+        self.assertIn('powerplan_stage_duration_seconds_count{stage="sanity_check"} 1', self.registry.render())
+
+    def test_time_stage_Disabled_NothingObserved(self):
+        self.registry.enabled = False
+        self.assertIs(self.registry.time_stage("sanity_check"), NULL_TIMER)
+        self.registry.count_error("sanity_check", ValueError("wrong"))
+        self.assertEqual(self.registry.stage_duration.series, {})
+        self.assertEqual(self.registry.errors.values, {})
+
+    def test_time_stage_ExpiredDeadline_TimedWithoutRaising(self):
+        with deadline_scope(monotonic() - 1):
+            with self.registry.time_stage("sanity_check"):
+                pass
+        self.assertIn('powerplan_stage_duration_seconds_count{stage="sanity_check"} 1', self.registry.render())
+
+    def test_check_and_find_powerplants_production_MetricsDisabledExpiredDeadline_DeadlineExceeded(self):
+        enabled, METRICS.enabled = METRICS.enabled, False
+        try:
+            with deadline_scope(monotonic() - 1):
+                with self.assertRaises(DeadlineExceeded) as context:
+                    check_and_find_powerplants_production(payload)
+        finally:
+            METRICS.enabled = enabled
+        self.assertEqual(context.exception.args[1], "sanity_check")
+
+
+class MetricsRouteTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_find_powerplants_production_AlgorithmError_ErrorCounted(self):
+        key = ("find_powerplants_production", "AlgorithmError")
+        count = METRICS.errors.values.get(key, 0)
+        find_powerplants_production(dict(payload, load=10 ** 6))
+        self.assertEqual(METRICS.errors.values[key], count + 1)
+
+    def test_metrics_route_AfterPost_StagesExposed(self):
+        self.client.post('/', data=json.dumps(payload), headers={"Content-Type": "application/json"})
+        response = self.client.get('/metrics')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.mimetype, "text/plain")
+        text = response.get_data(as_text=True)
+        for stage in ("extract_json_from_request", "sanity_check", "sort_by_merit_order",
+                      "update_powerplants_production", "serialization"):
+            self.assertIn(f'powerplan_stage_duration_seconds_count{{stage="{stage}"}}', text)
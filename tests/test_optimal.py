@@ -0,0 +1,179 @@
+import itertools
+import json
+import random
+import time
+import unittest
+
+import numpy as np
+
+from . import payload
+import api
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import AlgorithmError, DispatchBudgetExceeded
+from power_plan import engines
+from power_plan.engines import get_engine, solve
+from power_plan.error_catcher_functions import find_batch_production, find_powerplants_production
+from power_plan.optimal import OptimalPowerPlan, exact_dispatch, optimal_dispatch, window_minimum
+from power_plan.powerplan import PowerPlan
+
+# the greedy algorithm can't lower gasfired1 enough for gasfired2 to run at pmin, running both at pmin fills the load
+pmin_conflict_payload = {
+    "load": 310,
+    "fuels": {"gas(euro/MWh)": 13.4, "kerosine(euro/MWh)": 50.8, "co2(euro/ton)": 20, "wind(%)": 60},
+    "powerplants": [
+        {"name": "gasfired1", "type": "gasfired", "efficiency": 0.53, "pmin": 100, "pmax": 200},
+        {"name": "gasfired2", "type": "gasfired", "efficiency": 0.37, "pmin": 150, "pmax": 300},
+        {"name": "windpark1", "type": "windturbine", "efficiency": 1, "pmin": 0, "pmax": 100},
+    ]
+}
+pmin_conflict_output = [{"name": "windpark1", "p": 60}, {"name": "gasfired1", "p": 100}, {"name": "gasfired2", "p": 150}]
+
+
+def brute_force_cost(pmin, pmax, costs, load):
+    """Return the minimal cost of the load over every combination of productions, None if there is none."""
+    productions = [[0] + list(range(max(low, 1), high + 1)) if low <= high else [0] for low, high in zip(pmin, pmax)]
+    costs_filling_the_load = [sum(p * cost for p, cost in zip(plan, costs))
+                              for plan in itertools.product(*productions) if sum(plan) == load]
+    return min(costs_filling_the_load, default=None)
+
+
+def large_payload(size):
+    """
+    Return a payload without plan whose dynamic programming exceeds the default budget: units of 100 MW that can't be
+    lowered can't fill a load ending in 50.
+    """
+    return {
+        "load": 50 * size + 50,
+        "fuels": pmin_conflict_payload["fuels"],
+        "powerplants": [{"name": f"gasfired{i}", "type": "gasfired", "efficiency": 0.5, "pmin": 100, "pmax": 100}
+                        for i in range(size)],
+    }
+
+
+def random_fleet(rng):
+    size = rng.randint(1, 5)
+    pmax = [rng.randint(0, 8) for _ in range(size)]
+    pmin = [rng.randint(0, 9) if rng.random() < 0.6 else 0 for _ in range(size)]
+    costs = sorted(rng.choice([0, 10, 20, 20.5, 31.3]) for _ in range(size))
+    return np.array(pmin), np.array(pmax), np.array(costs, dtype=float)
+
+
+class OptimalDispatchTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(1)
+
+    def assert_optimal(self, dispatch_function):
+        for _ in range(500):
+            pmin, pmax, costs = random_fleet(self.rng)
+            load = self.rng.randint(1, int(pmax.sum()) + 1)
+            expected_cost = brute_force_cost(pmin, pmax, costs, load)
+            try:
+                production = dispatch_function(pmin, pmax, costs, load)
+            except AlgorithmError:
+                self.assertIsNone(expected_cost)
+                continue
+            self.assertEqual(production.sum(), load)
+            self.assertTrue(all(p == 0 or low <= p <= high for p, low, high in zip(production, pmin, pmax)))
+            self.assertAlmostEqual(costs @ production, expected_cost)
+
+    def test_exact_dispatch_RandomSmallFleets_BruteForceCost(self):
+        self.assert_optimal(exact_dispatch)
+
+    def test_optimal_dispatch_RandomSmallFleets_BruteForceCost(self):
+        self.assert_optimal(optimal_dispatch)
+
+    def test_optimal_dispatch_RandomLargerFleets_SameCostAsExactDispatch(self):
+        for _ in range(50):
+            size = self.rng.randint(5, 60)
+            pmax = np.array([self.rng.randint(0, 60) for _ in range(size)])
+            pmin = np.array([self.rng.randint(0, 70) if self.rng.random() < 0.6 else 0 for _ in range(size)])
+            costs = np.sort(np.array([self.rng.choice([0, 10, 20, 20.5, 21, 31.3, 50]) for _ in range(size)], float))
+            load = self.rng.randint(1, int(pmax.sum()))
+            try:
+                expected_cost = costs @ exact_dispatch(pmin, np.where(pmin <= pmax, pmax, 0), costs, load)
+            except AlgorithmError:
+                self.assertRaises(AlgorithmError, optimal_dispatch, pmin, pmax, costs, load)
+                continue
+            self.assertAlmostEqual(costs @ optimal_dispatch(pmin, pmax, costs, load), expected_cost)
+
+    def test_optimal_dispatch_LoadAboveCapacity_AlgorithmError(self):
+        self.assertRaises(AlgorithmError, optimal_dispatch, np.array([0]), np.array([10]), np.array([1.]), 11)
+
+    def test_window_minimum_RandomValues_NaiveMinimum(self):
+        values = np.array([self.rng.choice([np.inf, self.rng.uniform(-5, 5)]) for _ in range(40)])
+        for low, high in ((0, 0), (0, 3), (2, 7), (5, 60)):
+            expected = [min(values[max(0, l - high):l - low + 1], default=np.inf) if l >= low else np.inf
+                        for l in range(len(values))]
+            self.assertEqual(window_minimum(values, low, high).tolist(), expected)
+
+
+class OptimalEngineTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_get_engine_Optimal_OptimalPowerPlan(self):
+        self.assertIs(get_engine("optimal"), OptimalPowerPlan)
+
+    def test_run_SamplePayload_NotMoreExpensiveThanPowerPlan(self):
+        def cost(response, data):
+            plan = OptimalPowerPlan(data)
+            costs = dict(zip(plan.fleet.names, plan.estimate_costs().tolist()))
+            return sum(costs[pp["name"]] * pp["p"] for pp in response)
+
+        response = OptimalPowerPlan(payload).run()
+        self.assertEqual(sum(pp["p"] for pp in response), payload["load"])
+        self.assertLessEqual(cost(response, payload), cost(PowerPlan(payload).run(), payload) + 1e-9)
+
+    def test_run_PminConflict_PlanFound(self):
+        self.assertEqual(OptimalPowerPlan(pmin_conflict_payload).run(), pmin_conflict_output)
+
+    def test_solve_GreedyRaises_FallsBackToOptimal(self):
+        self.assertRaises(AlgorithmError, PowerPlan(pmin_conflict_payload).run)
+        self.assertEqual(find_powerplants_production(pmin_conflict_payload), pmin_conflict_output)
+
+    def test_solve_CompactFleetFallback_WindDeratedOnce(self):
+        data = dict(pmin_conflict_payload, powerplants=CompactFleet(pmin_conflict_payload["powerplants"]))
+        self.assertEqual(solve(data), pmin_conflict_output)
+
+    def test_solve_NoPlanExists_OptimalEngineError(self):
+        response = find_powerplants_production(dict(pmin_conflict_payload, load=90))
+        self.assertEqual(response, {"error": "no combination of powerplants productions can fill the load"})
+
+    def test_solve_LargeFleetWithoutPlan_GreedyErrorFast(self):
+        data = large_payload(2000)
+        with self.assertRaises(AlgorithmError) as greedy_error:
+            PowerPlan(data).run()
+        start = time.perf_counter()
+        response = find_powerplants_production(data)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(response, {"error": greedy_error.exception.args[0]})
+
+    def test_solve_OptimalEngineAboveBudget_DispatchBudgetExceededFast(self):
+        data = dict(large_payload(2000), engine="optimal")
+        start = time.perf_counter()
+        self.assertRaises(DispatchBudgetExceeded, solve, data)
+        self.assertLess(time.perf_counter() - start, 2)
+
+    def test_post_OptimalEngineAboveBudget_BadRequest(self):
+        response = api.app.test_client().post('/', headers={"Content-Type": "application/json"},
+                                              data=json.dumps(dict(large_payload(2000), engine="optimal")))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("exceeds", response.json["error"])
+
+    def test_find_batch_production_OptimalEngineAboveBudget_ItemError(self):
+        batch = [dict(large_payload(2000), engine="optimal"), payload]
+        response = find_batch_production(batch)
+        self.assertIn("error", response[0])
+        self.assertEqual(response[1], PowerPlan(payload).run())
+
+    def test_solve_FallbackDisabled_GreedyError(self):
+        default_max_cells, engines.FALLBACK_MAX_CELLS = engines.FALLBACK_MAX_CELLS, 0
+        try:
+            self.assertRaises(AlgorithmError, solve, pmin_conflict_payload)
+        finally:
+            engines.FALLBACK_MAX_CELLS = default_max_cells
+
+    def test_exact_dispatch_AboveBudget_DispatchBudgetExceeded(self):
+        pmin, pmax, costs = np.array([0, 0]), np.array([10, 10]), np.array([1., 2.])
+        self.assertRaises(DispatchBudgetExceeded, exact_dispatch, pmin, pmax, costs, 15, max_cells=31)
+        self.assertEqual(exact_dispatch(pmin, pmax, costs, 15, max_cells=32).tolist(), [10, 5])
@@ -0,0 +1,75 @@
+import atexit
+import logging
+import os
+import tempfile
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+from . import payload
+from power_plan import error_log
+from power_plan.error_catcher_functions import find_batch_production
+from power_plan.error_log import start_logging
+from power_plan.parallel import ParallelSolver
+
+
+class ParallelSolverTest(unittest.TestCase):
+    def setUp(self):
+        self.solver = ParallelSolver(max_workers=2, chunksize=3, min_parallel_items=0)
+        self.scenarios = [{"load": load} for load in range(0, 1400, 70)]
+
+    def tearDown(self):
+        self.solver.shutdown()
+
+    def test_solve_Scenarios_SameAsSerialInTheSameOrder(self):
+        batch = {"powerplants": payload["powerplants"], "fuels": payload["fuels"], "scenarios": self.scenarios}
+        self.assertEqual(find_batch_production(batch, self.solver), find_batch_production(batch))
+
+    def test_solve_ListOfPayloads_SameAsSerialInTheSameOrder(self):
+        batch = [dict(payload, **scenario) for scenario in self.scenarios]
+        self.assertEqual(find_batch_production(batch, self.solver), find_batch_production(batch))
+
+    def test_solve_SameFleetTwice_PoolKeptAndFleetNotSentAgain(self):
+        # the fleet is sent once per worker, a single worker holds it after the first batch
+        self.solver = ParallelSolver(max_workers=1, chunksize=3, min_parallel_items=0)
+        batch = {"powerplants": payload["powerplants"], "fuels": payload["fuels"], "scenarios": self.scenarios}
+        first = find_batch_production(batch, self.solver)
+        executor, sent = self.solver.executor(), self.solver.shared_data_sent
+        self.assertEqual(find_batch_production(batch, self.solver), first)
+        self.assertIs(self.solver.executor(), executor)
+        self.assertEqual(self.solver.shared_data_sent, sent)
+
+    def test_solve_FreshPool_SinglePassWithTheSharedData(self):
+        batch = {"powerplants": payload["powerplants"], "fuels": payload["fuels"], "scenarios": self.scenarios}
+        self.assertEqual(find_batch_production(batch, self.solver), find_batch_production(batch))
+        self.assertEqual((self.solver.shared_data_sent, self.solver.chunks_resent), (7, 0))
+
+    def test_solve_BrokenPool_SolvedOnANewPool(self):
+        batch = {"powerplants": payload["powerplants"], "fuels": payload["fuels"], "scenarios": self.scenarios}
+        executor = self.solver.executor()
+        self.assertRaises(BrokenProcessPool, executor.submit(os._exit, 1).result)
+        self.assertEqual(find_batch_production(batch, self.solver), find_batch_production(batch))
+        self.assertIsNot(self.solver.executor(), executor)
+
+    def test_solve_InvalidItem_LoggedByServingProcess(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers, root.level
+        filename = os.path.join(tempfile.mkdtemp(), "log_file.log")
+        listener = start_logging(filename, fmt="%(message)s")
+        try:
+            self.solver.solve({}, [dict(payload, load=-1)])
+        finally:
+            self.solver.shutdown()
+            atexit.unregister(listener.stop)
+            listener.stop()
+            root.handlers, root.level = handlers, level
+            error_log._log_listener = None
+        with open(filename) as log_file:
+            self.assertIn("load", log_file.read())
+
+    def test_solve_FewerItemsThanMinParallelItems_SolvedInProcess(self):
+        solver = ParallelSolver(max_workers=2, min_parallel_items=10)
+        self.assertEqual(solver.solve({}, [payload]), find_batch_production([payload]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import itertools
+import random
+import unittest
+
+import numpy as np
+
+from . import payload, random_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.error_catcher_functions import find_price_sweep_production
+from power_plan.powerplan import PowerPlan
+from power_plan.price_sweep import SWEPT_PRICES, PriceSweepPlan, perform_price_sweep_sanity_check
+from power_plan.vectorized import VectorizedPowerPlan
+
+
+def solve_grid_point_with_power_plan(data, prices):
+    """Return the production of every powerplant in the payload order and the total cost, the error if any."""
+    data = dict(data, fuels=dict(data["fuels"], **dict(zip(SWEPT_PRICES, prices))))
+    try:
+        production = {pp["name"]: pp["p"] for pp in PowerPlan(data).run()}
+    except AlgorithmError as err:
+        return err.args[0]
+    plan = VectorizedPowerPlan(data)
+    production = [production[name] for name in plan.fleet.names]
+    return production, float(plan.estimate_costs() @ np.array(production))
+
+
+class PriceSweepPlanTest(unittest.TestCase):
+    def assertSameAsPowerPlan(self, data, response):
+        for prices, k, cost in zip(itertools.product(*response["axes"].values()), response["plan_index"],
+                                   response["total_cost"]):
+            expected = solve_grid_point_with_power_plan(data, prices)
+            if isinstance(expected, str):
+                self.assertIsNone(cost)
+                self.assertIn({"plan": k, "error": expected}, response["errors"])
+            else:
+                self.assertEqual(response["plans"][k], expected[0])
+                self.assertAlmostEqual(cost, expected[1])
+
+    def test_run_SampleSweep_SameAsPowerPlan(self):
+        data = dict(payload, sweep={"gas(euro/MWh)": {"start": 5, "stop": 100, "num": 20}, "co2(euro/ton)": [0, 20]})
+        response = PriceSweepPlan(data).run()
+        self.assertEqual(len(response["plan_index"]), 40)
+        self.assertEqual(response["axes"]["kerosine(euro/MWh)"], [50.8])
+        self.assertSameAsPowerPlan(data, response)
+
+    def test_run_SampleSweep_OneDispatchPerMeritOrderAndSamePlansShared(self):
+        plan = PriceSweepPlan(dict(payload, sweep={"gas(euro/MWh)": {"start": 5, "stop": 100, "num": 200}}))
+        response = plan.run()
+        self.assertEqual((plan.dispatch_count, len(response["plans"])), (3, 2))
+
+    def test_run_RandomSweeps_SameAsPowerPlan(self):
+        rng = random.Random(8)
+        for _ in range(20):
+            data = random_payload(rng, rng.randint(1, 10))
+            data["sweep"] = {price: [rng.uniform(0, 80) for _ in range(rng.randint(1, 4))]
+                             for price in rng.sample(SWEPT_PRICES, rng.randint(1, 3))}
+            self.assertSameAsPowerPlan(data, PriceSweepPlan(data).run())
+
+
+class PriceSweepSanityCheckTest(unittest.TestCase):
+    def test_perform_price_sweep_sanity_check_NoSweep_ValueError(self):
+        self.assertRaises(ValueError, perform_price_sweep_sanity_check, payload)
+
+    def test_perform_price_sweep_sanity_check_UnknownPrice_ValueError(self):
+        self.assertRaises(ValueError, perform_price_sweep_sanity_check, dict(payload, sweep={"wind(%)": [1]}))
+
+    def test_perform_price_sweep_sanity_check_NegativeCo2_ValueError(self):
+        self.assertRaises(ValueError, perform_price_sweep_sanity_check, dict(payload, sweep={"co2(euro/ton)": [-1]}))
+
+    def test_perform_price_sweep_sanity_check_TooManyPoints_ValueError(self):
+        price_range = {"start": 0, "stop": 1, "num": 1000}
+        data = dict(payload, sweep={"gas(euro/MWh)": price_range, "co2(euro/ton)": price_range})
+        self.assertRaises(ValueError, perform_price_sweep_sanity_check, data)
+
+    def test_find_price_sweep_production_IncorrectPayload_ErrorMessage(self):
+        self.assertIn("error", find_price_sweep_production(dict(payload, sweep={"gas(euro/MWh)": []})))
+
+
+if __name__ == '__main__':
+    unittest.main()
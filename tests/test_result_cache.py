@@ -0,0 +1,119 @@
+import json
+import threading
+import unittest
+
+from . import payload
+from api import app, result_cache
+from power_plan.error_catcher_functions import find_powerplants_production
+from power_plan.result_cache import ResultCache, canonical_hash
+
+
+class CanonicalHashTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_canonical_hash_KeysInAnotherOrder_SameHash(self):
+        reordered = {key: payload[key] for key in reversed(list(payload))}
+        reordered["fuels"] = {key: payload["fuels"][key] for key in reversed(list(payload["fuels"]))}
+        self.assertEqual(canonical_hash(payload), canonical_hash(reordered))
+
+    def test_canonical_hash_EqualFloatsWrittenDifferently_SameHash(self):
+        self.assertEqual(canonical_hash(json.loads('{"a": 0.50}')), canonical_hash(json.loads('{"a": 5e-1}')))
+        self.assertEqual(canonical_hash({"a": 0.}), canonical_hash({"a": -0.}))
+
+    def test_canonical_hash_FloatsDifferingBeyondTwelveDigits_DifferentHash(self):
+        self.assertNotEqual(canonical_hash({"a": 0.3}), canonical_hash({"a": 0.1 + 0.2}))
+        self.assertNotEqual(canonical_hash({"load": 480.0000000000001}), canonical_hash({"load": 480.}))
+
+    def test_canonical_hash_IntAndFloat_DifferentHash(self):
+        self.assertNotEqual(canonical_hash({"load": 480}), canonical_hash({"load": 480.}))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResultCache(max_size=2, ttl=10, error_max_size=1, error_ttl=1, clock=self.clock)
+        self.computed = []
+
+    def compute(self, data):
+        self.computed.append(data)
+        return {"error": "no load"} if data["load"] < 0 else {"load": data["load"]}
+
+    def test_get_or_compute_SamePayloadTwice_ComputedOnce(self):
+        self.assertEqual(self.cache.get_or_compute({"load": 1}, self.compute), {"load": 1})
+        self.assertEqual(self.cache.get_or_compute({"load": 1}, self.compute), {"load": 1})
+        self.assertEqual(len(self.computed), 1)
+        self.assertEqual((self.cache.results.hits, self.cache.results.misses), (1, 1))
+
+    def test_get_or_compute_MaxSizeExceeded_LeastRecentlyUsedEvicted(self):
+        for load in (1, 2, 1, 3, 1, 2):
+            self.cache.get_or_compute({"load": load}, self.compute)
+        self.assertEqual([data["load"] for data in self.computed], [1, 2, 3, 2])
+
+    def test_get_or_compute_TtlElapsed_ComputedAgain(self):
+        self.cache.get_or_compute({"load": 1}, self.compute)
+        self.clock.now = 10
+        self.cache.get_or_compute({"load": 1}, self.compute)
+        self.assertEqual(len(self.computed), 2)
+
+    def test_get_or_compute_Error_OwnPolicy(self):
+        self.cache.get_or_compute({"load": -1}, self.compute)
+        self.cache.get_or_compute({"load": -1}, self.compute)
+        self.assertEqual((len(self.cache.errors), len(self.cache.results)), (1, 0))
+        self.clock.now = 1
+        self.cache.get_or_compute({"load": -1}, self.compute)
+        self.assertEqual(len(self.computed), 2)
+
+    def test_get_or_compute_ErrorCacheDisabled_ErrorsNotKept(self):
+        cache = ResultCache(error_max_size=0)
+        cache.get_or_compute({"load": -1}, self.compute)
+        self.assertEqual(len(cache.errors), 0)
+
+    def test_get_body_BodyOfCachedPayload_CachedResponse(self):
+        self.assertIsNone(self.cache.get_body(b'{"load": 1}'))
+        self.cache.get_or_compute({"load": 1}, self.compute, b'{"load": 1}')
+        self.assertEqual(self.cache.get_body(b'{"load": 1}'), {"load": 1})
+        self.assertIsNone(self.cache.get_body(b'{"load":1}'))
+
+    def test_get_or_compute_ConcurrentThreads_SameResults(self):
+        results = []
+
+        def solve():
+            for load in range(50):
+                results.append(self.cache.get_or_compute({"load": load % 5}, self.compute)["load"])
+
+        threads = [threading.Thread(target=solve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(results), sorted([load % 5 for load in range(50)] * 4))
+        self.assertEqual(len(self.cache.results), 2)
+
+
+class PowerResourceCacheTest(unittest.TestCase):
+    def setUp(self):
+        result_cache.clear()
+
+    def test_power_resource_SamePayloadTwice_SecondServedFromCache(self):
+        client = app.test_client()
+        hits = result_cache.results.hits
+        responses = [client.post('/', data=json.dumps(payload), headers={"Content-Type": "application/json"})
+                     for _ in range(2)]
+        self.assertEqual(responses[0].get_json(), find_powerplants_production(payload))
+        self.assertEqual(responses[1].get_json(), responses[0].get_json())
+        self.assertEqual(result_cache.results.hits, hits + 1)
+
+    def test_power_resource_InvalidPayload_ErrorStored(self):
+        data = dict(payload, powerplants=[dict(payload["powerplants"][0], efficiency=1.5)])
+        response = app.test_client().post('/', data=json.dumps(data), headers={"Content-Type": "application/json"})
+        self.assertIn("efficiency", response.get_json()["error"])
+        self.assertEqual((len(result_cache.errors), len(result_cache.results)), (1, 0))
@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from . import payload, random_payload
+from .test_supply_curve import solve_with_power_plan
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.powerplan import PowerPlan
+from power_plan.session import DispatchSession
+
+
+def update_session(session, load, fuels=None):
+    try:
+        return list(map(dict, session.update(load, fuels)))
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+class DispatchSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.session = DispatchSession(payload)
+
+    def test_init_SamplePayload_SameAsPowerPlan(self):
+        self.assertEqual(self.session.response, PowerPlan(payload).run())
+
+    def test_update_LoadSteps_SameAsPowerPlanWithoutNewSortNorFullDispatch(self):
+        for load in (481, 479, 300, 0, 910, 480):
+            self.assertEqual(update_session(self.session, load), solve_with_power_plan(payload, load))
+        self.assertEqual((self.session.sort_count, self.session.full_dispatch_count), (1, 1))
+
+    def test_update_FuelsKeepingMeritOrder_NoNewSort(self):
+        fuels = dict(payload["fuels"], **{"gas(euro/MWh)": 13.5})
+        self.assertEqual(update_session(self.session, 480, fuels), PowerPlan(dict(payload, fuels=fuels)).run())
+        self.assertEqual((self.session.sort_count, self.session.full_dispatch_count), (1, 1))
+
+    def test_update_FuelsChangingMeritOrder_SortedAgain(self):
+        fuels = dict(payload["fuels"], **{"gas(euro/MWh)": 100})
+        self.assertEqual(update_session(self.session, 480, fuels), PowerPlan(dict(payload, fuels=fuels)).run())
+        self.assertEqual((self.session.sort_count, self.session.full_dispatch_count), (2, 2))
+
+    def test_update_LoadNotFilled_AlgorithmErrorAndPlanKept(self):
+        response = list(map(dict, self.session.response))
+        self.assertRaises(AlgorithmError, self.session.update, 10 ** 6)
+        self.assertEqual(self.session.response, response)
+        self.assertEqual(update_session(self.session, 481), solve_with_power_plan(payload, 481))
+
+    def test_update_RandomLoadsAndFuels_SameAsPowerPlan(self):
+        rng = random.Random(4)
+        for _ in range(10):
+            data = random_payload(rng, rng.randint(1, 15))
+            session = DispatchSession(dict(data, load=0))
+            for _ in range(30):
+                if rng.random() < 0.2:
+                    data["fuels"] = random_payload(rng, 0)["fuels"]
+                load = rng.randint(0, sum(pp["pmax"] for pp in data["powerplants"]))
+                self.assertEqual(update_session(session, load, data["fuels"]), solve_with_power_plan(data, load))
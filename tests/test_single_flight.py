@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+import unittest
+
+from . import payload
+from power_plan.error_catcher_functions import find_powerplants_production
+from power_plan.result_cache import ResultCache
+from power_plan.single_flight import SingleFlight
+
+
+def run_concurrently(function, count):
+    """Call function from count threads started together, return their results or exceptions."""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def call(index):
+        barrier.wait()
+        try:
+            results[index] = function()
+        except Exception as err:
+            results[index] = err
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SingleFlightTest(unittest.TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight(timeout=5)
+        self.calls = []
+
+    def slow_square(self, value):
+        self.calls.append(value)
+        time.sleep(0.05)
+        return value * value
+
+    def test_do_ConcurrentSameKey_ComputedOnce(self):
+        results = run_concurrently(lambda: self.single_flight.do("key", self.slow_square, 3), 8)
+        self.assertEqual(results, [9] * 8)
+        self.assertEqual(self.calls, [3])
+        self.assertEqual(self.single_flight.shared, 7)
+
+    def test_do_ConcurrentOtherKeys_ComputedForEveryKey(self):
+        keys = iter(range(4))
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                key = next(keys)
+            return self.single_flight.do(key, self.slow_square, key)
+
+        self.assertEqual(sorted(run_concurrently(call, 4)), [0, 1, 4, 9])
+
+    def test_do_Exception_RaisedToEveryCaller(self):
+        def fail():
+            time.sleep(0.05)
+            raise ValueError("wrong value")
+
+        results = run_concurrently(lambda: self.single_flight.do("key", fail), 4)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    def test_do_WaitTimedOut_ComputedByTheWaiter(self):
+        self.single_flight.timeout = 0.01
+        results = run_concurrently(lambda: self.single_flight.do("key", self.slow_square, 3), 2)
+        self.assertEqual(results, [9, 9])
+        self.assertEqual(self.calls, [3, 3])
+        self.assertEqual(self.single_flight.timed_out, 1)
+
+    def test_do_SequentialCalls_ComputedEveryTime(self):
+        self.single_flight.do("key", self.slow_square, 3)
+        self.single_flight.do("key", self.slow_square, 3)
+        self.assertEqual(self.calls, [3, 3])
+
+
+class CoalescedResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResultCache(max_size=0, error_max_size=0, single_flight=SingleFlight(timeout=5))
+        self.solved = []
+
+    def solve(self, data):
+        self.solved.append(data)
+        time.sleep(0.05)
+        return find_powerplants_production(data)
+
+    def test_get_or_compute_ConcurrentIdenticalPayloads_SolvedOnce(self):
+        results = run_concurrently(lambda: self.cache.get_or_compute(dict(payload), self.solve), 8)
+        self.assertEqual(len(self.solved), 1)
+        self.assertEqual(results, [find_powerplants_production(payload)] * 8)
+
+    def test_get_or_compute_ConcurrentAlgorithmError_ErrorSharedWithEveryCaller(self):
+        data = dict(payload, load=10 ** 6)
+        results = run_concurrently(lambda: self.cache.get_or_compute(data, self.solve), 8)
+        self.assertEqual(len(self.solved), 1)
+        self.assertEqual(results, [{"error": "production does not fill the load"}] * 8)
+
+    def test_get_or_compute_body_ConcurrentIdenticalBodies_ParsedAndSolvedOnce(self):
+        parsed = []
+
+        def compute_body():
+            parsed.append(body)
+            return self.cache.get_or_compute(json.loads(body), self.solve, body)
+
+        body = json.dumps(payload).encode()
+        results = run_concurrently(lambda: self.cache.get_or_compute_body(body, compute_body), 8)
+        self.assertEqual((len(parsed), len(self.solved)), (1, 1))
+        self.assertEqual(results, [find_powerplants_production(payload)] * 8)
@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from . import payload
+from api import app
+from power_plan.powerplan import PowerPlan
+from power_plan.streaming import iter_ndjson, solve_ndjson_stream
+
+
+class IterNdjsonTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_iter_ndjson_BytesAndBlankLines_DecodedPayloads(self):
+        self.assertEqual(list(iter_ndjson([b'{"a": 1}\n', b'\n', '[2]\n'])), [({"a": 1}, None), ([2], None)])
+
+    def test_iter_ndjson_InvalidJson_Error(self):
+        payload_data, error = next(iter_ndjson(["{not json\n"]))
+        self.assertIsNone(payload_data)
+        self.assertIn("error", error)
+
+    def test_iter_ndjson_PayloadWithErrorKey_Payload(self):
+        self.assertEqual(next(iter_ndjson(['{"error": "none"}'])), ({"error": "none"}, None))
+
+
+class SolveNdjsonStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.expected_output = PowerPlan(payload).run()
+
+    def test_solve_ndjson_stream_TwoPayloads_OneLinePerPayload(self):
+        lines = [json.dumps(payload) + "\n", json.dumps(dict(payload, load=-1)) + "\n"]
+        results = [json.loads(line) for line in solve_ndjson_stream(lines)]
+        self.assertEqual(results[0], self.expected_output)
+        self.assertIn("error", results[1])
+
+    def test_solve_ndjson_stream_PayloadWithErrorKey_Solved(self):
+        lines = [json.dumps(dict(payload, error="ignored")), "{not json"]
+        results = [json.loads(line) for line in solve_ndjson_stream(lines)]
+        self.assertEqual(results[0], self.expected_output)
+        self.assertIn("error", results[1])
+
+    def test_solve_ndjson_stream_FirstResult_BeforeSecondLineIsRead(self):
+        read_lines = []
+
+        def lines():
+            for load in (480, 100):
+                read_lines.append(load)
+                yield json.dumps(dict(payload, load=load))
+
+        results = solve_ndjson_stream(lines())
+        next(results)
+        self.assertEqual(read_lines, [480])
+
+    def test_stream_resource_NdjsonBody_NdjsonResponse(self):
+        data = "".join(json.dumps(payload) + "\n" for _ in range(3))
+        response = app.test_client().post('/stream', data=data, headers={"Content-Type": "application/x-ndjson"})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(results, [self.expected_output] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
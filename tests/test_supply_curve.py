@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from . import payload, random_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.error_catcher_functions import find_marginal_price
+from power_plan.powerplan import PowerPlan
+from power_plan.supply_curve import SupplyCurve
+
+
+def solve_with_power_plan(data, load):
+    try:
+        return PowerPlan(dict(data, load=load)).run()
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+def solve_with_supply_curve(supply_curve, load):
+    try:
+        return supply_curve.dispatch(load)
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+class SupplyCurveTest(unittest.TestCase):
+    def setUp(self):
+        self.supply_curve = SupplyCurve.from_payload(payload)
+
+    def test_dispatch_SamplePayload_SameAsPowerPlan(self):
+        self.assertEqual(self.supply_curve.dispatch(payload["load"]), PowerPlan(payload).run())
+
+    def test_dispatch_EveryLoadOfRandomFleets_SameAsPowerPlan(self):
+        rng = random.Random(3)
+        for _ in range(20):
+            data = random_payload(rng, rng.randint(1, 15))
+            supply_curve = SupplyCurve.from_payload(data)
+            for load in range(-1, sum(supply_curve.pmax) + 2):
+                self.assertEqual(solve_with_supply_curve(supply_curve, load), solve_with_power_plan(data, load))
+
+    def test_cumulative_pmax_SamplePayload_PrefixSums(self):
+        self.assertEqual(self.supply_curve.cumulative_pmax, [90, 111, 571, 1031, 1241, 1257])
+
+    def test_marginal_price_LoadFilledByWind_Zero(self):
+        self.assertEqual(self.supply_curve.marginal_price(100), 0)
+
+    def test_marginal_price_LoadFilledByGas_GasCost(self):
+        self.assertAlmostEqual(self.supply_curve.marginal_price(480), 13.4 / 0.53 + 20 * 0.3)
+
+    def test_marginal_price_ZeroLoad_None(self):
+        self.assertIsNone(self.supply_curve.marginal_price(0))
+
+    def test_marginal_price_LoadTooHigh_AlgorithmError(self):
+        self.assertRaises(AlgorithmError, self.supply_curve.marginal_price, 100000)
+
+    def test_find_marginal_price_SamplePayload_LoadAndPrice(self):
+        self.assertEqual(find_marginal_price(payload), {"load": 480, "marginal_price": 13.4 / 0.53 + 20 * 0.3})
+
+    def test_find_marginal_price_LoadTooHigh_Error(self):
+        self.assertIn("error", find_marginal_price(dict(payload, load=100000)))
+
+
+if __name__ == '__main__':
+    unittest.main()
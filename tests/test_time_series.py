@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from . import payload, random_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.error_catcher_functions import find_time_series_production
+from power_plan.powerplan import PowerPlan
+from power_plan.time_series import TimeSeriesPlan, split_timesteps, perform_time_series_sanity_check
+
+
+def time_series_payload(rng, size, length):
+    data = random_payload(rng, size)
+    data["load"] = [rng.randint(0, 100 * size) for _ in range(length)]
+    data["fuels"] = {
+        "gas(euro/MWh)": [rng.uniform(5, 30) for _ in range(length)],
+        "kerosine(euro/MWh)": [rng.uniform(30, 80) for _ in range(length)],
+        "co2(euro/ton)": rng.randint(0, 50),
+        "wind(%)": [rng.randint(0, 100) for _ in range(length)],
+    }
+    return data
+
+
+class SplitTimestepsTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_split_timesteps_ScalarFuels_RepeatedAtEveryTimestep(self):
+        timesteps = split_timesteps(dict(payload, load=[1, 2, 3]))
+        self.assertEqual([load for load, _ in timesteps], [1, 2, 3])
+        self.assertTrue(all(fuels == payload["fuels"] for _, fuels in timesteps))
+
+    def test_split_timesteps_DifferentLengths_ValueError(self):
+        data = dict(payload, load=[1, 2, 3], fuels=dict(payload["fuels"], **{"wind(%)": [1, 2]}))
+        self.assertRaises(ValueError, split_timesteps, data)
+
+    def test_split_timesteps_NoList_ValueError(self):
+        self.assertRaises(ValueError, split_timesteps, payload)
+
+    def test_split_timesteps_EmptyLists_ValueError(self):
+        self.assertRaises(ValueError, split_timesteps, dict(payload, load=[]))
+
+    def test_perform_time_series_sanity_check_WrongLoadAtOneTimestep_ValueError(self):
+        self.assertRaises(ValueError, perform_time_series_sanity_check, dict(payload, load=[480, -1]))
+
+
+class TimeSeriesPlanTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_run_RandomTimeSeries_SameAsPowerPlanAtEveryTimestep(self):
+        rng = random.Random(11)
+        for _ in range(10):
+            data = time_series_payload(rng, rng.randint(1, 20), 24)
+            response = TimeSeriesPlan(data).run()
+            failed_timesteps = {error["timestep"] for error in response["errors"]}
+            for t, (load, fuels) in enumerate(split_timesteps(data)):
+                step_data = dict(data, load=load, fuels=fuels)
+                if t in failed_timesteps:
+                    self.assertRaises(AlgorithmError, PowerPlan(step_data).run)
+                else:
+                    expected = {pp["name"]: pp["p"] for pp in PowerPlan(step_data).run()}
+                    self.assertEqual({pp["name"]: pp["p"][t] for pp in response["powerplants"]}, expected)
+
+    def test_run_ConstantFuels_SortedOnce(self):
+        plan = TimeSeriesPlan(dict(payload, load=[100, 200, 300, 480]))
+        plan.run()
+        self.assertEqual(plan.merit_order.sort_count, 1)
+
+    def test_run_MeritOrderChange_RepairedNotSorted(self):
+        fuels = dict(payload["fuels"], **{"gas(euro/MWh)": [13.4, 13.4, 200]})
+        plan = TimeSeriesPlan(dict(payload, load=[480, 480, 480], fuels=fuels))
+        plan.run()
+        self.assertEqual((plan.merit_order.sort_count, plan.merit_order.repair_count), (1, 1))
+
+    def test_find_time_series_production_UnfillableTimestep_NoneAndError(self):
+        response = find_time_series_production(dict(payload, load=[480, 100000]))
+        self.assertEqual(response["errors"], [{"timestep": 1, "error": "production does not fill the load"}])
+        self.assertTrue(all(pp["p"][1] is None for pp in response["powerplants"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
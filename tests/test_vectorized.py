@@ -0,0 +1,90 @@
+import random
+import unittest
+
+import numpy as np
+
+from . import payload, random_payload
+from power_plan.compact_fleet import CompactFleet
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.engines import get_engine
+from power_plan.error_catcher_functions import find_powerplants_production
+from power_plan.powerplan import PowerPlan
+from power_plan.vectorized import VectorizedPowerPlan, dispatch
+
+
+def solve(engine, data):
+    try:
+        return engine(data).run()
+    except AlgorithmError as err:
+        return err.args[0]
+
+
+class VectorizedPowerPlanTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_run_SamplePayload_SameAsPowerPlan(self):
+        self.assertEqual(VectorizedPowerPlan(payload).run(), PowerPlan(payload).run())
+
+    def test_run_RandomPayloads_SameAsPowerPlan(self):
+        rng = random.Random(42)
+        for _ in range(500):
+            data = random_payload(rng, rng.randint(1, 30))
+            self.assertEqual(solve(VectorizedPowerPlan, data), solve(PowerPlan, data))
+
+    def test_run_LoadOfEveryMarginalPowerplant_SameAsPowerPlan(self):
+        rng = random.Random(7)
+        data = random_payload(rng, 20)
+        for load in range(0, sum(pp["pmax"] for pp in data["powerplants"]) + 2, 7):
+            data["load"] = load
+            self.assertEqual(solve(VectorizedPowerPlan, data), solve(PowerPlan, data))
+
+    def test_run_ZeroLoadWithoutPowerplants_EmptyList(self):
+        self.assertEqual(VectorizedPowerPlan(dict(payload, load=0, powerplants=[])).run(), [])
+
+    def test_run_UnknownPowerplantsType_TypeError(self):
+        data = dict(payload, powerplants=[dict(payload["powerplants"][0], type="anUnknownType")])
+        self.assertRaises(TypeError, VectorizedPowerPlan, data)
+
+    def test_run_RandomCompactFleets_SameAsPowerPlan(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            data = random_payload(rng, rng.randint(1, 30))
+            compact_data = dict(data, powerplants=CompactFleet(data["powerplants"]))
+            self.assertEqual(solve(VectorizedPowerPlan, compact_data), solve(PowerPlan, data))
+
+
+class DispatchTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_dispatch_LoadTooHigh_AlgorithmError(self):
+        self.assertRaises(AlgorithmError, dispatch, np.array([0, 0]), np.array([10, 10]), 30)
+
+    def test_dispatch_PminOfFirstPowerplantTooHigh_AlgorithmError(self):
+        self.assertRaises(AlgorithmError, dispatch, np.array([20]), np.array([30]), 10)
+
+    def test_dispatch_PreviousPowerplantLowered_Equal(self):
+        production = dispatch(np.array([0, 20]), np.array([30, 50]), 40)
+        self.assertEqual(production.tolist(), [20, 20])
+
+
+class GetEngineTest(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def test_get_engine_NoName_PowerPlan(self):
+        self.assertIs(get_engine(), PowerPlan)
+
+    def test_get_engine_Vectorized_VectorizedPowerPlan(self):
+        self.assertIs(get_engine("vectorized"), VectorizedPowerPlan)
+
+    def test_get_engine_UnknownName_ValueError(self):
+        self.assertRaises(ValueError, get_engine, "anUnknownEngine")
+
+    def test_find_powerplants_production_EngineKey_SameAsPowerPlan(self):
+        self.assertEqual(find_powerplants_production(dict(payload, engine="vectorized")), PowerPlan(payload).run())
+
+
+if __name__ == '__main__':
+    unittest.main()
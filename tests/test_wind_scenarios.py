@@ -0,0 +1,111 @@
+import random
+import unittest
+
+import numpy as np
+
+from . import payload, random_payload
+from power_plan.custom_exceptions import AlgorithmError
+from power_plan.error_catcher_functions import find_wind_scenarios_production
+from power_plan.powerplan import PowerPlan
+from power_plan.vectorized import VectorizedPowerPlan
+from power_plan.wind_scenarios import WindScenarioPlan, dispatch_scenarios, draw_wind_scenarios, \
+    perform_wind_scenarios_sanity_check
+
+
+def solve_scenario_with_power_plan(data, wind):
+    """Return the production of every powerplant by name and the cost of one wind scenario, the error if any."""
+    if isinstance(wind, list):
+        winds = iter(wind)
+        powerplants = [dict(pp, pmax=int(pp["pmax"] * next(winds) / 100)) if pp["type"] == "windturbine" else pp
+                       for pp in data["powerplants"]]
+        data = dict(data, powerplants=powerplants, fuels=dict(data["fuels"], **{"wind(%)": 100}))
+    else:
+        data = dict(data, fuels=dict(data["fuels"], **{"wind(%)": wind}))
+    try:
+        production = {pp["name"]: pp["p"] for pp in PowerPlan(data).run()}
+    except AlgorithmError as err:
+        return err.args[0]
+    plan = VectorizedPowerPlan(data)
+    return production, float(plan.estimate_costs() @ np.array([production[name] for name in plan.fleet.names]))
+
+
+class WindScenarioPlanTest(unittest.TestCase):
+    def test_run_SampleScenarios_SameAsPowerPlan(self):
+        response = WindScenarioPlan(dict(payload, wind_scenarios=[60, 0, 100], plans=True)).run()
+        names = [pp["name"] for pp in payload["powerplants"]]
+        costs = []
+        for wind, plan in zip([60, 0, 100], response["plans"]):
+            production, cost = solve_scenario_with_power_plan(payload, wind)
+            self.assertEqual(plan, [production[name] for name in names])
+            costs.append(cost)
+        self.assertEqual((response["scenarios"], response["solved"], response["errors"]), (3, 3, {}))
+        self.assertAlmostEqual(response["cost"]["mean"], np.mean(costs))
+        self.assertAlmostEqual(response["cost"]["percentiles"]["50"], np.median(costs))
+
+    def test_run_RandomScenarios_SameAsPowerPlan(self):
+        rng = random.Random(7)
+        for _ in range(30):
+            data = random_payload(rng, rng.randint(1, 12))
+            parks = sum(pp["type"] == "windturbine" for pp in data["powerplants"])
+            per_park = rng.random() < 0.5
+            scenarios = [[rng.uniform(0, 100) for _ in range(parks)] if per_park else rng.randint(0, 100)
+                         for _ in range(20)]
+            response = WindScenarioPlan(dict(data, wind_scenarios=scenarios, plans=True)).run()
+
+            expected = [solve_scenario_with_power_plan(data, wind) for wind in scenarios]
+            solved = [result for result in expected if not isinstance(result, str)]
+            self.assertEqual(response["solved"], len(solved))
+            self.assertEqual(sum(response["errors"].values()), len(scenarios) - len(solved))
+            for plan, result in zip(response["plans"], expected):
+                if isinstance(result, str):
+                    self.assertIsNone(plan)
+                else:
+                    self.assertEqual(plan, [result[0][pp["name"]] for pp in data["powerplants"]])
+            if solved:
+                self.assertAlmostEqual(response["cost"]["mean"], np.mean([cost for _, cost in solved]))
+                self.assertAlmostEqual(response["powerplants"][0]["expected_p"],
+                                       np.mean([production[data["powerplants"][0]["name"]]
+                                                for production, _ in solved]))
+
+    def test_run_Distribution_StatisticsWithoutPlans(self):
+        data = dict(payload, wind_distribution={"type": "normal", "mean": 60, "std": 20, "count": 1000})
+        response = WindScenarioPlan(data).run()
+        self.assertEqual(response["scenarios"], 1000)
+        self.assertNotIn("plans", response)
+        self.assertEqual(sum(pp["expected_p"] for pp in response["powerplants"]), payload["load"])
+
+    def test_draw_wind_scenarios_PerPark_OneColumnPerParkClipped(self):
+        wind = draw_wind_scenarios({"type": "normal", "mean": 90, "std": 50, "count": 100, "per_park": True}, 3)
+        self.assertEqual(wind.shape, (100, 3))
+        self.assertTrue(((wind >= 0) & (wind <= 100)).all())
+
+    def test_dispatch_scenarios_LoadZero_AllZeros(self):
+        production, marginal = dispatch_scenarios(np.array([10, 0]), np.array([[20, 5], [0, 5]]), 0)
+        self.assertEqual((production.tolist(), marginal.tolist()), ([[0, 0], [0, 0]], [0, 0]))
+
+
+class WindScenariosSanityCheckTest(unittest.TestCase):
+    def test_perform_wind_scenarios_sanity_check_BothKeys_ValueError(self):
+        data = dict(payload, wind_scenarios=[60], wind_distribution={"type": "uniform", "low": 0, "high": 1,
+                                                                     "count": 1})
+        self.assertRaises(ValueError, perform_wind_scenarios_sanity_check, data)
+
+    def test_perform_wind_scenarios_sanity_check_WrongParkCount_ValueError(self):
+        self.assertRaises(ValueError, perform_wind_scenarios_sanity_check, dict(payload, wind_scenarios=[[60]]))
+
+    def test_perform_wind_scenarios_sanity_check_MixedScenarios_TypeError(self):
+        self.assertRaises(TypeError, perform_wind_scenarios_sanity_check, dict(payload, wind_scenarios=[[1, 2], 60]))
+
+    def test_perform_wind_scenarios_sanity_check_WindOutOfRange_ValueError(self):
+        self.assertRaises(ValueError, perform_wind_scenarios_sanity_check, dict(payload, wind_scenarios=[101]))
+
+    def test_perform_wind_scenarios_sanity_check_UnknownDistribution_ValueError(self):
+        data = dict(payload, wind_distribution={"type": "weibull", "count": 10})
+        self.assertRaises(ValueError, perform_wind_scenarios_sanity_check, data)
+
+    def test_find_wind_scenarios_production_IncorrectPayload_ErrorMessage(self):
+        self.assertIn("error", find_wind_scenarios_production(dict(payload, wind_scenarios=[])))
+
+
+if __name__ == '__main__':
+    unittest.main()